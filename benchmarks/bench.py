@@ -0,0 +1,275 @@
+"""
+Pantam benchmarks measure import time, app build time and memory for
+generated actions folders, and per-request dispatch overhead of the built
+app in-process.
+
+    python benchmarks/bench.py --output results.json
+    python benchmarks/bench.py --compare results.json
+"""
+
+from typing import Any, Callable, Dict, List
+from argparse import ArgumentParser, Namespace
+from asyncio import run
+from json import dumps, loads
+from os import chdir, getcwd, makedirs
+from os.path import abspath, dirname, join
+from platform import platform, python_version
+from resource import RUSAGE_SELF, getrusage
+from statistics import median
+from subprocess import check_output
+from sys import argv, executable, exit as sys_exit, path
+from tempfile import TemporaryDirectory
+from time import perf_counter
+import tracemalloc
+
+ROOT = dirname(dirname(abspath(__file__)))
+
+ACTIONS_FOLDER = "actions"
+
+ACTION_TEMPLATE = '''from pantam import JSONResponse, PlainTextResponse
+
+
+class Item%(index)d:
+    def fetch_all(self, request):
+        return PlainTextResponse("fetch_all")
+
+    async def fetch_single(self, request):
+        return PlainTextResponse("fetch_single")
+
+    def create(self, request):
+        return JSONResponse({"created": True})
+
+    def update(self, request):
+        return JSONResponse({"updated": True})
+
+    def delete(self, request):
+        return JSONResponse({"deleted": True})
+
+    def get_status(self, request):
+        return PlainTextResponse("ok")
+'''
+
+IMPORT_STATEMENTS = {
+    "pantam": "import pantam",
+    "pantam_app": "from pantam import Pantam",
+    "pantam_responses": "from pantam import PlainTextResponse",
+    "pantam_cli": "import pantam_cli.cli",
+}
+
+IMPORT_TIMER = """
+from time import perf_counter
+start = perf_counter()
+%s
+print(perf_counter() - start)
+"""
+
+# noisy metrics (rss, mean and p99 latency) are reported but never fail a run
+GATED_METRICS = (".seconds", ".peak_bytes", ".p50_us")
+
+Results = Dict[str, float]
+
+
+def generate_actions(folder: str, count: int) -> None:
+    """Write an actions folder with `count` action files"""
+    actions_folder = join(folder, ACTIONS_FOLDER)
+    makedirs(actions_folder)
+    open(join(actions_folder, "__init__.py"), "w").close()
+    for index in range(count):
+        with open(join(actions_folder, "item%d.py" % index), "w") as action_file:
+            action_file.write(ACTION_TEMPLATE % {"index": index})
+
+
+def make_app(folder: str) -> Any:
+    """Build a Pantam app for a generated actions folder"""
+    path.insert(0, ROOT)
+    path.insert(0, folder)
+    chdir(folder)
+    from pantam import Pantam  # pylint: disable=import-outside-toplevel
+
+    return Pantam(actions_folder=ACTIONS_FOLDER)
+
+
+def measure_build(folder: str, trace: bool) -> Results:
+    """Build once in this process, timing it or tracing its allocations"""
+    pantam = make_app(folder)
+    if trace:
+        tracemalloc.start()
+        pantam.build()
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        return {"peak_bytes": peak}
+    rss = getrusage(RUSAGE_SELF).ru_maxrss
+    start = perf_counter()
+    pantam.build()
+    seconds = perf_counter() - start
+    return {
+        "seconds": seconds,
+        "rss_bytes": (getrusage(RUSAGE_SELF).ru_maxrss - rss) * 1024,
+    }
+
+
+def run_worker(args: List[str]) -> Results:
+    """Run a measurement in a fresh interpreter so imports are not cached"""
+    output = check_output([executable, abspath(__file__), "--worker"] + args)
+    return loads(output.decode("utf-8").strip().splitlines()[-1])
+
+
+def bench_imports(repeat: int) -> Results:
+    """Measure import time of the package, app and CLI in fresh interpreters"""
+    results: Results = {}
+    for name, statement in IMPORT_STATEMENTS.items():
+        timings = [
+            float(check_output([executable, "-c", IMPORT_TIMER % statement], cwd=ROOT))
+            for _ in range(repeat)
+        ]
+        results["import.%s.seconds" % name] = median(timings)
+    return results
+
+
+def bench_build(count: int, repeat: int) -> Results:
+    """Measure build time and memory for an actions folder of `count` actions"""
+    with TemporaryDirectory() as folder:
+        generate_actions(folder, count)
+        timings = [run_worker([folder]) for _ in range(repeat)]
+        traced = run_worker([folder, "--trace"])
+    return {
+        "build.%d.seconds" % count: median(timing["seconds"] for timing in timings),
+        "build.%d.rss_bytes" % count: median(timing["rss_bytes"] for timing in timings),
+        "build.%d.peak_bytes" % count: traced["peak_bytes"],
+    }
+
+
+async def time_requests(
+    send: Callable[[], Any], requests: int, warmup: int = 100
+) -> List[float]:
+    """Time individual requests in microseconds"""
+    for _ in range(warmup):
+        await send()
+    timings: List[float] = []
+    for _ in range(requests):
+        start = perf_counter()
+        await send()
+        timings.append((perf_counter() - start) * 1000000)
+    return sorted(timings)
+
+
+def bench_dispatch(requests: int) -> Results:
+    """Measure per-request overhead of sync and async handlers in-process"""
+    cwd = getcwd()
+    with TemporaryDirectory() as folder:
+        generate_actions(folder, 100)
+        pantam = make_app(folder)
+        app = pantam.build()
+        from pantam.subrequest import (  # pylint: disable=import-outside-toplevel
+            subrequest,
+        )
+
+        async def floor_app(scope: Any, receive: Callable, send: Callable) -> None:
+            await send({"type": "http.response.start", "status": 200, "headers": []})
+            await send({"type": "http.response.body", "body": b"ok"})
+
+        targets = {
+            "floor": (floor_app, "/"),
+            "sync": (app, "/item50/"),
+            "async": (app, "/item50/1"),
+            "not_found": (app, "/missing/path/"),
+        }
+
+        async def scenario() -> Results:
+            await pantam.handle_startup()
+            results: Results = {}
+            try:
+                for name, (target, url) in targets.items():
+                    timings = await time_requests(
+                        lambda: subrequest(target, "GET", url), requests
+                    )
+                    results["dispatch.%s.mean_us" % name] = sum(timings) / len(timings)
+                    results["dispatch.%s.p50_us" % name] = timings[len(timings) // 2]
+                    results["dispatch.%s.p99_us" % name] = timings[
+                        int(len(timings) * 0.99)
+                    ]
+            finally:
+                await pantam.handle_shutdown()
+                chdir(cwd)
+            return results
+
+        return run(scenario())
+
+
+def compare(current: Results, baseline: Results, tolerance: float) -> bool:
+    """Print changes against a baseline, returns False on regressions.
+    All metrics are lower is better."""
+    ok = True
+    print("%-32s %14s %14s %9s" % ("metric", "baseline", "current", "change"))
+    for name in sorted(current):
+        if name not in baseline or baseline[name] <= 0:
+            print("%-32s %14s %14.2f %9s" % (name, "-", current[name], "new"))
+            continue
+        change = current[name] / baseline[name] - 1
+        regressed = change > tolerance and name.endswith(GATED_METRICS)
+        ok = ok and not regressed
+        print(
+            "%-32s %14.2f %14.2f %+8.1f%%%s"
+            % (
+                name,
+                baseline[name],
+                current[name],
+                change * 100,
+                " REGRESSION" if regressed else "",
+            )
+        )
+    return ok
+
+
+def parse_args() -> Namespace:
+    parser = ArgumentParser(description=__doc__.split("\n\n")[0].strip())
+    parser.add_argument(
+        "--sizes",
+        default="10,100,1000",
+        help="comma separated numbers of actions to build",
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="builds per size, the median is kept"
+    )
+    parser.add_argument(
+        "--requests", type=int, default=2000, help="requests per dispatch target"
+    )
+    parser.add_argument("--output", help="write results to a JSON file")
+    parser.add_argument("--compare", help="baseline JSON file to compare against")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.2,
+        help="allowed slowdown against the baseline before failing, e.g. 0.2",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    if argv[1:2] == ["--worker"]:
+        print(dumps(measure_build(argv[2], "--trace" in argv[3:])))
+        return
+    args = parse_args()
+    results: Results = bench_imports(args.repeat)
+    for size in args.sizes.split(","):
+        results.update(bench_build(int(size), args.repeat))
+    results.update(bench_dispatch(args.requests))
+    report = {
+        "python": python_version(),
+        "platform": platform(),
+        "results": results,
+    }
+    if args.output is not None:
+        with open(args.output, "w") as output_file:
+            output_file.write(dumps(report, indent=2, sort_keys=True))
+    if args.compare is None:
+        print(dumps(report, indent=2, sort_keys=True))
+        return
+    with open(args.compare, "r") as baseline_file:
+        baseline = loads(baseline_file.read())
+    if not compare(results, baseline["results"], args.tolerance):
+        sys_exit(1)
+
+
+if __name__ == "__main__":
+    main()
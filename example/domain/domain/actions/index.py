@@ -1,18 +1,32 @@
 # pylint: disable=unused-argument, pointless-string-statement
 
-import sqlite3
+from dataclasses import dataclass
+from typing import TypedDict
 from pantam import JSONResponse, PlainTextResponse
 
 
+@dataclass
+class NewUser:
+    first_name: str
+    last_name: str
+    email: str
+
+
+class UserChanges(TypedDict, total=False):
+    first_name: str
+    last_name: str
+    email: str
+
+
 class Index:
-    def __init__(self):
-        database = sqlite3.connect("db")
-        cursor = database.cursor()
-        cursor.execute(
-            """CREATE TABLE IF NOT EXISTS users
-            (uid text, first_name text, last_name text, email string)"""
-        )
-        database.commit()
+    def __init__(self, database):
+        self.database = database
+        with database.connection() as connection:
+            connection.execute(
+                """CREATE TABLE IF NOT EXISTS users
+                (uid text, first_name text, last_name text, email string)"""
+            )
+            connection.commit()
 
     """
     TRY THIS: curl --request GET 'http://localhost:5000'
@@ -20,10 +34,9 @@ class Index:
 
     def fetch_all(self, request):
         """Fetch all items"""
-        database = sqlite3.connect("db")
-        cursor = database.cursor()
-        cursor.execute("SELECT * FROM users")
-        return JSONResponse(cursor.fetchall())
+        with self.database.connection() as connection:
+            cursor = connection.execute("SELECT * FROM users")
+            return JSONResponse([tuple(user) for user in cursor.fetchall()])
 
     """
     TRY THIS: curl --request GET 'http://localhost:5000/1'
@@ -31,11 +44,11 @@ class Index:
 
     def fetch_single(self, request):
         """Fetch single item"""
-        database = sqlite3.connect("db")
-        cursor = database.cursor()
         uid = request.path_params["id"]
-        cursor.execute("SELECT * FROM users WHERE uid=?", (uid))
-        return JSONResponse(cursor.fetchone())
+        with self.database.connection() as connection:
+            cursor = connection.execute("SELECT * FROM users WHERE uid=?", (uid,))
+            user = cursor.fetchone()
+            return JSONResponse(None if user is None else tuple(user))
 
     """
     TRY THIS:
@@ -46,18 +59,13 @@ class Index:
     --data-urlencode 'email=homer@donut.me'
     """
 
-    async def create(self, request):
+    async def create(self, request, user: NewUser):
         """Create an item"""
-        database = sqlite3.connect("db")
-        cursor = database.cursor()
-        data = await request.form()
-        cursor.execute("SELECT COUNT(*) FROM users")
-        count = cursor.fetchone()[0]
-        cursor.execute(
+        count = (await self.database.fetch_one("SELECT COUNT(*) FROM users"))[0]
+        await self.database.execute(
             "INSERT INTO users VALUES (?,?,?,?)",
-            (count + 1, data["first_name"], data["last_name"], data["email"]),
+            (count + 1, user.first_name, user.last_name, user.email),
         )
-        database.commit()
         return PlainTextResponse("Created!")
 
     """
@@ -67,26 +75,20 @@ class Index:
     --data-urlencode 'last_name=Flanders'
     """
 
-    async def update(self, request):
+    async def update(self, request, changes: UserChanges):
         """Update an item"""
-        database = sqlite3.connect("db")
-        database.row_factory = sqlite3.Row
-        cursor = database.cursor()
         uid = request.path_params["id"]
-        cursor.execute("SELECT * FROM users WHERE uid=?", (uid))
-        user = cursor.fetchone()
+        user = await self.database.fetch_one("SELECT * FROM users WHERE uid=?", (uid,))
         if user is not None:
-            data = await request.form()
-            cursor.execute(
+            await self.database.execute(
                 "UPDATE users set first_name = ?, last_name = ?, email = ? WHERE uid=?",
                 (
-                    data.get("first_name", user["first_name"]),
-                    data.get("last_name", user["last_name"]),
-                    data.get("email", user["email"]),
+                    changes.get("first_name", user["first_name"]),
+                    changes.get("last_name", user["last_name"]),
+                    changes.get("email", user["email"]),
                     user["uid"],
                 ),
             )
-            database.commit()
             return PlainTextResponse("Updated!")
         else:
             return PlainTextResponse("User Not Found", status_code=404)
@@ -97,9 +99,8 @@ class Index:
 
     def delete(self, request):
         """Delete single item"""
-        database = sqlite3.connect("db")
-        cursor = database.cursor()
         uid = request.path_params["id"]
-        cursor.execute("DELETE FROM users WHERE uid=?", (uid))
-        database.commit()
+        with self.database.connection() as connection:
+            connection.execute("DELETE FROM users WHERE uid=?", (uid,))
+            connection.commit()
         return PlainTextResponse("Deleted!")
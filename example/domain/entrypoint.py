@@ -1,5 +1,11 @@
+from sqlite3 import Row
 from pantam import Pantam
+from pantam.services import SqlitePool
 
-pantam = Pantam(debug=True, actions_folder="domain/actions")
+pantam = Pantam(
+    debug=True,
+    actions_folder="domain/actions",
+    services={"database": SqlitePool("db", row_factory=Row)},
+)
 
 app = pantam.build()
@@ -1,18 +1,17 @@
 # pylint: disable=unused-argument, pointless-string-statement
 
-import sqlite3
-from pantam import JSONResponse, PlainTextResponse
+from pantam import PlainTextResponse, stream
 
 
 class Index:
-    def __init__(self):
-        database = sqlite3.connect("db")
-        cursor = database.cursor()
-        cursor.execute(
-            """CREATE TABLE IF NOT EXISTS cart
-            (product text, cost integer)"""
-        )
-        database.commit()
+    def __init__(self, database):
+        self.database = database
+        with database.connection() as connection:
+            connection.execute(
+                """CREATE TABLE IF NOT EXISTS cart
+                (product text, cost integer)"""
+            )
+            connection.commit()
 
     """
     TRY THIS:
@@ -24,23 +23,32 @@ class Index:
 
     async def set_add_product_to_cart(self, request):
         """Add product to cart"""
-        database = sqlite3.connect("db")
-        cursor = database.cursor()
         data = await request.form()
-        cursor.execute("INSERT INTO cart VALUES (?,?)", (data["product"], data["cost"]))
-        database.commit()
+        await self.database.execute(
+            "INSERT INTO cart VALUES (?,?)", (data["product"], data["cost"])
+        )
         return PlainTextResponse("Added Cart")
 
     """
     TRY THIS: curl --request GET 'http://localhost:5000/cart-contents/'
     """
 
+    @stream(array=True)
     def get_cart_contents(self, request):
-        """Get cart contents"""
-        database = sqlite3.connect("db")
-        cursor = database.cursor()
-        cursor.execute("SELECT * FROM cart")
-        return JSONResponse(cursor.fetchall())
+        """Stream cart contents a page at a time, the connection is returned
+        to the pool before the rows are sent"""
+        last_rowid = 0
+        while True:
+            with self.database.connection() as connection:
+                rows = connection.execute(
+                    """SELECT rowid, product, cost FROM cart
+                    WHERE rowid > ? ORDER BY rowid LIMIT 100""",
+                    (last_rowid,),
+                ).fetchall()
+            if not rows:
+                return
+            last_rowid = rows[-1][0]
+            yield from (row[1:] for row in rows)
 
     """
     TRY THIS: curl --request GET 'http://localhost:5000/cart-total/'
@@ -48,7 +56,6 @@ class Index:
 
     def get_cart_total(self, request):
         """Get cart total value"""
-        database = sqlite3.connect("db")
-        cursor = database.cursor()
-        cursor.execute("SELECT SUM(cost) FROM cart")
-        return PlainTextResponse(str(cursor.fetchone()[0]))
+        with self.database.connection() as connection:
+            cursor = connection.execute("SELECT SUM(cost) FROM cart")
+            return PlainTextResponse(str(cursor.fetchone()[0]))
@@ -1,5 +1,6 @@
 from pantam import Pantam
+from pantam.services import SqlitePool
 
-pantam = Pantam(debug=True)
+pantam = Pantam(debug=True, services={"database": SqlitePool("db")})
 
 app = pantam.build()
@@ -1,11 +1,56 @@
-from starlette import responses, requests
-from .pantam import Pantam, introspect_methods
+from typing import TYPE_CHECKING, Any, Dict, List
+from importlib import import_module
 
-Request = requests.Request
+# the `cache` and `coalesce` submodules would replace lazily loaded
+# decorators of the same name when they are imported, so load them now
+from .cache import cache
+from .coalesce import coalesce
 
-Response = responses.Response
-JSONResponse = responses.JSONResponse
-HTMLResponse = responses.HTMLResponse
-PlainTextResponse = responses.PlainTextResponse
-FileResponse = responses.FileResponse
-RedirectResponse = responses.RedirectResponse
+# public names and the modules they are loaded from on first use
+EXPORTS: Dict[str, str] = {
+    "Request": "starlette.requests",
+    "Response": "starlette.responses",
+    "HTMLResponse": "starlette.responses",
+    "PlainTextResponse": "starlette.responses",
+    "FileResponse": "starlette.responses",
+    "RedirectResponse": "starlette.responses",
+    "Pantam": "pantam.pantam",
+    "introspect_methods": "pantam.pantam",
+    "deadline": "pantam.deadlines",
+    "time_remaining": "pantam.deadlines",
+    "executor": "pantam.executors",
+    "JSONResponse": "pantam.encoding",
+    "JSONStreamResponse": "pantam.streaming",
+    "stream": "pantam.streaming",
+}
+
+__all__ = ["cache", "coalesce"] + list(EXPORTS)
+
+
+def __getattr__(name: str) -> Any:
+    """Import public names when they are first used"""
+    if name not in EXPORTS:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    value = getattr(import_module(EXPORTS[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> List[str]:
+    return sorted(set(globals()) | set(__all__))
+
+
+if TYPE_CHECKING:
+    from starlette.requests import Request
+    from starlette.responses import (
+        FileResponse,
+        HTMLResponse,
+        PlainTextResponse,
+        RedirectResponse,
+        Response,
+    )
+    from .pantam import Pantam, introspect_methods
+    from .deadlines import deadline, time_remaining
+    from .executors import executor
+    from .encoding import JSONResponse
+    from .streaming import JSONStreamResponse, stream
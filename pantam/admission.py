@@ -0,0 +1,163 @@
+"""
+Pantam admission control caps requests in flight, globally and per action,
+queues a bounded number of requests and rejects the rest with a 503
+"""
+
+from typing import Any, AsyncIterator, Callable, Deque, Dict, List, Optional
+from asyncio import CancelledError, Future, get_event_loop
+from collections import deque
+from time import monotonic
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, Response, StreamingResponse
+from .deadlines import ABANDONED_KEY
+
+LIMIT_ATTRIBUTE = "max_in_flight"
+
+
+class Limiter:
+    """In-flight cap with a bounded FIFO queue, only used from the event loop"""
+
+    def __init__(self, limit: int, queue_size: int) -> None:
+        self.limit = limit
+        self.queue_size = queue_size
+        self.in_flight = 0
+        self.waiters: Deque[Future] = deque()
+
+    async def acquire(self, timeout: float) -> bool:
+        """Take a slot, waiting up to `timeout` in the queue if it has room"""
+        if self.in_flight < self.limit and not self.waiters:
+            self.in_flight += 1
+            return True
+        if len(self.waiters) >= self.queue_size or timeout <= 0:
+            return False
+        loop = get_event_loop()
+        waiter = loop.create_future()
+        self.waiters.append(waiter)
+        timer = loop.call_later(
+            timeout, lambda: waiter.done() or waiter.set_result(False)
+        )
+        try:
+            return await waiter
+        except CancelledError:
+            # a slot handed over just before cancelling must be passed on
+            if waiter.done() and not waiter.cancelled() and waiter.result():
+                self.release()
+            raise
+        finally:
+            timer.cancel()
+            if waiter in self.waiters:
+                self.waiters.remove(waiter)
+
+    def release(self) -> None:
+        """Hand the slot to the next waiter, or free it"""
+        while self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(True)
+                return
+        self.in_flight -= 1
+
+
+def release(limiters: List[Limiter]) -> None:
+    for limiter in limiters:
+        limiter.release()
+
+
+class HeldIterator:
+    """Body of a streaming response that holds admission slots until it is
+    exhausted, fails or is closed, as streams do their work while sending"""
+
+    def __init__(self, iterator: AsyncIterator, limiters: List[Limiter]) -> None:
+        self.iterator = iterator
+        self.limiters: Optional[List[Limiter]] = limiters
+
+    def release(self) -> None:
+        if self.limiters is not None:
+            release(self.limiters)
+            self.limiters = None
+
+    def __aiter__(self) -> "HeldIterator":
+        return self
+
+    async def __anext__(self) -> Any:
+        try:
+            return await self.iterator.__anext__()
+        except BaseException:
+            self.release()
+            raise
+
+    async def aclose(self) -> None:
+        self.release()
+        if hasattr(self.iterator, "aclose"):
+            await self.iterator.aclose()
+
+
+class Admission:
+    def __init__(
+        self,
+        max_in_flight: Optional[int] = None,
+        max_queue: int = 100,
+        max_queue_time: float = 1.0,
+        retry_after: int = 1,
+    ) -> None:
+        self.max_queue = max_queue
+        self.max_queue_time = max_queue_time
+        self.retry_after = retry_after
+        self.limiter = (
+            None if max_in_flight is None else Limiter(max_in_flight, max_queue)
+        )
+        self.action_limiters: Dict[str, Limiter] = {}
+        self.rejected = 0
+
+    def get_limiter(self, action_obj: Any, tag: str) -> Optional[Limiter]:
+        """Get the limiter of an action with a `max_in_flight` class attribute"""
+        limit = getattr(action_obj, LIMIT_ATTRIBUTE, None)
+        if limit is None:
+            return None
+        if tag not in self.action_limiters:
+            self.action_limiters[tag] = Limiter(limit, self.max_queue)
+        return self.action_limiters[tag]
+
+    def reject(self) -> Response:
+        """Fail fast so clients can retry elsewhere or later"""
+        self.rejected += 1
+        return PlainTextResponse(
+            "Service Unavailable",
+            status_code=503,
+            headers={"Retry-After": str(self.retry_after)},
+        )
+
+    def wrap(self, endpoint: Callable, action_obj: Any, tag: str) -> Callable:
+        """Admit requests to an endpoint while its action and the app have room"""
+        limiters = [
+            limiter
+            for limiter in (self.get_limiter(action_obj, tag), self.limiter)
+            if limiter is not None
+        ]
+        if not limiters:
+            return endpoint
+
+        async def admitted_endpoint(request: Request) -> Response:
+            deadline = monotonic() + self.max_queue_time
+            acquired = []
+            try:
+                for limiter in limiters:
+                    if not await limiter.acquire(deadline - monotonic()):
+                        return self.reject()
+                    acquired.append(limiter)
+                response = await endpoint(request)
+                if isinstance(response, StreamingResponse):
+                    response.body_iterator = HeldIterator(
+                        response.body_iterator, acquired
+                    )
+                    acquired = []
+                return response
+            finally:
+                abandoned = request.scope.get(ABANDONED_KEY)
+                if abandoned is not None and not abandoned.done():
+                    # the method still runs after its deadline, hold its slots
+                    abandoned.add_done_callback(lambda _: release(acquired))
+                else:
+                    release(acquired)
+
+        return admitted_endpoint
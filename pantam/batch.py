@@ -0,0 +1,132 @@
+"""
+Pantam batches run several sub-requests, sent together in one request,
+concurrently through the app's routes
+"""
+
+from typing import Any, Dict, List, TypedDict
+from asyncio import Semaphore, gather
+from base64 import b64encode
+from starlette.types import ASGIApp
+from .encoding import dumps, loads
+from .subrequest import SubResponse, subrequest
+
+BATCH_VERBS = ("GET", "POST", "PATCH", "DELETE")
+
+# headers of the batch request that don't apply to its sub-requests
+SKIP_HEADERS = ("content-length", "content-type", "accept-encoding", "host")
+
+
+class BatchRequest(TypedDict):
+    method: str
+    path: str
+    body: bytes
+    headers: Dict[str, str]
+
+
+class BatchError(ValueError):
+    """Batch request body is not a valid list of sub-requests"""
+
+
+def parse_batch(
+    data: Any, headers: Dict[str, str], path: str, max_requests: int
+) -> List[BatchRequest]:
+    """Validate sub-requests, passing them the batch request's headers"""
+    if not isinstance(data, list):
+        raise BatchError("Expected a list of requests.")
+    if len(data) > max_requests:
+        raise BatchError("Too many requests, the limit is %d." % max_requests)
+    shared = {
+        name: value for name, value in headers.items() if name not in SKIP_HEADERS
+    }
+    requests: List[BatchRequest] = []
+    for index, item in enumerate(data):
+        if not isinstance(item, dict):
+            raise BatchError("Request %d is not an object." % index)
+        method = str(item.get("method", "GET")).upper()
+        sub_path = item.get("path")
+        if method not in BATCH_VERBS:
+            raise BatchError("Request %d has an invalid method." % index)
+        if not isinstance(sub_path, str) or not sub_path.startswith("/"):
+            raise BatchError("Request %d has an invalid path." % index)
+        if sub_path.partition("?")[0].rstrip("/") == path.rstrip("/"):
+            raise BatchError("Request %d is a batch request." % index)
+        extra_headers = item.get("headers", {})
+        if not isinstance(extra_headers, dict):
+            raise BatchError("Request %d has invalid headers." % index)
+        sub_headers = dict(shared)
+        sub_headers.update(
+            {str(name).lower(): str(value) for name, value in extra_headers.items()}
+        )
+        body = item.get("body")
+        if body is None:
+            raw_body = b""
+        elif isinstance(body, str):
+            raw_body = body.encode("utf-8")
+        else:
+            raw_body = dumps(body)
+            sub_headers.setdefault("content-type", "application/json")
+        requests.append(
+            {
+                "method": method,
+                "path": sub_path,
+                "body": raw_body,
+                "headers": sub_headers,
+            }
+        )
+    return requests
+
+
+def is_json(body: bytes) -> bool:
+    try:
+        loads(body)
+        return True
+    except ValueError:
+        return False
+
+
+def encode_response(response: SubResponse) -> bytes:
+    """Encode a sub-response, embedding valid JSON bodies as they are, text
+    bodies as strings and anything else base64 encoded"""
+    headers = dict(response["headers"])
+    content_type = headers.get("content-type", "")
+    body = response["body"]
+    encoding = b""
+    if content_type.startswith("application/json") and body and is_json(body):
+        encoded = body
+    else:
+        try:
+            encoded = dumps(body.decode("utf-8"))
+        except UnicodeDecodeError:
+            encoded = dumps(b64encode(body).decode("ascii"))
+            encoding = b',"encoding":"base64"'
+    return b'{"status":%d,"headers":%s,"body":%s%s}' % (
+        response["status"],
+        dumps(headers),
+        encoded,
+        encoding,
+    )
+
+
+async def run_batch(
+    app: ASGIApp, requests: List[BatchRequest], concurrency: int
+) -> bytes:
+    """Run sub-requests with at most `concurrency` at a time, in request order"""
+    semaphore = Semaphore(concurrency)
+
+    async def run_request(request: BatchRequest) -> bytes:
+        async with semaphore:
+            try:
+                response = await subrequest(
+                    app,
+                    request["method"],
+                    request["path"],
+                    request["body"],
+                    request["headers"],
+                    nested=True,
+                )
+            except Exception:
+                response = {"status": 500, "headers": [], "body": b""}
+        return encode_response(response)
+
+    responses = await gather(*[run_request(request) for request in requests])
+    return b"[" + b",".join(responses) + b"]"
@@ -0,0 +1,238 @@
+"""
+Pantam response cache stores GET responses in a byte bounded LRU and
+drops an action's entries when one of its other routes changes data
+"""
+
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    TypedDict,
+)
+from collections import OrderedDict
+from time import monotonic
+
+if TYPE_CHECKING:
+    from starlette.requests import Request
+    from starlette.responses import Response
+
+POLICY_ATTRIBUTE = "cache_policy"
+
+ENTRY_OVERHEAD = 200
+
+
+class CachePolicy(TypedDict):
+    ttl: float
+    query_params: Optional[List[str]]
+    headers: List[str]
+
+
+class CacheEntry(TypedDict):
+    tag: str
+    expires: float
+    size: int
+    status_code: int
+    raw_headers: List[Tuple[bytes, bytes]]
+    body: bytes
+
+
+class CacheStats(TypedDict):
+    hits: int
+    misses: int
+    evictions: int
+    invalidations: int
+    entries: int
+    bytes: int
+
+
+def cache(ttl: float = 60, query_params: List[str] = None, headers: List[str] = None):
+    """Cache responses of an action's GET methods, or of a single GET method.
+    Responses vary on all query params unless a list is given."""
+    policy: CachePolicy = {
+        "ttl": ttl,
+        "query_params": query_params,
+        "headers": [] if headers is None else [name.lower() for name in headers],
+    }
+
+    def decorator(target: Any) -> Any:
+        setattr(target, POLICY_ATTRIBUTE, policy)
+        return target
+
+    return decorator
+
+
+def get_policy(action_obj: Any, method: str) -> Optional[CachePolicy]:
+    """Read cache policy from an action method, falling back to its class"""
+    policy = getattr(getattr(action_obj, method), POLICY_ATTRIBUTE, None)
+    if policy is None:
+        policy = getattr(action_obj, POLICY_ATTRIBUTE, None)
+    return policy
+
+
+def has_cached_routes(action_obj: Any) -> bool:
+    """Check if an action, or any of its methods, has a cache policy"""
+    if getattr(action_obj, POLICY_ATTRIBUTE, None) is not None:
+        return True
+    action_class = type(action_obj)
+    return any(
+        getattr(getattr(action_class, name, None), POLICY_ATTRIBUTE, None) is not None
+        for name in dir(action_class)
+    )
+
+
+def vary_key(
+    request: "Request", query_params: Optional[List[str]], headers: List[str]
+) -> Tuple:
+    """Build key from path params and varying query params and headers"""
+    if query_params is None:
+        query: Tuple = (request.scope["query_string"],)
+    else:
+        query = tuple(request.query_params.get(name) for name in query_params)
+    return (
+        tuple(sorted(request.path_params.items())),
+        query,
+        tuple(request.headers.get(name) for name in headers),
+    )
+
+
+def make_response(
+    status_code: int, body: bytes, raw_headers: List[Tuple[bytes, bytes]]
+) -> "Response":
+    """Create a response with a status, body and encoded headers"""
+    # the decorators are imported with `pantam`, Starlette only when serving
+    from starlette.responses import Response  # pylint: disable=import-outside-toplevel
+
+    response = Response(status_code=status_code)
+    response.body = body
+    response.raw_headers = list(raw_headers)
+    return response
+
+
+def copy_response(response: "Response") -> "Response":
+    """Create a response with the same status, headers and body"""
+    return make_response(response.status_code, response.body, response.raw_headers)
+
+
+class ResponseCache:
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.entries: "OrderedDict[Tuple, CacheEntry]" = OrderedDict()
+        self.tags: Dict[str, Set[Tuple]] = {}
+        self.generations: Dict[str, int] = {}
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def get(self, key: Tuple) -> Optional[CacheEntry]:
+        """Get a live entry and mark it recently used"""
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if entry["expires"] < monotonic():
+            self.remove(key)
+            return None
+        self.entries.move_to_end(key)
+        return entry
+
+    def put(self, key: Tuple, tag: str, ttl: float, response: "Response") -> None:
+        """Store response, evicting least recently used entries to fit"""
+        size = (
+            len(response.body)
+            + sum(len(name) + len(value) for name, value in response.raw_headers)
+            + ENTRY_OVERHEAD
+        )
+        if size > self.max_bytes:
+            return
+        if key in self.entries:
+            self.remove(key)
+        while self.size + size > self.max_bytes:
+            self.remove(next(iter(self.entries)))
+            self.evictions += 1
+        self.entries[key] = {
+            "tag": tag,
+            "expires": monotonic() + ttl,
+            "size": size,
+            "status_code": response.status_code,
+            "raw_headers": list(response.raw_headers),
+            "body": response.body,
+        }
+        self.tags.setdefault(tag, set()).add(key)
+        self.size += size
+
+    def remove(self, key: Tuple) -> None:
+        """Drop a single entry"""
+        entry = self.entries.pop(key)
+        self.size -= entry["size"]
+        keys = self.tags[entry["tag"]]
+        keys.discard(key)
+        if not keys:
+            del self.tags[entry["tag"]]
+
+    def invalidate(self, tag: str) -> None:
+        """Drop all entries of an action, including responses still in flight"""
+        self.generations[tag] = self.generations.get(tag, 0) + 1
+        for key in list(self.tags.get(tag, ())):
+            self.remove(key)
+            self.invalidations += 1
+
+    def stats(self) -> CacheStats:
+        """Get cache counters"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "invalidations": self.invalidations,
+            "entries": len(self.entries),
+            "bytes": self.size,
+        }
+
+    def wrap(
+        self, endpoint: Callable, action_obj: Any, tag: str, method: str, verb: str
+    ) -> Callable:
+        """Cache GET endpoints with a policy, other verbs invalidate cached actions"""
+        if verb != "get":
+            if not has_cached_routes(action_obj):
+                return endpoint
+
+            async def invalidating_endpoint(request: "Request") -> "Response":
+                response = await endpoint(request)
+                if response.status_code < 400:
+                    self.invalidate(tag)
+                return response
+
+            return invalidating_endpoint
+
+        policy = get_policy(action_obj, method)
+        if policy is None:
+            return endpoint
+
+        async def cached_endpoint(request: "Request") -> "Response":
+            key = (tag, method) + vary_key(
+                request, policy["query_params"], policy["headers"]
+            )
+            entry = self.get(key)
+            if entry is not None:
+                self.hits += 1
+                return make_response(
+                    entry["status_code"], entry["body"], entry["raw_headers"]
+                )
+            self.misses += 1
+            generation = self.generations.get(tag, 0)
+            response = await endpoint(request)
+            if (
+                response.status_code == 200
+                and generation == self.generations.get(tag, 0)
+                and response.background is None
+                and hasattr(response, "body")
+            ):
+                self.put(key, tag, policy["ttl"], response)
+            return response
+
+        return cached_endpoint
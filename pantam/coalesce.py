@@ -0,0 +1,104 @@
+"""
+Pantam request coalescing lets identical concurrent GET requests share
+a single run of the action method
+"""
+
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple, TypedDict
+from .cache import copy_response, vary_key
+
+if TYPE_CHECKING:
+    from asyncio import Future
+    from starlette.requests import Request
+    from starlette.responses import Response
+
+POLICY_ATTRIBUTE = "coalesce_policy"
+
+
+class CoalescePolicy(TypedDict):
+    query_params: Optional[List[str]]
+    headers: List[str]
+
+
+class UnsharedResponse(Exception):
+    """Leader request was cancelled or returned a response that cannot be shared"""
+
+
+def coalesce(query_params: List[str] = None, headers: List[str] = None):
+    """Share one method call between identical in-flight GET requests.
+    Requests match on all query params unless a list is given."""
+    policy: CoalescePolicy = {
+        "query_params": query_params,
+        "headers": [] if headers is None else [name.lower() for name in headers],
+    }
+
+    def decorator(target: Any) -> Any:
+        setattr(target, POLICY_ATTRIBUTE, policy)
+        return target
+
+    return decorator
+
+
+def get_policy(action_obj: Any, method: str) -> Optional[CoalescePolicy]:
+    """Read coalesce policy from an action method, falling back to its class"""
+    policy = getattr(getattr(action_obj, method), POLICY_ATTRIBUTE, None)
+    if policy is None:
+        policy = getattr(action_obj, POLICY_ATTRIBUTE, None)
+    return policy
+
+
+def fail(flight: "Future", error: BaseException) -> None:
+    """Pass an error to waiting requests, without warnings if there are none"""
+    flight.set_exception(error)
+    flight.exception()
+
+
+class Coalescer:
+    def __init__(self) -> None:
+        self.flights: Dict[Tuple, "Future"] = {}
+        self.coalesced = 0
+
+    def wrap(
+        self, endpoint: Callable, action_obj: Any, tag: str, method: str, verb: str
+    ) -> Callable:
+        """Coalesce GET endpoints with a coalesce policy"""
+        policy = get_policy(action_obj, method) if verb == "get" else None
+        if policy is None:
+            return endpoint
+        # the decorator is imported with `pantam`, asyncio only when serving
+        from asyncio import (  # pylint: disable=import-outside-toplevel
+            get_event_loop,
+            shield,
+        )
+
+        async def coalesced_endpoint(request: "Request") -> "Response":
+            key = (tag, method) + vary_key(
+                request, policy["query_params"], policy["headers"]
+            )
+            flight = self.flights.get(key)
+            if flight is not None:
+                self.coalesced += 1
+                try:
+                    return copy_response(await shield(flight))
+                except UnsharedResponse:
+                    return await endpoint(request)
+
+            flight = get_event_loop().create_future()
+            self.flights[key] = flight
+            try:
+                response = await endpoint(request)
+            except Exception as error:
+                fail(flight, error)
+                raise
+            except BaseException:
+                fail(flight, UnsharedResponse())
+                raise
+            finally:
+                del self.flights[key]
+
+            if response.background is None and hasattr(response, "body"):
+                flight.set_result(response)
+            else:
+                fail(flight, UnsharedResponse())
+            return response
+
+        return coalesced_endpoint
@@ -0,0 +1,274 @@
+"""
+Pantam compression encodes responses with zstd, brotli or gzip, whichever
+the client prefers and is installed, and caches compressed bodies
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypedDict
+from collections import OrderedDict
+from gzip import compress as gzip_compress
+from hashlib import blake2b
+from threading import Lock
+from zlib import MAX_WBITS, Z_FINISH, Z_SYNC_FLUSH, compressobj
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:
+    brotli = None  # type: ignore
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None  # type: ignore
+
+# content types that are already compressed
+SKIP_CONTENT_TYPES = (
+    "image/",
+    "video/",
+    "audio/",
+    "font/woff",
+    "application/zip",
+    "application/gzip",
+    "application/x-gzip",
+    "application/zstd",
+    "application/octet-stream",
+    "text/event-stream",
+)
+
+ENTRY_OVERHEAD = 100
+
+
+class CompressionStats(TypedDict):
+    hits: int
+    misses: int
+    entries: int
+    bytes: int
+
+
+def get_encoders() -> Dict[str, Callable[[bytes], bytes]]:
+    """Get installed encoders, most preferred first"""
+    encoders: Dict[str, Callable[[bytes], bytes]] = {}
+    if zstandard is not None:
+        encoders["zstd"] = zstandard.ZstdCompressor(level=3).compress
+    if brotli is not None:
+        encoders["br"] = lambda body: brotli.compress(body, quality=4)
+    encoders["gzip"] = lambda body: gzip_compress(body, compresslevel=6)
+    return encoders
+
+
+def negotiate(accept_encoding: str, encodings: List[str]) -> Optional[str]:
+    """Pick the encoding with the highest quality, ties go to the first listed"""
+    qualities: Dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        qualities[name.strip()] = quality
+    best: Optional[str] = None
+    best_quality = 0.0
+    for encoding in encodings:
+        quality = qualities.get(encoding, qualities.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def is_compressible(headers: Headers) -> bool:
+    """Skip encoded responses and compressed content types"""
+    if "content-encoding" in headers:
+        return False
+    content_type = headers.get("content-type", "")
+    return not content_type.startswith(SKIP_CONTENT_TYPES) or content_type.startswith(
+        "image/svg"
+    )
+
+
+class CompressionCache:
+    """LRU of compressed bodies keyed on encoding and content hash, shared by
+    the event loop and worker threads compressing large bodies"""
+
+    def __init__(self, max_bytes: int) -> None:
+        self.max_bytes = max_bytes
+        self.lock = Lock()
+        self.size = 0
+        self.entries: "OrderedDict[Tuple[str, bytes], bytes]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: Tuple[str, bytes]) -> Optional[bytes]:
+        """Get a compressed body and mark it recently used"""
+        with self.lock:
+            body = self.entries.get(key)
+            if body is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return body
+
+    def put(self, key: Tuple[str, bytes], body: bytes) -> None:
+        """Store a compressed body, evicting least recently used bodies to fit"""
+        size = len(body) + ENTRY_OVERHEAD
+        with self.lock:
+            if size > self.max_bytes or key in self.entries:
+                return
+            while self.size + size > self.max_bytes:
+                _, evicted = self.entries.popitem(last=False)
+                self.size -= len(evicted) + ENTRY_OVERHEAD
+            self.entries[key] = body
+            self.size += size
+
+    def stats(self) -> CompressionStats:
+        """Get cache counters"""
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "entries": len(self.entries),
+            "bytes": self.size,
+        }
+
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 500,
+        thread_size: int = 65536,
+        cache: Optional[CompressionCache] = None,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.thread_size = thread_size
+        self.encoders = get_encoders()
+        self.encodings = list(self.encoders)
+        self.cache = CompressionCache(8 * 1024 * 1024) if cache is None else cache
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        accept_encoding = Headers(scope=scope).get("accept-encoding", "")
+        encoding = negotiate(accept_encoding, self.encodings)
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        responder = CompressionResponder(
+            self,
+            encoding,
+            negotiate(accept_encoding, ["gzip"]) is not None,
+            scope["method"] == "GET",
+        )
+        await responder(scope, receive, send)
+
+    def compress(self, encoding: str, body: bytes, cacheable: bool) -> bytes:
+        """Compress a body, reusing the cached result for identical bodies"""
+        if not cacheable or self.cache.max_bytes <= 0:
+            return self.encoders[encoding](body)
+        key = (encoding, blake2b(body, digest_size=16).digest())
+        compressed = self.cache.get(key)
+        if compressed is None:
+            compressed = self.encoders[encoding](body)
+            self.cache.put(key, compressed)
+        return compressed
+
+
+class CompressionResponder:
+    def __init__(
+        self,
+        middleware: CompressionMiddleware,
+        encoding: str,
+        accepts_gzip: bool,
+        cacheable: bool,
+    ) -> None:
+        self.middleware = middleware
+        self.encoding = encoding
+        self.accepts_gzip = accepts_gzip
+        self.cacheable = cacheable
+        self.send: Send = unattached_send
+        self.start: Optional[Message] = None
+        self.stream: Any = None
+        self.passthrough = False
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        self.send = send
+        await self.middleware.app(scope, receive, self.send_compressed)
+
+    async def send_compressed(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            # wait for the first body message to decide on compression
+            self.start = message
+            return
+        if message["type"] != "http.response.body" or self.passthrough:
+            await self.send(message)
+            return
+        if self.start is not None:
+            await self.send_start(message)
+            return
+        await self.send_chunk(message)
+
+    async def send_start(self, message: Message) -> None:
+        """Send headers with the first body message, compressing if worthwhile"""
+        start: Message = self.start  # type: ignore
+        self.start = None
+        headers = MutableHeaders(raw=list(start["headers"]))
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if (
+            not is_compressible(headers)
+            or (more_body and not self.accepts_gzip)
+            or (not more_body and len(body) < self.middleware.minimum_size)
+        ):
+            self.passthrough = True
+            await self.send(start)
+            await self.send(message)
+            return
+
+        headers.add_vary_header("Accept-Encoding")
+        if more_body:
+            # streams are compressed with gzip, flushed after each chunk
+            self.stream = compressobj(6, wbits=MAX_WBITS | 16)
+            headers["Content-Encoding"] = "gzip"
+            del headers["Content-Length"]
+            await self.send(dict(start, headers=headers.raw))
+            await self.send_chunk(message)
+            return
+
+        middleware = self.middleware
+        if len(body) >= middleware.thread_size:
+            body = await run_in_threadpool(
+                middleware.compress, self.encoding, body, self.cacheable
+            )
+        else:
+            body = middleware.compress(self.encoding, body, self.cacheable)
+        headers["Content-Encoding"] = self.encoding
+        headers["Content-Length"] = str(len(body))
+        await self.send(dict(start, headers=headers.raw))
+        await self.send({"type": "http.response.body", "body": body})
+
+    async def send_chunk(self, message: Message) -> None:
+        """Compress a chunk of a streamed response"""
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+        if len(body) >= self.middleware.thread_size:
+            chunk = await run_in_threadpool(self.compress_chunk, body, more_body)
+        else:
+            chunk = self.compress_chunk(body, more_body)
+        await self.send(
+            {"type": "http.response.body", "body": chunk, "more_body": more_body}
+        )
+
+    def compress_chunk(self, body: bytes, more_body: bool) -> bytes:
+        """Compress a chunk, finishing the stream on the last one"""
+        chunk = self.stream.compress(body)
+        return chunk + self.stream.flush(Z_SYNC_FLUSH if more_body else Z_FINISH)
+
+
+async def unattached_send(message: Message) -> None:
+    raise RuntimeError("send awaitable not set")
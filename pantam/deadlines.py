@@ -0,0 +1,87 @@
+"""
+Pantam deadlines bound how long a request may take, cancelling async
+action methods and abandoning sync ones with a 504
+"""
+
+from typing import Any, Callable, Optional
+from asyncio import TimeoutError as AsyncTimeoutError, ensure_future, shield, wait_for
+from inspect import iscoroutinefunction
+from time import monotonic
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, Response
+
+POLICY_ATTRIBUTE = "deadline_policy"
+
+DEADLINE_KEY = "pantam.deadline"
+
+# the task of a sync method still running after its deadline
+ABANDONED_KEY = "pantam.abandoned"
+
+
+def deadline(seconds: float) -> Callable:
+    """Set the deadline of an action class or method, in seconds"""
+
+    def decorator(target: Any) -> Any:
+        setattr(target, POLICY_ATTRIBUTE, seconds)
+        return target
+
+    return decorator
+
+
+def get_policy(action_obj: Any, method: str) -> Optional[float]:
+    """Read deadline from an action method, falling back to its class"""
+    seconds = getattr(getattr(action_obj, method), POLICY_ATTRIBUTE, None)
+    if seconds is None:
+        seconds = getattr(action_obj, POLICY_ATTRIBUTE, None)
+    return seconds
+
+
+def time_remaining(request: Request) -> Optional[float]:
+    """Seconds left before the request's deadline, None without a deadline.
+    Pass it on as the timeout of downstream calls."""
+    expires = request.scope.get(DEADLINE_KEY)
+    if expires is None:
+        return None
+    return max(expires - monotonic(), 0.0)
+
+
+class Deadlines:
+    def __init__(self, default: Optional[float] = None) -> None:
+        self.default = default
+        self.exceeded = 0
+        self.abandoned = 0
+
+    def wrap(self, endpoint: Callable, action_obj: Any, method: str) -> Callable:
+        """Time out endpoints of methods with a deadline, or the app default"""
+        seconds = get_policy(action_obj, method)
+        if seconds is None:
+            seconds = self.default
+        if seconds is None:
+            return endpoint
+        handler = getattr(action_obj, method)
+        # sync methods keep running in their thread after the deadline
+        cancellable = iscoroutinefunction(handler)
+
+        async def deadline_endpoint(request: Request) -> Response:
+            now = monotonic()
+            expires = min(now + seconds, request.scope.get(DEADLINE_KEY, now + seconds))
+            request.scope[DEADLINE_KEY] = expires
+            task = ensure_future(endpoint(request))
+            try:
+                waiting = task if cancellable else shield(task)
+                return await wait_for(waiting, expires - now)
+            except AsyncTimeoutError:
+                if monotonic() < expires:
+                    # raised by the method itself, e.g. a downstream timeout
+                    raise
+                self.exceeded += 1
+                if not cancellable:
+                    self.abandoned += 1
+                    # nobody awaits the task any more, retrieve its exception
+                    task.add_done_callback(
+                        lambda task: task.cancelled() or task.exception()
+                    )
+                    request.scope[ABANDONED_KEY] = task
+                return PlainTextResponse("Gateway Timeout", status_code=504)
+
+        return deadline_endpoint
@@ -0,0 +1,79 @@
+"""
+Pantam draining stops taking new requests on shutdown and gives the ones in
+flight, streams included, a grace period to finish
+"""
+
+from typing import Awaitable, Callable, List, Tuple
+from asyncio import gather, sleep
+from time import monotonic
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from .subrequest import SUBREQUEST_KEY
+
+POLL_INTERVAL = 0.05
+
+UNAVAILABLE_BODY = b"Service Unavailable"
+
+# drain callbacks of the apps started in this process, see `drain_all`
+drain_callbacks: List[Callable[[], Awaitable]] = []
+
+
+class Draining:
+    """Counts requests in flight and rejects new ones with a 503 once draining"""
+
+    def __init__(self, app: ASGIApp, retry_after: int = 1) -> None:
+        self.app = app
+        self.draining = False
+        self.in_flight = 0
+        self.rejected = 0
+        self.reject_messages: Tuple[Message, Message] = (
+            {
+                "type": "http.response.start",
+                "status": 503,
+                "headers": [
+                    (b"content-type", b"text/plain; charset=utf-8"),
+                    (b"content-length", str(len(UNAVAILABLE_BODY)).encode("latin-1")),
+                    (b"retry-after", str(retry_after).encode("latin-1")),
+                    (b"connection", b"close"),
+                ],
+            },
+            {"type": "http.response.body", "body": UNAVAILABLE_BODY},
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # sub-requests belong to a batch request that is already counted
+        if scope["type"] != "http" or SUBREQUEST_KEY in scope:
+            await self.app(scope, receive, send)
+            return
+        if self.draining:
+            self.rejected += 1
+            for message in self.reject_messages:
+                await send(message)
+            return
+        # streaming responses return once the last chunk is sent
+        self.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
+
+    async def wait(self, timeout: float) -> int:
+        """Wait up to `timeout` for requests in flight, returns how many are left"""
+        deadline = monotonic() + timeout
+        while self.in_flight and monotonic() < deadline:
+            await sleep(min(POLL_INTERVAL, deadline - monotonic()))
+        return self.in_flight
+
+
+def add_drain(callback: Callable[[], Awaitable]) -> None:
+    """Drain an app when the server is asked to stop"""
+    drain_callbacks.append(callback)
+
+
+def remove_drain(callback: Callable[[], Awaitable]) -> None:
+    if callback in drain_callbacks:
+        drain_callbacks.remove(callback)
+
+
+async def drain_all() -> None:
+    """Drain every app started in this process at the same time"""
+    await gather(*[callback() for callback in list(drain_callbacks)])
@@ -0,0 +1,93 @@
+"""
+Pantam encoding serialises response data to JSON bytes, and parses
+request bodies, with orjson when it is installed and the standard
+library otherwise
+"""
+
+from typing import Any
+from dataclasses import asdict, is_dataclass
+from datetime import date, datetime, time
+from decimal import Decimal
+from json import dumps as json_dumps, loads as json_loads
+from math import isfinite
+from sqlite3 import Row
+from uuid import UUID
+from starlette.responses import JSONResponse as StarletteJSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore
+
+
+def default(value: Any) -> Any:
+    """Convert values JSON does not support, e.g. rows, dataclasses and dates"""
+    if isinstance(value, Row):
+        return dict(zip(value.keys(), value))
+    if is_dataclass(value) and not isinstance(value, type):
+        return asdict(value)
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, (Decimal, UUID)):
+        return str(value)
+    if hasattr(value, "_asdict"):
+        return value._asdict()
+    if hasattr(value, "keys") and hasattr(value, "__getitem__"):
+        return {key: value[key] for key in value.keys()}
+    if hasattr(value, "__iter__") and not isinstance(value, (str, bytes)):
+        return list(value)
+    raise TypeError("Object of type %s is not JSON serializable" % type(value).__name__)
+
+
+def replace_nan(value: Any) -> Any:
+    """Replace NaN and infinite floats with None, as orjson does"""
+    if isinstance(value, float) and not isfinite(value):
+        return None
+    if isinstance(value, dict):
+        return {key: replace_nan(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [replace_nan(item) for item in value]
+    return value
+
+
+def json_stdlib_dumps(value: Any) -> str:
+    return json_dumps(
+        value,
+        default=lambda item: replace_nan(default(item)),
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    )
+
+
+def dumps(value: Any) -> bytes:
+    """Serialise a value to compact UTF-8 JSON, NaN and infinity become null"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(value, default=default, option=orjson.OPT_NON_STR_KEYS)
+        except TypeError:
+            # e.g. integers above 64 bits, which the standard library supports
+            pass
+    try:
+        return json_stdlib_dumps(value).encode("utf-8")
+    except ValueError:
+        # NaN or infinity, which is rare enough to only look for on failure
+        return json_stdlib_dumps(replace_nan(value)).encode("utf-8")
+
+
+def loads(data: bytes) -> Any:
+    """Parse JSON, raises ValueError on invalid input"""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json_loads(data)
+
+
+class JSONResponse(StarletteJSONResponse):
+    """JSON response encoded with orjson when installed. Rows, dataclasses and
+    dates are converted automatically, bytes are sent as already encoded JSON."""
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, (bytes, bytearray, memoryview)):
+            return bytes(content)
+        return dumps(content)
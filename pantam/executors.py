@@ -0,0 +1,226 @@
+"""
+Pantam executors decide where sync action methods run: the shared
+thread pool, a dedicated thread pool, a process pool or inline on
+the event loop
+"""
+
+from typing import Any, Callable, Dict, List, Literal, Optional, TypedDict
+from asyncio import get_event_loop
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextvars import copy_context
+from functools import partial
+from inspect import iscoroutinefunction, ismethod
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import Response
+
+POLICY = Literal["default", "thread", "process", "inline"]
+
+POLICY_ATTRIBUTE = "executor_policy"
+
+
+class ExecutorPolicy(TypedDict, total=False):
+    kind: POLICY
+    max_workers: int
+
+
+class RequestData(TypedDict):
+    method: str
+    url: str
+    path_params: Dict[str, Any]
+    query_params: Dict[str, str]
+    headers: Dict[str, str]
+    body: bytes
+
+
+def executor(kind: POLICY, max_workers: int = None) -> Callable:
+    """Set the executor policy of an action class or method"""
+    policy: ExecutorPolicy = {"kind": kind}
+    if max_workers is not None:
+        policy["max_workers"] = max_workers
+
+    def decorator(target: Any) -> Any:
+        setattr(target, POLICY_ATTRIBUTE, policy)
+        return target
+
+    return decorator
+
+
+def get_policy(action_obj: Any, method: str) -> ExecutorPolicy:
+    """Read executor policy from an action method, falling back to its class"""
+    policy = getattr(getattr(action_obj, method), POLICY_ATTRIBUTE, None)
+    if policy is None:
+        policy = getattr(action_obj, POLICY_ATTRIBUTE, None)
+    if policy is None:
+        return {"kind": "default"}
+    if isinstance(policy, str):
+        return {"kind": policy}  # type: ignore
+    return policy
+
+
+async def read_request_data(request: Request) -> RequestData:
+    """Copy the picklable parts of a request"""
+    return {
+        "method": request.method,
+        "url": str(request.url),
+        "path_params": dict(request.path_params),
+        "query_params": dict(request.query_params),
+        "headers": dict(request.headers),
+        "body": await request.body(),
+    }
+
+
+class ThreadLanes:
+    """A bounded set of single thread executors. Each caller is pinned to the
+    least busy lane, so its work always resumes on the same thread."""
+
+    def __init__(self, size: int, thread_name_prefix: str = "pantam-lane") -> None:
+        self.size = max(size, 1)
+        self.thread_name_prefix = thread_name_prefix
+        self.lanes: List[ThreadPoolExecutor] = []
+        self.users: Dict[ThreadPoolExecutor, int] = {}
+
+    def acquire(self) -> ThreadPoolExecutor:
+        """Get the least busy lane, creating lanes on demand up to `size`"""
+        if len(self.lanes) < self.size and all(self.users.values()):
+            lane = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix=self.thread_name_prefix
+            )
+            self.lanes.append(lane)
+            self.users[lane] = 0
+        lane = min(self.lanes, key=lambda lane: self.users[lane])
+        self.users[lane] += 1
+        return lane
+
+    def release(self, lane: ThreadPoolExecutor) -> None:
+        if lane in self.users:
+            self.users[lane] -= 1
+
+    def shutdown(self) -> None:
+        for lane in self.lanes:
+            lane.shutdown(wait=False)
+        self.lanes = []
+        self.users = {}
+
+
+class Executors:
+    def __init__(
+        self,
+        thread_pool_size: int = 4,
+        process_pool_size: Optional[int] = None,
+        default_pool_size: Optional[int] = None,
+        stream_pool_size: Optional[int] = None,
+    ) -> None:
+        self.thread_pool_size = thread_pool_size
+        self.process_pool_size = process_pool_size
+        self.default_pool_size = default_pool_size
+        self.stream_lanes = ThreadLanes(
+            thread_pool_size if stream_pool_size is None else stream_pool_size,
+            "pantam-stream",
+        )
+        self.thread_pools: Dict[str, ThreadPoolExecutor] = {}
+        self.process_pool: Optional[ProcessPoolExecutor] = None
+        self.default_pool: Optional[ThreadPoolExecutor] = None
+
+    def get_thread_pool(self, name: str, policy: ExecutorPolicy) -> Executor:
+        """Get dedicated thread pool, creating it on first use"""
+        if name not in self.thread_pools:
+            self.thread_pools[name] = ThreadPoolExecutor(
+                max_workers=policy.get("max_workers", self.thread_pool_size),
+                thread_name_prefix="pantam-%s" % name,
+            )
+        return self.thread_pools[name]
+
+    def get_process_pool(self) -> Executor:
+        """Get shared process pool, creating it on first use"""
+        if self.process_pool is None:
+            self.process_pool = ProcessPoolExecutor(max_workers=self.process_pool_size)
+        return self.process_pool
+
+    def wrap(
+        self,
+        action_obj: Any,
+        method: str,
+        transform: Optional[Callable[[Callable], Callable]] = None,
+    ) -> Callable:
+        """Create an async endpoint that runs an action method per its policy.
+        `transform` wraps the method where it runs, except in process pools.
+        Raises TypeError for process policies on methods that aren't static."""
+        handler = getattr(action_obj, method)
+        policy = get_policy(action_obj, method)
+        kind = policy["kind"]
+        if transform is not None and (
+            iscoroutinefunction(handler) or kind != "process"
+        ):
+            handler = transform(handler)
+        if iscoroutinefunction(handler):
+            return handler
+
+        if kind == "inline":
+
+            async def inline_endpoint(request: Request) -> Response:
+                return handler(request)
+
+            endpoint = inline_endpoint
+
+        elif kind == "thread":
+            # methods with their own policy get their own pool
+            name = type(action_obj).__name__
+            if hasattr(getattr(action_obj, method), POLICY_ATTRIBUTE):
+                name = "%s.%s" % (name, method)
+            pool = self.get_thread_pool(name, policy)
+
+            async def thread_endpoint(request: Request) -> Response:
+                context = copy_context()
+                return await get_event_loop().run_in_executor(
+                    pool, partial(context.run, handler, request)
+                )
+
+            endpoint = thread_endpoint
+
+        elif kind == "process":
+            # bound methods would pickle the action, services included
+            if ismethod(handler):
+                raise TypeError(
+                    "`%s` must be a static method to run in a process pool." % method
+                )
+
+            async def process_endpoint(request: Request) -> Response:
+                data = await read_request_data(request)
+                return await get_event_loop().run_in_executor(
+                    self.get_process_pool(), handler, data
+                )
+
+            endpoint = process_endpoint
+
+        else:
+
+            async def default_endpoint(request: Request) -> Response:
+                return await run_in_threadpool(handler, request)
+
+            endpoint = default_endpoint
+
+        endpoint.__name__ = method
+        return endpoint
+
+    def start(self) -> None:
+        """Resize the shared thread pool used by default policy methods"""
+        if self.default_pool_size is not None:
+            self.default_pool = ThreadPoolExecutor(
+                max_workers=self.default_pool_size, thread_name_prefix="pantam"
+            )
+            get_event_loop().set_default_executor(self.default_pool)
+
+    def shutdown(self) -> None:
+        """Stop all pools"""
+        pools: List[Executor] = list(self.thread_pools.values())
+        if self.process_pool is not None:
+            pools.append(self.process_pool)
+        if self.default_pool is not None:
+            pools.append(self.default_pool)
+        for pool in pools:
+            pool.shutdown(wait=False)
+        self.thread_pools = {}
+        self.process_pool = None
+        self.default_pool = None
+        self.stream_lanes.shutdown()
@@ -0,0 +1,141 @@
+"""
+Pantam health checks answer liveness and readiness probes in a raw ASGI
+layer in front of the middleware stack and routing
+"""
+
+from typing import Any, Callable, Dict, List, Optional, Tuple, TypedDict
+from asyncio import Future, ensure_future, gather, shield, wait_for
+from inspect import iscoroutinefunction
+from time import monotonic
+from starlette.concurrency import run_in_threadpool
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+from .encoding import dumps
+
+HEALTH_PATH = "/healthz"
+
+READY_PATH = "/readyz"
+
+HEALTH_BODY = "👋".encode("utf-8")
+
+
+class ReadinessResult(TypedDict):
+    ready: bool
+    checks: Dict[str, str]
+
+
+def get_check_name(check: Callable) -> str:
+    """Name a check after its function"""
+    return getattr(check, "__name__", type(check).__name__)
+
+
+async def run_check(check: Callable[[], Any], timeout: float) -> str:
+    """Run a sync or async check, returns "ok" or the reason it failed"""
+    try:
+        if iscoroutinefunction(check):
+            result = await wait_for(check(), timeout)
+        else:
+            result = await wait_for(run_in_threadpool(check), timeout)
+        return "ok" if result is not False else "failed"
+    except Exception as error:
+        reason = type(error).__name__
+        return "%s: %s" % (reason, error) if str(error) else reason
+
+
+class Readiness:
+    """Runs readiness checks concurrently, at most once per `interval`"""
+
+    def __init__(
+        self,
+        checks: Dict[str, Callable[[], Any]],
+        is_ready: Callable[[], bool],
+        interval: float = 1.0,
+        timeout: float = 2.0,
+    ) -> None:
+        self.checks = checks
+        self.is_ready = is_ready
+        self.interval = interval
+        self.timeout = timeout
+        self.result: Optional[ReadinessResult] = None
+        self.checked = 0.0
+        self.running: Optional[Future] = None
+
+    async def run_checks(self) -> ReadinessResult:
+        """Run all checks at the same time"""
+        names = list(self.checks)
+        outcomes = await gather(
+            *[run_check(self.checks[name], self.timeout) for name in names]
+        )
+        checks = dict(zip(names, outcomes))
+        result: ReadinessResult = {
+            "ready": all(outcome == "ok" for outcome in outcomes),
+            "checks": checks,
+        }
+        self.result = result
+        self.checked = monotonic()
+        return result
+
+    async def check(self) -> ReadinessResult:
+        """Get the cached result, concurrent probes share one run of the checks"""
+        if not self.is_ready():
+            return {"ready": False, "checks": {}}
+        if self.result is not None and monotonic() - self.checked < self.interval:
+            return self.result
+        if self.running is None or self.running.done():
+            self.running = ensure_future(self.run_checks())
+        return await shield(self.running)
+
+
+class HealthCheck:
+    def __init__(self, app: ASGIApp, readiness: Readiness) -> None:
+        self.app = app
+        self.readiness = readiness
+        self.health_messages: Tuple[Message, Message] = (
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"text/plain; charset=utf-8"),
+                    (b"content-length", str(len(HEALTH_BODY)).encode("latin-1")),
+                ],
+            },
+            {"type": "http.response.body", "body": HEALTH_BODY},
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and scope["method"] in ("GET", "HEAD"):
+            path = scope["path"]
+            if path == HEALTH_PATH:
+                for message in self.health_messages:
+                    await send(message)
+                return
+            if path == READY_PATH:
+                await self.send_readiness(send)
+                return
+        await self.app(scope, receive, send)
+
+    async def send_readiness(self, send: Send) -> None:
+        """Send readiness as JSON, 503 if any check fails"""
+        result = await self.readiness.check()
+        body = dumps(result)
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200 if result["ready"] else 503,
+                "headers": [
+                    (b"content-type", b"application/json"),
+                    (b"content-length", str(len(body)).encode("latin-1")),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
+
+
+def collect_checks(
+    checks: List[Callable[[], Any]], services: Dict[str, Any]
+) -> Dict[str, Callable[[], Any]]:
+    """Name configured checks, adding the `check` method of each service"""
+    named = {get_check_name(check): check for check in checks}
+    for name, service in services.items():
+        if callable(getattr(service, "check", None)):
+            named[name] = service.check
+    return named
@@ -0,0 +1,21 @@
+"""
+Pantam hooks call optional user callbacks that may be sync or async
+"""
+
+from typing import Any, Callable, Optional
+from inspect import iscoroutinefunction
+
+
+async def call(func: Optional[Callable[[], Any]]) -> None:
+    """Call a sync or async callback, if there is one"""
+    if func is None:
+        return
+    if iscoroutinefunction(func):
+        await func()
+    else:
+        func()
+
+
+async def call_hook(target: Any, name: str) -> None:
+    """Call an optional sync or async lifecycle method"""
+    await call(getattr(target, name, None))
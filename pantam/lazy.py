@@ -0,0 +1,61 @@
+"""
+Pantam lazy actions defer importing and instantiating an action class
+until the first request to one of its routes
+"""
+
+from typing import Any, Callable, Optional
+from asyncio import Future, ensure_future, shield
+from threading import Lock
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import Response
+from .hooks import call_hook
+
+
+class LazyAction:
+    def __init__(self, name: str, loader: Callable[[], Any]) -> None:
+        self.name = name
+        self.loader = loader
+        self.lock = Lock()
+        self.action_obj: Optional[Any] = None
+        self.loading: Optional[Future] = None
+
+    def resolve(self) -> Any:
+        """Load the action object once, concurrent callers wait for the first"""
+        if self.action_obj is None:
+            with self.lock:
+                if self.action_obj is None:
+                    action_obj = self.loader()
+                    if action_obj is None:
+                        raise RuntimeError("Unable to load `%s` action." % self.name)
+                    self.action_obj = action_obj
+        return self.action_obj
+
+    async def start(self) -> Any:
+        """Load the action off the event loop and run its startup hook"""
+        try:
+            action_obj = await run_in_threadpool(self.resolve)
+            await call_hook(action_obj, "on_startup")
+            return action_obj
+        except:
+            self.loading = None
+            raise
+
+    async def load(self) -> Any:
+        """Start the action once, concurrent first requests wait for it"""
+        if self.loading is None:
+            self.loading = ensure_future(self.start())
+        return await shield(self.loading)
+
+    def endpoint(self, method: str, wrap: Callable[[Any, str], Callable]) -> Callable:
+        """Create an endpoint that loads the action on first request"""
+        wrapped: Optional[Callable] = None
+
+        async def lazy_endpoint(request: Request) -> Response:
+            nonlocal wrapped
+            if wrapped is None:
+                wrapped = wrap(await self.load(), method)
+            return await wrapped(request)
+
+        lazy_endpoint.__name__ = method
+        return lazy_endpoint
@@ -0,0 +1,88 @@
+"""
+Pantam route manifests record the routes of each action file so that
+application boot can skip method introspection and URL building
+"""
+
+from typing import Dict, List, Optional, Tuple, TypedDict
+from json import dumps, loads
+from os import fdopen, replace, stat
+from os.path import basename, dirname, join
+from tempfile import mkstemp
+
+MANIFEST_VERSION = 1
+
+
+class ManifestRoute(TypedDict):
+    method: str
+    verb: str
+    url: str
+
+
+class ManifestAction(TypedDict):
+    file_name: str
+    module_name: str
+    class_name: str
+    mtime: int
+    size: int
+    routes: List[ManifestRoute]
+
+
+class Manifest(TypedDict):
+    version: int
+    actions_folder: str
+    actions_index: str
+    actions: List[ManifestAction]
+
+
+def stat_action_file(actions_folder: str, file_name: str) -> Tuple[int, int]:
+    """Get modification time and size of an action file"""
+    file_stat = stat(join(actions_folder, file_name))
+    return file_stat.st_mtime_ns, file_stat.st_size
+
+
+def load_manifest(file_path: str) -> Optional[Manifest]:
+    """Read manifest file, returns None if missing or unreadable"""
+    try:
+        with open(file_path, "r") as manifest_file:
+            manifest: Manifest = loads(manifest_file.read())
+        if manifest.get("version") != MANIFEST_VERSION:
+            return None
+        return manifest
+    except (OSError, ValueError):
+        return None
+
+
+def dump_manifest(file_path: str, manifest: Manifest) -> None:
+    """Write manifest file, replacing it at once so workers that rewrite a stale
+    manifest at the same time never read or leave a partial file"""
+    descriptor, temp_path = mkstemp(
+        ".tmp", basename(file_path) + ".", dirname(file_path) or "."
+    )
+    with fdopen(descriptor, "w") as manifest_file:
+        manifest_file.write(dumps(manifest, indent=2))
+    replace(temp_path, file_path)
+
+
+def is_fresh(
+    manifest: Manifest, actions_folder: str, actions_index: str, file_names: List[str]
+) -> bool:
+    """Check manifest against config and the current action files"""
+    if (
+        manifest["actions_folder"] != actions_folder
+        or manifest["actions_index"] != actions_index
+    ):
+        return False
+    recorded: Dict[str, ManifestAction] = {
+        action["file_name"]: action for action in manifest["actions"]
+    }
+    if set(recorded) != set(file_names):
+        return False
+    try:
+        for file_name in file_names:
+            mtime, size = stat_action_file(actions_folder, file_name)
+            action = recorded[file_name]
+            if action["mtime"] != mtime or action["size"] != size:
+                return False
+    except OSError:
+        return False
+    return True
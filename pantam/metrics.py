@@ -0,0 +1,254 @@
+"""
+Pantam metrics count requests, status codes and latency per action route
+and render them in the Prometheus text format
+"""
+
+from typing import Callable, Dict, List, Optional, Tuple, TypedDict
+from bisect import bisect_left
+from json import dumps, loads
+from os import getpid, getppid, kill, listdir, remove, replace
+from os.path import join
+from time import perf_counter
+from starlette.requests import Request
+from starlette.responses import Response
+
+BUCKETS: Tuple[float, ...] = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class RouteSnapshot(TypedDict):
+    statuses: Dict[str, int]
+    in_flight: int
+    buckets: List[int]
+    sum: float
+
+
+class Snapshot(TypedDict):
+    pid: int
+    ppid: int
+    routes: Dict[str, RouteSnapshot]
+    counters: Dict[str, float]
+
+
+class RouteMetrics:
+    """Counters for a single route, only updated from the event loop thread"""
+
+    __slots__ = ("statuses", "in_flight", "buckets", "sum")
+
+    def __init__(self) -> None:
+        self.statuses: Dict[int, int] = {}
+        self.in_flight = 0
+        self.buckets = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+
+    def observe(self, status_code: int, duration: float) -> None:
+        """Record a finished request"""
+        self.statuses[status_code] = self.statuses.get(status_code, 0) + 1
+        self.buckets[bisect_left(BUCKETS, duration)] += 1
+        self.sum += duration
+
+    def snapshot(self) -> RouteSnapshot:
+        """Copy counters"""
+        return {
+            "statuses": {str(code): count for code, count in self.statuses.items()},
+            "in_flight": self.in_flight,
+            "buckets": list(self.buckets),
+            "sum": self.sum,
+        }
+
+
+def is_alive(pid: int) -> bool:
+    """Check if a worker process is still running"""
+    try:
+        kill(pid, 0)
+        return True
+    except OSError:
+        return False
+
+
+def merge(snapshots: List[Snapshot]) -> Snapshot:
+    """Sum snapshots of several workers"""
+    merged: Snapshot = {
+        "pid": getpid(),
+        "ppid": getppid(),
+        "routes": {},
+        "counters": {},
+    }
+    for snapshot in snapshots:
+        for label, route in snapshot["routes"].items():
+            total = merged["routes"].setdefault(
+                label,
+                {
+                    "statuses": {},
+                    "in_flight": 0,
+                    "buckets": [0] * (len(BUCKETS) + 1),
+                    "sum": 0.0,
+                },
+            )
+            for code, count in route["statuses"].items():
+                total["statuses"][code] = total["statuses"].get(code, 0) + count
+            total["in_flight"] += route["in_flight"]
+            total["buckets"] = [
+                a + b for a, b in zip(total["buckets"], route["buckets"])
+            ]
+            total["sum"] += route["sum"]
+        for name, value in snapshot["counters"].items():
+            merged["counters"][name] = merged["counters"].get(name, 0) + value
+    return merged
+
+
+def format_labels(label: str, **extra: str) -> str:
+    """Turn an `action:method` label into Prometheus labels"""
+    action, method = label.split(":", 1)
+    labels = [("action", action), ("method", method)] + list(extra.items())
+    return "{%s}" % ",".join('%s="%s"' % (name, value) for name, value in labels)
+
+
+def render(snapshot: Snapshot) -> str:
+    """Render a snapshot in the Prometheus text format"""
+    routes = sorted(snapshot["routes"].items())
+    lines = [
+        "# HELP pantam_requests_total Requests handled per route and status code.",
+        "# TYPE pantam_requests_total counter",
+    ]
+    for label, route in routes:
+        for code, count in sorted(route["statuses"].items()):
+            lines.append(
+                "pantam_requests_total%s %d"
+                % (format_labels(label, status=code), count)
+            )
+    lines.extend(
+        [
+            "# HELP pantam_requests_in_flight Requests currently being handled per route.",
+            "# TYPE pantam_requests_in_flight gauge",
+        ]
+    )
+    for label, route in routes:
+        lines.append(
+            "pantam_requests_in_flight%s %d"
+            % (format_labels(label), route["in_flight"])
+        )
+    lines.extend(
+        [
+            "# HELP pantam_request_duration_seconds Request latency per route.",
+            "# TYPE pantam_request_duration_seconds histogram",
+        ]
+    )
+    for label, route in routes:
+        cumulative = 0
+        for bound, count in zip(BUCKETS + (float("inf"),), route["buckets"]):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(
+                "pantam_request_duration_seconds_bucket%s %d"
+                % (format_labels(label, le=le), cumulative)
+            )
+        lines.append(
+            "pantam_request_duration_seconds_sum%s %s"
+            % (format_labels(label), repr(route["sum"]))
+        )
+        lines.append(
+            "pantam_request_duration_seconds_count%s %d"
+            % (format_labels(label), cumulative)
+        )
+    for name, value in sorted(snapshot["counters"].items()):
+        lines.extend(
+            ["# TYPE pantam_%s counter" % name, "pantam_%s %s" % (name, value)]
+        )
+    return "\n".join(lines) + "\n"
+
+
+class Metrics:
+    def __init__(
+        self,
+        metrics_dir: Optional[str] = None,
+        counters: Optional[Callable[[], Dict[str, float]]] = None,
+    ) -> None:
+        self.metrics_dir = metrics_dir
+        self.counters = counters
+        self.routes: Dict[str, RouteMetrics] = {}
+
+    def wrap(self, endpoint: Callable, action: str, method: str) -> Callable:
+        """Record count, status and latency of an endpoint"""
+        route = self.routes.setdefault("%s:%s" % (action, method), RouteMetrics())
+
+        async def measured_endpoint(request: Request) -> Response:
+            route.in_flight += 1
+            start = perf_counter()
+            status_code = 500
+            try:
+                response = await endpoint(request)
+                status_code = response.status_code
+                return response
+            finally:
+                route.in_flight -= 1
+                route.observe(status_code, perf_counter() - start)
+
+        return measured_endpoint
+
+    def snapshot(self) -> Snapshot:
+        """Copy counters of this worker"""
+        return {
+            "pid": getpid(),
+            "ppid": getppid(),
+            "routes": {label: route.snapshot() for label, route in self.routes.items()},
+            "counters": {} if self.counters is None else self.counters(),
+        }
+
+    def write_snapshot(self) -> None:
+        """Share counters with the other workers via the metrics folder"""
+        if self.metrics_dir is None:
+            return
+        file_path = join(self.metrics_dir, "%d.json" % getpid())
+        with open(file_path + ".tmp", "w") as snapshot_file:
+            snapshot_file.write(dumps(self.snapshot()))
+        replace(file_path + ".tmp", file_path)
+
+    def remove_snapshot(self) -> None:
+        """Stop sharing counters, e.g. when the worker shuts down"""
+        if self.metrics_dir is None:
+            return
+        try:
+            remove(join(self.metrics_dir, "%d.json" % getpid()))
+        except OSError:
+            pass
+
+    def collect(self, own: Optional[Snapshot] = None) -> Snapshot:
+        """Get counters of this worker, merged with snapshots of the other live
+        workers of the same server. Files of exited workers are removed."""
+        if own is None:
+            own = self.snapshot()
+        if self.metrics_dir is None:
+            return own
+        snapshots = [own]
+        own_file = "%d.json" % own["pid"]
+        for file_name in listdir(self.metrics_dir):
+            if not file_name.endswith(".json") or file_name == own_file:
+                continue
+            file_path = join(self.metrics_dir, file_name)
+            try:
+                with open(file_path, "r") as snapshot_file:
+                    snapshot: Snapshot = loads(snapshot_file.read())
+                if not is_alive(snapshot["pid"]):
+                    remove(file_path)
+                # a different parent means an earlier run, or a reused pid
+                elif snapshot.get("ppid") == own["ppid"]:
+                    snapshots.append(snapshot)
+            except (OSError, ValueError, KeyError):
+                continue
+        return merge(snapshots)
+
+    def render(self, own: Optional[Snapshot] = None) -> str:
+        """Render all counters in the Prometheus text format"""
+        return render(self.collect(own))
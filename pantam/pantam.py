@@ -1,13 +1,75 @@
-from typing import Any, Callable, Final, List, Literal, Optional, TypedDict, Union
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Dict,
+    Final,
+    List,
+    Literal,
+    Optional,
+    TypedDict,
+    Union,
+)
+from ast import AsyncFunctionDef, ClassDef, FunctionDef, parse
+from asyncio import (
+    Future,
+    Lock,
+    TimeoutError as AsyncTimeoutError,
+    ensure_future,
+    gather,
+    sleep,
+    wait_for,
+)
+from concurrent.futures import ThreadPoolExecutor
+from json import loads
 from functools import reduce
-from importlib import import_module
-from inspect import getmembers, isfunction
+from importlib import import_module, invalidate_caches
+from inspect import getmembers, isfunction, signature
 from re import match, sub
+from sys import modules
 from os import listdir
+from os.path import isfile, join
+from time import perf_counter
 from starlette.applications import Starlette
-from starlette.responses import PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+from starlette.middleware import Middleware
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse, Response
 from starlette.routing import Route
+from .admission import Admission
+from .batch import BatchError, parse_batch, run_batch
+from .cache import ResponseCache
+from .coalesce import Coalescer
+from .compression import CompressionCache, CompressionMiddleware
+from .deadlines import Deadlines
+from .draining import Draining, add_drain, remove_drain
+from .executors import Executors
+from .health import HealthCheck, Readiness, collect_checks
+from .hooks import call, call_hook
+from .metrics import Metrics
+from .profiling import Profiler
+from .lazy import LazyAction
+from .manifest import (
+    MANIFEST_VERSION,
+    Manifest,
+    dump_manifest,
+    is_fresh,
+    load_manifest,
+    stat_action_file,
+)
+from .reload import (
+    FileStats,
+    Watcher,
+    add_reload_signal,
+    diff_stats,
+    remove_reload_signal,
+    stat_action_files,
+)
+from .routing import ActionRouter
+from .schemas import compile_schema
 from .services import Logger
+from .streaming import wrap_stream
+from .subrequest import subrequest
 
 
 class Config(TypedDict):
@@ -18,8 +80,49 @@ class Config(TypedDict):
     dev_port: int
     port: int
     reload: Optional[bool]
+    manifest: Optional[str]
+    lazy: bool
+    warm_actions: List[str]
+    thread_pool_size: int
+    process_pool_size: Optional[int]
+    default_pool_size: Optional[int]
+    stream_pool_size: Optional[int]
+    cache_max_bytes: int
+    services: Dict[str, Any]
+    on_startup: Optional[Callable]
+    warmup: List[str]
+    log_format: str
+    log_queue_size: int
+    log_overflow: str
+    metrics: bool
+    metrics_dir: Optional[str]
+    profile_token: Optional[str]
+    profile_rate: float
+    profile_dir: Optional[str]
+    profile_limit: int
+    batch: bool
+    batch_concurrency: int
+    batch_max_requests: int
+    compression: bool
+    compression_min_size: int
+    compression_cache_bytes: int
+    middleware: List[Middleware]
+    max_in_flight: Optional[int]
+    max_queue: int
+    max_queue_time: float
+    retry_after: int
+    deadline: Optional[float]
+    ready_checks: List[Callable]
+    ready_interval: float
+    ready_timeout: float
+    reload_interval: float
+    import_workers: int
+    drain_timeout: float
+    shutdown_timeout: float
 
 
+METRICS_INTERVAL = 5
+
 VERB = Literal["get", "post", "patch", "delete"]
 
 
@@ -36,6 +139,10 @@ class ActionResource(TypedDict, total=False):
     action_class: Callable[[], Any]
     action_obj: Any
     routes: List[ActionRoute]
+    lazy_action: LazyAction
+    bound_routes: List[Route]
+    import_time: float
+    init_time: float
 
 
 class Methods(TypedDict):
@@ -55,39 +162,45 @@ INDI_RES_RE = r"^(fetch_single|update|delete|do\w*)$"
 CUSTOM_METHOD_RE = r"^(get|set|do)\w*$"
 
 
+def sort_methods(method_names: List[str]) -> Methods:
+    """Map method names to method dictionary"""
+    methods: Methods = {
+        "get": [name for name in method_names if match(GET_METHOD_RE, name)],
+        "post": [name for name in method_names if match(POST_METHOD_RE, name)],
+        "patch": [name for name in method_names if match(PATCH_METHOD_RE, name)],
+        "delete": [name for name in method_names if match(DELETE_METHOD_RE, name)],
+    }
+    return methods
+
+
 def introspect_methods(action_class: Callable[[], Any]) -> Methods:
     """Map action class methods to method dictionary"""
 
     def predicate(attribute: Any) -> bool:
         return isfunction(attribute)
 
-    methods: Methods = {
-        "get": list(
-            filter(
-                lambda x: match(GET_METHOD_RE, x),
-                map(lambda x: x[0], getmembers(action_class, predicate)),
-            )
-        ),
-        "post": list(
-            filter(
-                lambda x: match(POST_METHOD_RE, x),
-                map(lambda x: x[0], getmembers(action_class, predicate)),
-            )
-        ),
-        "patch": list(
-            filter(
-                lambda x: match(PATCH_METHOD_RE, x),
-                map(lambda x: x[0], getmembers(action_class, predicate)),
-            )
-        ),
-        "delete": list(
-            filter(
-                lambda x: match(DELETE_METHOD_RE, x),
-                map(lambda x: x[0], getmembers(action_class, predicate)),
-            )
-        ),
-    }
-    return methods
+    return sort_methods([name for name, _ in getmembers(action_class, predicate)])
+
+
+def get_module_path(file_name: str) -> str:
+    """Get the dotted module path of an action file in the actions folder"""
+    return file_name[: -len(".py")].replace("/", ".")
+
+
+def scan_methods(file_path: str, class_name: str) -> Methods:
+    """Map action class methods to method dictionary without importing the file.
+    Only methods defined in the class body are found, not inherited ones."""
+    with open(file_path, "r") as action_file:
+        tree = parse(action_file.read(), file_path)
+    method_names: List[str] = []
+    for node in tree.body:
+        if isinstance(node, ClassDef) and node.name == class_name:
+            method_names = [
+                item.name
+                for item in node.body
+                if isinstance(item, (FunctionDef, AsyncFunctionDef))
+            ]
+    return sort_methods(sorted(method_names))
 
 
 class Pantam:
@@ -100,6 +213,45 @@ class Pantam:
         dev_port=5000,
         port=5000,
         reload=None,
+        manifest=None,
+        lazy=False,
+        warm_actions=None,
+        thread_pool_size=4,
+        process_pool_size=None,
+        default_pool_size=None,
+        stream_pool_size=None,
+        cache_max_bytes=32 * 1024 * 1024,
+        services=None,
+        on_startup=None,
+        warmup=None,
+        log_format="text",
+        log_queue_size=10000,
+        log_overflow="drop",
+        metrics=False,
+        metrics_dir=None,
+        profile_token=None,
+        profile_rate=0.0,
+        profile_dir=None,
+        profile_limit=50,
+        batch=False,
+        batch_concurrency=10,
+        batch_max_requests=50,
+        compression=False,
+        compression_min_size=500,
+        compression_cache_bytes=8 * 1024 * 1024,
+        middleware=None,
+        max_in_flight=None,
+        max_queue=100,
+        max_queue_time=1.0,
+        retry_after=1,
+        deadline=None,
+        ready_checks=None,
+        ready_interval=1.0,
+        ready_timeout=2.0,
+        reload_interval=1.0,
+        import_workers=4,
+        drain_timeout=30.0,
+        shutdown_timeout=10.0,
     ) -> None:
         self.config: Config = {
             "actions_folder": actions_folder,
@@ -109,10 +261,65 @@ class Pantam:
             "dev_port": dev_port,
             "port": port,
             "reload": reload,
+            "manifest": manifest,
+            "lazy": lazy,
+            "warm_actions": [] if warm_actions is None else warm_actions,
+            "thread_pool_size": thread_pool_size,
+            "process_pool_size": process_pool_size,
+            "default_pool_size": default_pool_size,
+            "stream_pool_size": stream_pool_size,
+            "cache_max_bytes": cache_max_bytes,
+            "services": {} if services is None else services,
+            "on_startup": on_startup,
+            "warmup": [] if warmup is None else warmup,
+            "log_format": log_format,
+            "log_queue_size": log_queue_size,
+            "log_overflow": log_overflow,
+            "metrics": metrics,
+            "metrics_dir": metrics_dir,
+            "profile_token": profile_token,
+            "profile_rate": profile_rate,
+            "profile_dir": profile_dir,
+            "profile_limit": profile_limit,
+            "batch": batch,
+            "batch_concurrency": batch_concurrency,
+            "batch_max_requests": batch_max_requests,
+            "compression": compression,
+            "compression_min_size": compression_min_size,
+            "compression_cache_bytes": compression_cache_bytes,
+            "middleware": [] if middleware is None else middleware,
+            "max_in_flight": max_in_flight,
+            "max_queue": max_queue,
+            "max_queue_time": max_queue_time,
+            "retry_after": retry_after,
+            "deadline": deadline,
+            "ready_checks": [] if ready_checks is None else ready_checks,
+            "ready_interval": ready_interval,
+            "ready_timeout": ready_timeout,
+            "reload_interval": reload_interval,
+            "import_workers": import_workers,
+            "drain_timeout": drain_timeout,
+            "shutdown_timeout": shutdown_timeout,
         }
-        self.logger: Final[Logger] = Logger()
+        self.logger: Final[Logger] = Logger(log_format, log_queue_size, log_overflow)
         self.actions: List[ActionResource] = []
         self.routes: List[Route] = []
+        self.executors = Executors()
+        self.cache = ResponseCache(cache_max_bytes)
+        self.coalescer = Coalescer()
+        self.admission = Admission()
+        self.deadlines = Deadlines()
+        self.metrics = Metrics()
+        self.metrics_task: Optional[Future] = None
+        self.profiler = Profiler()
+        self.compression_cache = CompressionCache(compression_cache_bytes)
+        self.app: Optional[Starlette] = None
+        self.router: Optional[ActionRouter] = None
+        self.action_stats: FileStats = {}
+        self.watcher: Optional[Watcher] = None
+        self.reload_lock = Lock()
+        self.draining: Optional[Draining] = None
+        self.ready = False
 
     def get_config(self) -> Config:
         """Get Pantam app config"""
@@ -123,20 +330,27 @@ class Pantam:
         self.config = config
 
     def read_actions_folder(self) -> List[str]:
-        """Read action files from actions folder"""
+        """Read action files from actions folder and its subpackages, sorted"""
         config = self.get_config()
         files: List[str] = []
 
-        def predicate(file_name: str):
-            return ".py" in file_name and "__init__" not in file_name
+        def read_folder(folder: str, prefix: str) -> None:
+            for name in listdir(folder):
+                path = join(folder, name)
+                if name.endswith(".py") and name != "__init__.py":
+                    files.append(prefix + name)
+                elif not name.startswith(("_", ".")) and isfile(
+                    join(path, "__init__.py")
+                ):
+                    read_folder(path, "%s%s/" % (prefix, name))
 
         try:
-            files.extend(filter(predicate, listdir(config["actions_folder"])))
+            read_folder(config["actions_folder"], "")
         except:
             self.logger.error(
                 "Unable to read actions folder! Check `actions_folder` config setting."
             )
-        return files
+        return sorted(files)
 
     def get_actions(self) -> List[ActionResource]:
         """Get Pantam actions"""
@@ -185,34 +399,70 @@ class Pantam:
             " -> ".join((column_format("GET", 6), "/healthz [health check endpoint]",))
         )
 
+        routes_to_log.append(
+            " -> ".join((column_format("GET", 6), "/readyz [readiness endpoint]",))
+        )
+
+        if self.get_config()["metrics"]:
+            routes_to_log.append(
+                " -> ".join((column_format("GET", 6), "/metrics [metrics endpoint]",))
+            )
+
+        if self.get_config()["batch"]:
+            routes_to_log.append(
+                " -> ".join((column_format("POST", 6), "/_batch [batch endpoint]",))
+            )
+
+        if self.profiler.enabled:
+            routes_to_log.append(
+                " -> ".join(
+                    (column_format("GET", 6), "/_profiles/ [profiles endpoint]",)
+                )
+            )
+
         self.logger.info("\n".join(routes_to_log))
 
     def discover_actions(self) -> List[ActionResource]:
         """Parse methods from action files"""
-        action_files = self.read_actions_folder()
-        actions: List[ActionResource] = []
-        for file_name in action_files:
-            module_name = file_name.replace("_", "-").replace(".py", "")
-            class_name = module_name.replace("-", " ").title().replace(" ", "")
-            actions.append(
-                {
-                    "file_name": file_name,
-                    "module_name": module_name,
-                    "class_name": class_name,
-                    "routes": [],
-                }
-            )
+        actions = list(map(self.make_action, self.read_actions_folder()))
         self.actions = actions
         return actions
 
+    def make_action(self, file_name: str) -> ActionResource:
+        """Name the module and class of an action file, e.g. "shop/order_items.py"
+        is the "shop/order-items" module with an `OrderItems` class"""
+        module_name = file_name.replace("_", "-").replace(".py", "")
+        class_name = (
+            module_name.rpartition("/")[2].replace("-", " ").title().replace(" ", "")
+        )
+        return {
+            "file_name": file_name,
+            "module_name": module_name,
+            "class_name": class_name,
+            "routes": [],
+        }
+
     def import_action_module(
-        self, module_name: str, class_name: str
+        self, module_name: str, class_name: str, fresh: bool = False
     ) -> Union[Callable[[], Any], None]:
-        """Load an action file"""
+        """Load an action file, into a new module object if `fresh` so requests
+        in flight keep the globals of the module they started with"""
         try:
             actions_folder = self.get_config()["actions_folder"]
             module_path = actions_folder.replace("/", ".")
-            action_module: Any = import_module("%s.%s" % (module_path, module_name))
+            full_name = "%s.%s" % (module_path, module_name)
+            action_module: Any
+            if fresh:
+                invalidate_caches()
+                previous = modules.pop(full_name, None)
+                try:
+                    action_module = import_module(full_name)
+                except:
+                    if previous is not None:
+                        modules[full_name] = previous
+                    raise
+            else:
+                action_module = import_module(full_name)
             action_class: Any = getattr(action_module, class_name)
             return action_class
         except:
@@ -221,30 +471,131 @@ class Pantam:
             )
             return None
 
+    def instantiate_action(self, action_class: Callable[..., Any]) -> Any:
+        """Create action object, passing services named in its constructor"""
+        services = self.get_config()["services"]
+        if not services:
+            return action_class()
+        parameters = signature(action_class).parameters
+        return action_class(
+            **{
+                name: service
+                for name, service in services.items()
+                if name in parameters
+            }
+        )
+
+    def import_action(
+        self, action: ActionResource, fresh: bool = False
+    ) -> ActionResource:
+        """Import an action class, timing the import"""
+        start = perf_counter()
+        action_class = self.import_action_module(
+            get_module_path(action["file_name"]), action["class_name"], fresh
+        )
+        action["import_time"] = perf_counter() - start
+        if action_class is not None:
+            action["action_class"] = action_class
+        return action
+
+    def construct_action(self, action: ActionResource) -> ActionResource:
+        """Instantiate an imported action class, timing the constructor"""
+        if "action_class" not in action:
+            return action
+        try:
+            start = perf_counter()
+            action["action_obj"] = self.instantiate_action(action["action_class"])
+            action["init_time"] = perf_counter() - start
+        except:
+            self.logger.error(
+                "Unable to instantiate `%s` action class." % action["class_name"]
+            )
+        return action
+
+    def load_action(
+        self, action: ActionResource, fresh: bool = False
+    ) -> ActionResource:
+        """Import and instantiate an action class, timing both"""
+        return self.construct_action(self.import_action(action, fresh))
+
     def load_actions(self) -> None:
-        """Import and instantiate action classes"""
+        """Import and instantiate action classes, deferred in lazy mode"""
+        config = self.get_config()
         actions = self.get_actions()
+        eager: List[ActionResource] = []
+        for action in actions:
+            if config["lazy"] and action["module_name"] not in config["warm_actions"]:
+                action["lazy_action"] = LazyAction(
+                    action["class_name"],
+                    lambda action=action: self.load_action(action).get("action_obj"),
+                )
+            else:
+                eager.append(action)
+
+        workers = min(config["import_workers"], len(eager))
+        if workers <= 1:
+            for action in eager:
+                self.import_action(action)
+        else:
+            # imports that wait on I/O overlap, constructors stay on this thread
+            # so services and objects bound to it are created where they are used
+            with ThreadPoolExecutor(
+                workers, thread_name_prefix="pantam-import"
+            ) as pool:
+                list(pool.map(self.import_action, eager))
+        for action in eager:
+            self.construct_action(action)
+        self.actions = actions
+
+    def log_load_times(self) -> None:
+        """Print import and construction times of loaded actions, slowest first"""
+        loaded = [action for action in self.actions if "import_time" in action]
+        if len(loaded) == 0:
+            return
+
+        def total_time(action: ActionResource) -> float:
+            return action["import_time"] + action.get("init_time", 0.0)
+
+        longest_file_name = reduce(max, map(lambda z: len(z["file_name"]), loaded), 0)
+        times_to_log: List[str] = ["Action Load Times:\n"]
+        for action in sorted(loaded, key=total_time, reverse=True):
+            times_to_log.append(
+                " -> ".join(
+                    (
+                        "{:{}}".format(action["file_name"], longest_file_name),
+                        "import %.1fms" % (action["import_time"] * 1000),
+                        "init %.1fms" % (action.get("init_time", 0.0) * 1000),
+                    )
+                )
+            )
+        self.logger.info("\n".join(times_to_log))
 
-        def action_loader(action: ActionResource) -> ActionResource:
+    def scan_actions(self) -> None:
+        """Create routes for action files without importing them"""
+        actions_folder = self.get_config()["actions_folder"]
+        for action in self.actions:
+            if action["routes"]:
+                continue
             try:
-                action_class = self.import_action_module(
-                    action["module_name"], action["class_name"]
+                methods = scan_methods(
+                    join(actions_folder, action["file_name"]), action["class_name"]
+                )
+                action["routes"] = self.make_method_routes(
+                    action["module_name"], methods
                 )
-                if action_class is not None:
-                    action["action_class"] = action_class
-                    action["action_obj"] = action_class()
             except:
                 self.logger.error(
-                    "Unable to instantiate `%s` action class." % action["class_name"]
+                    "Unable to scan `%s` action file." % action["file_name"]
                 )
-            return action
-
-        self.actions = list(map(action_loader, actions))
 
     def make_url(self, module_name: str, method: str) -> str:
-        """Create URL for action routes"""
+        """Create URL for action routes, nested in the URLs of subpackages"""
         actions_index = self.get_config()["actions_index"]
-        url = "/" if actions_index == module_name else "/%s/" % module_name
+        package, _, name = module_name.rpartition("/")
+        if name != actions_index:
+            url = "/%s/" % module_name
+        else:
+            url = "/%s/" % package if package else "/"
         is_custom_method = match(CUSTOM_METHOD_RE, method)
         if is_custom_method:
             slug = sub(r"^(get|set|do)_", "", method).replace("_", "-").lower()
@@ -260,7 +611,10 @@ class Pantam:
         """Create action routes with method, verb, and URL"""
         if action is None:
             return []
-        methods = introspect_methods(action)
+        return self.make_method_routes(path, introspect_methods(action))
+
+    def make_method_routes(self, path: str, methods: Methods) -> List[ActionRoute]:
+        """Create action routes from a method dictionary"""
 
         def map_to_route(verb: VERB):
             return lambda method: {
@@ -275,49 +629,258 @@ class Pantam:
         delete_routes = list(map(map_to_route("delete"), methods["delete"]))
         return get_routes + post_routes + patch_routes + delete_routes
 
+    def wrap_endpoint(
+        self, action: ActionResource, route: ActionRoute, action_obj: Any
+    ) -> Callable:
+        """Layer request handling features around an action method"""
+        profiling = self.profiler.enabled
+        schema = compile_schema(action_obj, route["method"], route["url"])
+
+        def transform(handler: Callable) -> Callable:
+            if schema is not None:
+                handler = schema.bind(handler)
+            if profiling:
+                handler = self.profiler.wrap_handler(handler)
+            return handler
+
+        endpoint = self.executors.wrap(
+            action_obj,
+            route["method"],
+            transform if schema is not None or profiling else None,
+        )
+        endpoint = wrap_stream(
+            endpoint,
+            action_obj,
+            route["method"],
+            None if schema is None else schema.bind,
+            self.executors.stream_lanes,
+        )
+        if schema is not None:
+            endpoint = schema.wrap(endpoint)
+        # deadlines run inside admission, so abandoned sync methods keep their slot
+        endpoint = self.deadlines.wrap(endpoint, action_obj, route["method"])
+        endpoint = self.admission.wrap(endpoint, action_obj, action["module_name"])
+        endpoint = self.coalescer.wrap(
+            endpoint, action_obj, action["module_name"], route["method"], route["verb"],
+        )
+        if self.cache.max_bytes > 0:
+            endpoint = self.cache.wrap(
+                endpoint,
+                action_obj,
+                action["module_name"],
+                route["method"],
+                route["verb"],
+            )
+        if self.get_config()["metrics"]:
+            endpoint = self.metrics.wrap(
+                endpoint, action["module_name"], route["method"]
+            )
+        if profiling:
+            endpoint = self.profiler.wrap(
+                endpoint, action["module_name"], route["method"]
+            )
+        return endpoint
+
+    def make_endpoint(self, action: ActionResource, route: ActionRoute) -> Callable:
+        """Get the request handler for an action route"""
+
+        def wrap(action_obj: Any, _: str) -> Callable:
+            return self.wrap_endpoint(action, route, action_obj)
+
+        def wrap_loaded(action_obj: Any, method: str) -> Callable:
+            # lazy actions are only checked when they are first loaded
+            try:
+                return wrap(action_obj, method)
+            except TypeError as error:
+                self.logger.error(
+                    "Unable to bind `%s` action: %s" % (action["module_name"], error)
+                )
+                raise
+
+        if "action_obj" not in action and "lazy_action" in action:
+            return action["lazy_action"].endpoint(route["method"], wrap_loaded)
+        return wrap(action["action_obj"], route["method"])
+
     def bind_routes(self) -> None:
-        """Create starlette routes"""
+        """Create starlette routes, dispatched via the action router tree"""
+        config = self.get_config()
         actions = self.get_actions()
 
-        starlette_routes: List[Route] = []
+        self.executors.shutdown()
+        self.executors = Executors(
+            config["thread_pool_size"],
+            config["process_pool_size"],
+            config["default_pool_size"],
+            config["stream_pool_size"],
+        )
+        self.cache = ResponseCache(config["cache_max_bytes"])
+        self.coalescer = Coalescer()
+        self.admission = Admission(
+            config["max_in_flight"],
+            config["max_queue"],
+            config["max_queue_time"],
+            config["retry_after"],
+        )
+        self.deadlines = Deadlines(config["deadline"])
+        self.metrics = Metrics(config["metrics_dir"], self.get_counters)
+        self.profiler = Profiler(
+            config["profile_token"],
+            config["profile_rate"],
+            config["profile_dir"],
+            config["profile_limit"],
+            config["debug"],
+        )
 
         for action in actions:
-            try:
-                routes = self.make_routes(action["module_name"], action["action_class"])
-                action["routes"] = routes
+            self.bind_action_routes(action)
+        self.routes = self.collect_routes(actions)
 
-                if len(routes) == 0:
-                    self.logger.error(
-                        "No methods found for `%s` action." % action["module_name"]
-                    )
-                    continue
+    def bind_action_routes(self, action: ActionResource) -> None:
+        """Create starlette routes for the methods of an action"""
+        action["bound_routes"] = []
+        try:
+            routes = action.get("routes") or self.make_routes(
+                action["module_name"], action.get("action_class")
+            )
+            action["routes"] = routes
 
-                def prepare_verb(verb: VERB) -> List[str]:
-                    return [verb.upper()]
+            if len(routes) == 0:
+                self.logger.error(
+                    "No methods found for `%s` action." % action["module_name"]
+                )
+                return
 
-                for route in routes:
-                    starlette_routes.append(
-                        Route(
-                            route["url"],
-                            getattr(action["action_obj"], route["method"]),
-                            methods=prepare_verb(route["verb"]),
-                        )
-                    )
+            def prepare_verb(verb: VERB) -> List[str]:
+                return [verb.upper()]
 
-                starlette_routes.append(
-                    Route(
-                        "/healthz",
-                        lambda *args, **kwargs: PlainTextResponse("👋"),
-                        methods=prepare_verb("get"),
-                    )
+            action["bound_routes"] = [
+                Route(
+                    route["url"],
+                    self.make_endpoint(action, route),
+                    methods=prepare_verb(route["verb"]),
                 )
-            except:
-                self.logger.error(
-                    "Unable to bind `%s` action methods to route."
-                    % action["module_name"]
+                for route in routes
+            ]
+        except TypeError as error:
+            # e.g. unsupported annotations, fail rather than drop the routes
+            raise TypeError("`%s` action: %s" % (action["module_name"], error))
+        except:
+            self.logger.error(
+                "Unable to bind `%s` action methods to route." % action["module_name"]
+            )
+
+    def collect_routes(self, actions: List[ActionResource]) -> List[Route]:
+        """Gather the routes of actions and framework endpoints"""
+        config = self.get_config()
+        starlette_routes: List[Route] = []
+        for action in actions:
+            starlette_routes.extend(action.get("bound_routes", []))
+
+        if config["metrics"]:
+            starlette_routes.append(
+                Route("/metrics", self.handle_metrics, methods=["GET"])
+            )
+
+        if config["batch"]:
+            starlette_routes.append(
+                Route("/_batch", self.handle_batch, methods=["POST"])
+            )
+
+        if self.profiler.enabled:
+            starlette_routes.append(
+                Route("/_profiles/", self.profiler.handle_list, methods=["GET"])
+            )
+            starlette_routes.append(
+                Route(
+                    "/_profiles/{name}", self.profiler.handle_download, methods=["GET"]
+                )
+            )
+
+        return starlette_routes
+
+    def apply_manifest(self) -> bool:
+        """Apply routes from a fresh route manifest to discovered actions"""
+        config = self.get_config()
+        if config["manifest"] is None:
+            return False
+        manifest = load_manifest(config["manifest"])
+        if manifest is None or not is_fresh(
+            manifest,
+            config["actions_folder"],
+            config["actions_index"],
+            [action["file_name"] for action in self.actions],
+        ):
+            return False
+        recorded = {action["file_name"]: action for action in manifest["actions"]}
+        for action in self.actions:
+            action["routes"] = recorded[action["file_name"]]["routes"]  # type: ignore
+        return True
+
+    def write_manifest(self) -> None:
+        """Record discovered action routes in the route manifest"""
+        config = self.get_config()
+        try:
+            manifest: Manifest = {
+                "version": MANIFEST_VERSION,
+                "actions_folder": config["actions_folder"],
+                "actions_index": config["actions_index"],
+                "actions": [],
+            }
+            for action in self.actions:
+                mtime, size = stat_action_file(
+                    config["actions_folder"], action["file_name"]
+                )
+                manifest["actions"].append(
+                    {
+                        "file_name": action["file_name"],
+                        "module_name": action["module_name"],
+                        "class_name": action["class_name"],
+                        "mtime": mtime,
+                        "size": size,
+                        "routes": action.get("routes", []),  # type: ignore
+                    }
                 )
+            dump_manifest(config["manifest"], manifest)
+        except:
+            self.logger.error(
+                "Unable to write route manifest! Check `manifest` config setting."
+            )
+
+    def build_manifest(self) -> None:
+        """Introspect action classes and write the route manifest"""
+        self.discover_actions()
+        for action in self.actions:
+            action_class = self.import_action_module(
+                get_module_path(action["file_name"]), action["class_name"]
+            )
+            action["routes"] = self.make_routes(action["module_name"], action_class)
+        self.write_manifest()
 
-        self.routes = starlette_routes
+    def get_middleware(self) -> List[Middleware]:
+        """Get middleware, with compression outermost so it sees final bodies"""
+        config = self.get_config()
+        middleware = list(config["middleware"])
+        if config["compression"]:
+            self.compression_cache = CompressionCache(config["compression_cache_bytes"])
+            middleware.insert(
+                0,
+                Middleware(
+                    CompressionMiddleware,
+                    minimum_size=config["compression_min_size"],
+                    cache=self.compression_cache,
+                ),
+            )
+        return middleware
+
+    def make_readiness(self) -> Readiness:
+        """Collect readiness checks of the app and its services"""
+        config = self.get_config()
+        return Readiness(
+            collect_checks(config["ready_checks"], config["services"]),
+            lambda: self.ready,
+            config["ready_interval"],
+            config["ready_timeout"],
+        )
 
     def get_routes(self, skip_check: bool = False) -> List[Route]:
         """Get underlying Starlette routes"""
@@ -325,26 +888,266 @@ class Pantam:
             self.logger.error("No routes have been defined.")
         return self.routes
 
-    def handle_shutdown(self) -> None:
-        """Offer shutdown callback to users"""
+    def get_action_objects(self) -> List[Any]:
+        """Get instantiated action objects"""
+        return [
+            action["action_obj"] for action in self.actions if "action_obj" in action
+        ]
+
+    async def warmup(self) -> None:
+        """Replay configured requests, e.g. "GET /items/", before reporting ready"""
+        for warmup_request in self.get_config()["warmup"]:
+            try:
+                verb, path = warmup_request.split(" ", 1)
+                response = await subrequest(self.app, verb, path)
+                if response["status"] >= 500:
+                    raise RuntimeError(response["status"])
+            except:
+                self.logger.error("Warmup request `%s` failed." % warmup_request)
+
+    def get_counters(self) -> Dict[str, float]:
+        """Get framework counters reported next to route metrics"""
+        cache_stats = self.cache.stats()
+        return {
+            "cache_hits_total": cache_stats["hits"],
+            "cache_misses_total": cache_stats["misses"],
+            "cache_evictions_total": cache_stats["evictions"],
+            "coalesced_requests_total": self.coalescer.coalesced,
+            "admission_rejected_total": self.admission.rejected,
+            "deadline_exceeded_total": self.deadlines.exceeded,
+            "deadline_abandoned_total": self.deadlines.abandoned,
+            "compression_cache_hits_total": self.compression_cache.hits,
+            "drain_rejected_total": self.draining.rejected if self.draining else 0,
+            "log_records_dropped_total": self.logger.dropped,
+        }
+
+    async def handle_metrics(self, request: Request) -> Response:
+        """Serve metrics in the Prometheus text format"""
+        # counters are read on the loop, snapshot files of workers in a thread
+        text = await run_in_threadpool(self.metrics.render, self.metrics.snapshot())
+        return PlainTextResponse(text, media_type="text/plain; version=0.0.4")
+
+    async def handle_batch(self, request: Request) -> Response:
+        """Run a list of sub-requests concurrently and return all responses"""
         config = self.get_config()
-        config.on_shutdown()
+        try:
+            requests = parse_batch(
+                loads(await request.body()),
+                dict(request.headers),
+                request.url.path,
+                config["batch_max_requests"],
+            )
+        except ValueError as error:
+            message = str(error) if isinstance(error, BatchError) else "Invalid JSON."
+            return PlainTextResponse(message, status_code=400)
+        body = await run_batch(self.app, requests, config["batch_concurrency"])
+        return Response(body, media_type="application/json")
+
+    async def share_metrics(self) -> None:
+        """Periodically write metrics for other workers to aggregate"""
+        while True:
+            try:
+                self.metrics.write_snapshot()
+            except:
+                self.logger.error(
+                    "Unable to write metrics! Check `metrics_dir` config setting."
+                )
+            await sleep(METRICS_INTERVAL)
+
+    def check_actions_folder(self) -> bool:
+        """Check whether action files were changed, added or removed"""
+        actions_folder = self.get_config()["actions_folder"]
+        stats = stat_action_files(actions_folder, self.read_actions_folder())
+        changed, removed = diff_stats(self.action_stats, stats)
+        return bool(changed or removed)
+
+    def reimport_actions(self, file_names: List[str]) -> List[ActionResource]:
+        """Re-import and instantiate action files, skipping any that fail"""
+        actions: List[ActionResource] = []
+        for file_name in file_names:
+            action = self.load_action(self.make_action(file_name), fresh=True)
+            if "action_obj" in action:
+                actions.append(action)
+        return actions
+
+    async def reload_actions(self) -> List[str]:
+        """Re-import changed action files and swap their routes in.
+        Requests in flight finish on the old action objects."""
+        async with self.reload_lock:
+            config = self.get_config()
+            try:
+                stats = stat_action_files(
+                    config["actions_folder"], self.read_actions_folder()
+                )
+                changed, removed = diff_stats(self.action_stats, stats)
+                self.action_stats = stats
+                if not changed and not removed:
+                    return []
+                loaded = await run_in_threadpool(self.reimport_actions, changed)
+                for action in loaded:
+                    self.bind_action_routes(action)
+                await gather(
+                    *[
+                        call_hook(action["action_obj"], "on_startup")
+                        for action in loaded
+                    ]
+                )
+
+                replaced = {action["file_name"]: action for action in loaded}
+                retired = [
+                    action
+                    for action in self.actions
+                    if action["file_name"] in replaced or action["file_name"] in removed
+                ]
+                actions = [
+                    replaced.pop(action["file_name"], action)
+                    for action in self.actions
+                    if action["file_name"] not in removed
+                ]
+                # whatever is left was added to the actions folder
+                actions.extend(replaced.values())
+                self.actions = actions
+                self.routes = self.collect_routes(actions)
+                if self.router is not None:
+                    self.router.set_routes(self.routes)
+
+                for action in retired:
+                    self.cache.invalidate(action["module_name"])
+                    self.admission.action_limiters.pop(action["module_name"], None)
+                await gather(
+                    *[
+                        call_hook(action["action_obj"], "on_shutdown")
+                        for action in retired
+                        if "action_obj" in action
+                    ]
+                )
+                reloaded = [action["module_name"] for action in loaded]
+                self.logger.info(
+                    "Reloaded actions: %s" % ", ".join(reloaded + removed or ["none"])
+                )
+                return reloaded
+            except TypeError as error:
+                self.logger.error("Unable to reload actions: %s" % error)
+                return []
+            except:
+                self.logger.error("Unable to reload actions!")
+                return []
+
+    def handle_reload_signal(self) -> None:
+        """Reload changed actions on SIGHUP"""
+        ensure_future(self.reload_actions())
+
+    async def handle_startup(self) -> None:
+        """Prepare resources and run startup hooks before serving requests"""
+        config = self.get_config()
+        self.executors.start()
+        await gather(
+            *[call_hook(service, "open") for service in config["services"].values()]
+        )
+        hooks: List[Awaitable] = [call(config["on_startup"])]
+        hooks.extend(
+            call_hook(action_obj, "on_startup")
+            for action_obj in self.get_action_objects()
+        )
+        await gather(*hooks)
+        await self.warmup()
+        if config["metrics"] and config["metrics_dir"] is not None:
+            self.metrics_task = ensure_future(self.share_metrics())
+        if config["reload"]:
+            self.watcher = Watcher(
+                self.check_actions_folder,
+                self.reload_actions,
+                config["reload_interval"],
+            )
+            self.watcher.start()
+        add_reload_signal(self.handle_reload_signal)
+        if self.draining is not None:
+            self.draining.draining = False
+        add_drain(self.drain)
+        self.ready = True
+
+    async def drain(self) -> None:
+        """Fail readiness, reject new requests and wait for those in flight"""
+        config = self.get_config()
+        self.ready = False
+        if self.draining is None or self.draining.draining:
+            return
+        self.draining.draining = True
+        left = await self.draining.wait(config["drain_timeout"])
+        if left:
+            self.logger.error(
+                "%d requests still in flight after draining for %ss."
+                % (left, config["drain_timeout"])
+            )
+
+    async def run_shutdown_hooks(self) -> None:
+        """Run shutdown hooks concurrently, then close services"""
+        config = self.get_config()
+        hooks: List[Awaitable] = [call(config["on_shutdown"])]
+        hooks.extend(
+            call_hook(action_obj, "on_shutdown")
+            for action_obj in self.get_action_objects()
+        )
+        await gather(*hooks)
+        await gather(
+            *[call_hook(service, "close") for service in config["services"].values()]
+        )
+
+    async def handle_shutdown(self) -> None:
+        """Drain requests, run shutdown hooks and release resources"""
+        config = self.get_config()
+        remove_drain(self.drain)
+        await self.drain()
+        remove_reload_signal()
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
+        if self.metrics_task is not None:
+            self.metrics_task.cancel()
+            self.metrics_task = None
+            self.metrics.remove_snapshot()
+        try:
+            await wait_for(self.run_shutdown_hooks(), config["shutdown_timeout"])
+        except AsyncTimeoutError:
+            self.logger.error(
+                "Shutdown hooks did not finish within %ss." % config["shutdown_timeout"]
+            )
+        self.executors.shutdown()
+        self.logger.close()
 
     def build(self) -> Optional[Starlette]:
         """Build Pantam application"""
         config = self.get_config()
         self.discover_actions()
+        self.action_stats = stat_action_files(
+            config["actions_folder"], [action["file_name"] for action in self.actions]
+        )
+        from_manifest = self.apply_manifest()
+        if config["lazy"] and not from_manifest:
+            self.scan_actions()
         self.load_actions()
         self.bind_routes()
+        if config["manifest"] is not None and not from_manifest:
+            self.write_manifest()
         routes = self.get_routes()
         if config["debug"]:
             self.log_routes()
+            self.log_load_times()
         try:
-            return Starlette(
-                routes=routes,
-                debug=config["debug"],
+            app = Starlette(debug=config["debug"], middleware=self.get_middleware())
+            self.router = ActionRouter(
+                routes,
+                on_startup=[self.handle_startup],
                 on_shutdown=[self.handle_shutdown],
             )
+            app.router = self.router
+            self.draining = Draining(
+                app.build_middleware_stack(), config["retry_after"]
+            )
+            # health checks are answered before draining, middleware and routing
+            app.middleware_stack = HealthCheck(self.draining, self.make_readiness())
+            self.app = app
+            return app
         except:
             self.logger.error("Unable to build Pantam application!")
         return None
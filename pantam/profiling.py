@@ -0,0 +1,218 @@
+"""
+Pantam profiling runs sampled or explicitly triggered requests under
+cProfile and keeps the results as pstats files per action method
+"""
+
+from typing import TYPE_CHECKING, Any, Callable, List, Optional, Set, TypedDict
+from hmac import compare_digest
+from inspect import iscoroutinefunction
+from io import StringIO
+from os import getpid, listdir, makedirs, remove, stat
+from os.path import join
+from random import random
+from re import match
+from tempfile import gettempdir
+from threading import get_ident
+from time import time
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import (
+    FileResponse,
+    JSONResponse,
+    PlainTextResponse,
+    Response,
+)
+
+if TYPE_CHECKING:
+    from cProfile import Profile
+
+PROFILE_HEADER = "x-pantam-profile"
+
+PROFILE_ID_HEADER = "x-pantam-profile-id"
+
+PROFILE_KEY = "pantam.profile"
+
+PROFILE_FILE_RE = r"^[\w-]+\.[\w-]+\.\d+\.\d+\.pstats$"
+
+
+class ProfileInfo(TypedDict):
+    name: str
+    action: str
+    method: str
+    created: float
+    size: int
+
+
+class Profiler:
+    def __init__(
+        self,
+        token: Optional[str] = None,
+        rate: float = 0.0,
+        profile_dir: Optional[str] = None,
+        limit: int = 50,
+        debug: bool = False,
+    ) -> None:
+        self.token = token
+        self.rate = rate
+        self.profile_dir = (
+            join(gettempdir(), "pantam-profiles")
+            if profile_dir is None
+            else profile_dir
+        )
+        self.limit = limit
+        self.debug = debug
+        self.active_threads: Set[int] = set()
+
+    @property
+    def enabled(self) -> bool:
+        """Check if any request can be profiled"""
+        return self.token is not None or self.rate > 0
+
+    def authorized(self, request: Request) -> bool:
+        """Check the trigger header, without a token only debug apps are open"""
+        if self.token is None:
+            return self.debug
+        value = request.headers.get(PROFILE_HEADER)
+        return value is not None and compare_digest(value, self.token)
+
+    def should_profile(self, request: Request) -> bool:
+        """Profile requests with a valid trigger header or at the sampling rate"""
+        if self.token is not None and PROFILE_HEADER in request.headers:
+            return self.authorized(request)
+        return self.rate > 0 and random() < self.rate
+
+    def wrap_handler(self, handler: Callable) -> Callable:
+        """Run an action method under the request's profiler, if it has one.
+        Async methods also record other work interleaved on the event loop."""
+
+        if iscoroutinefunction(handler):
+
+            async def profiled_coroutine(request: Request) -> Response:
+                profile: Optional[Profile] = request.scope.get(PROFILE_KEY)
+                thread = get_ident()
+                if profile is None or thread in self.active_threads:
+                    return await handler(request)
+                self.active_threads.add(thread)
+                profile.enable()
+                try:
+                    return await handler(request)
+                finally:
+                    profile.disable()
+                    self.active_threads.discard(thread)
+
+            return profiled_coroutine
+
+        def profiled_function(request: Request) -> Response:
+            profile: Optional[Profile] = request.scope.get(PROFILE_KEY)
+            thread = get_ident()
+            if profile is None or thread in self.active_threads:
+                return handler(request)
+            self.active_threads.add(thread)
+            try:
+                return profile.runcall(handler, request)
+            finally:
+                self.active_threads.discard(thread)
+
+        return profiled_function
+
+    def wrap(self, endpoint: Callable, action: str, method: str) -> Callable:
+        """Attach a profiler to sampled requests and store its results"""
+
+        async def profiling_endpoint(request: Request) -> Response:
+            if not self.should_profile(request):
+                return await endpoint(request)
+            # profiling is rare, so cProfile is only imported when needed
+            from cProfile import Profile  # pylint: disable=import-outside-toplevel
+
+            profile = Profile()
+            request.scope[PROFILE_KEY] = profile
+            response = await endpoint(request)
+            name = await run_in_threadpool(self.save, profile, action, method)
+            if name is not None:
+                response.headers[PROFILE_ID_HEADER] = name
+            return response
+
+        return profiling_endpoint
+
+    def save(self, profile: "Profile", action: str, method: str) -> Optional[str]:
+        """Write pstats file, returns None if the method never ran"""
+        profile.create_stats()
+        if not profile.stats:  # type: ignore
+            return None
+        makedirs(self.profile_dir, exist_ok=True)
+        # actions in subpackages are named e.g. "shop/orders"
+        name = "%s.%s.%d.%d.pstats" % (
+            action.replace("/", "-"),
+            method,
+            time() * 1000000,
+            getpid(),
+        )
+        profile.dump_stats(join(self.profile_dir, name))
+        self.prune()
+        return name
+
+    def prune(self) -> None:
+        """Remove the oldest profiles above the limit"""
+        for profile in self.list_profiles()[self.limit :]:
+            try:
+                remove(join(self.profile_dir, profile["name"]))
+            except OSError:
+                continue
+
+    def list_profiles(self) -> List[ProfileInfo]:
+        """Get stored profiles, newest first"""
+        try:
+            names = listdir(self.profile_dir)
+        except OSError:
+            return []
+        profiles: List[ProfileInfo] = []
+        for name in names:
+            if not match(PROFILE_FILE_RE, name):
+                continue
+            action, method, created, _, _ = name.split(".")
+            try:
+                size = stat(join(self.profile_dir, name)).st_size
+            except OSError:
+                continue
+            profiles.append(
+                {
+                    "name": name,
+                    "action": action,
+                    "method": method,
+                    "created": int(created) / 1000000,
+                    "size": size,
+                }
+            )
+        return sorted(profiles, key=lambda profile: profile["created"], reverse=True)
+
+    def read_text(self, name: str) -> str:
+        """Render the top functions of a profile by cumulative time"""
+        from pstats import Stats  # pylint: disable=import-outside-toplevel
+
+        output = StringIO()
+        stats = Stats(join(self.profile_dir, name), stream=output)
+        stats.sort_stats("cumulative").print_stats(50)
+        return output.getvalue()
+
+    async def handle_list(self, request: Request) -> Response:
+        """Serve the list of stored profiles"""
+        if not self.authorized(request):
+            return PlainTextResponse("Forbidden", status_code=403)
+        profiles = await run_in_threadpool(self.list_profiles)
+        return JSONResponse(profiles)
+
+    async def handle_download(self, request: Request) -> Response:
+        """Serve a stored profile as a pstats file, or as text with `?format=text`"""
+        if not self.authorized(request):
+            return PlainTextResponse("Forbidden", status_code=403)
+        name: Any = request.path_params["name"]
+        profiles = await run_in_threadpool(self.list_profiles)
+        if name not in [profile["name"] for profile in profiles]:
+            return PlainTextResponse("Not Found", status_code=404)
+        if request.query_params.get("format") == "text":
+            return PlainTextResponse(await run_in_threadpool(self.read_text, name))
+        return FileResponse(
+            join(self.profile_dir, name),
+            media_type="application/octet-stream",
+            filename=name,
+        )
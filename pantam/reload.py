@@ -0,0 +1,102 @@
+"""
+Pantam reloading re-imports changed action modules in process and swaps
+their routes in, watching the actions folder or on SIGHUP
+"""
+
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+from asyncio import CancelledError, Future, ensure_future, get_event_loop, sleep
+import signal
+from .manifest import stat_action_file
+
+FileStats = Dict[str, Tuple[int, int]]
+
+# not available on Windows
+SIGHUP = getattr(signal, "SIGHUP", None)
+
+# SIGHUP handling before `add_reload_signal`, e.g. ignored by supervised workers
+previous_handler: Any = None
+
+
+def stat_action_files(actions_folder: str, file_names: List[str]) -> FileStats:
+    """Get modification time and size of each action file that still exists"""
+    stats: FileStats = {}
+    for file_name in file_names:
+        try:
+            stats[file_name] = stat_action_file(actions_folder, file_name)
+        except OSError:
+            continue
+    return stats
+
+
+def diff_stats(old: FileStats, new: FileStats) -> Tuple[List[str], List[str]]:
+    """Get changed or added files, and removed files"""
+    changed = sorted(name for name, stat in new.items() if old.get(name) != stat)
+    removed = sorted(name for name in old if name not in new)
+    return changed, removed
+
+
+class Watcher:
+    """Polls for changes and calls `on_change` when there are any"""
+
+    def __init__(
+        self,
+        scan: Callable[[], bool],
+        on_change: Callable[[], Awaitable[Any]],
+        interval: float = 1.0,
+    ) -> None:
+        self.scan = scan
+        self.on_change = on_change
+        self.interval = interval
+        self.task: Optional[Future] = None
+
+    async def watch(self) -> None:
+        while True:
+            await sleep(self.interval)
+            try:
+                if self.scan():
+                    await self.on_change()
+            except CancelledError:
+                raise
+            except Exception:
+                continue
+
+    def start(self) -> None:
+        """Start polling on the running event loop"""
+        if self.task is None:
+            self.task = ensure_future(self.watch())
+
+    def stop(self) -> None:
+        """Stop polling"""
+        if self.task is not None:
+            self.task.cancel()
+            self.task = None
+
+
+def add_reload_signal(callback: Callable[[], Any]) -> bool:
+    """Call `callback` on SIGHUP, returns False where signals can't be handled"""
+    global previous_handler
+    if SIGHUP is None:
+        return False
+    try:
+        previous_handler = signal.getsignal(SIGHUP)
+        get_event_loop().add_signal_handler(SIGHUP, callback)
+        return True
+    except (NotImplementedError, RuntimeError, ValueError):
+        # not the main thread
+        return False
+
+
+def remove_reload_signal() -> None:
+    """Restore SIGHUP handling from before `add_reload_signal`"""
+    global previous_handler
+    if SIGHUP is None:
+        return
+    try:
+        if (
+            get_event_loop().remove_signal_handler(SIGHUP)
+            and previous_handler is not None
+        ):
+            signal.signal(SIGHUP, previous_handler)
+    except (RuntimeError, ValueError):
+        pass
+    previous_handler = None
@@ -0,0 +1,166 @@
+"""
+Pantam routing compiles action routes into a prefix tree keyed on
+path segment and verb, so a lookup does not depend on the number of
+loaded actions
+"""
+
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+from re import match
+from starlette.datastructures import URL
+from starlette.responses import RedirectResponse
+from starlette.routing import BaseRoute, Match, Route, Router
+from starlette.types import Receive, Scope, Send
+
+PATH_PARAM_RE = r"^{(\w+)}$"
+
+
+class RouteNode:
+    """A single path segment in the route tree"""
+
+    __slots__ = ("children", "param", "param_name", "routes")
+
+    def __init__(self) -> None:
+        self.children: Dict[str, RouteNode] = {}
+        self.param: Optional[RouteNode] = None
+        self.param_name: str = ""
+        self.routes: Dict[str, Route] = {}
+
+
+def split_path(path: str) -> List[str]:
+    """Split URL path into segments, keeping trailing slashes significant"""
+    return path[1:].split("/")
+
+
+class RouteTree:
+    def __init__(self, routes: Sequence[Route] = ()) -> None:
+        self.root = RouteNode()
+        for route in routes:
+            self.insert(route)
+
+    def insert(self, route: Route) -> None:
+        """Add a route to the tree for each of its verbs"""
+        node = self.root
+        for segment in split_path(route.path):
+            param = match(PATH_PARAM_RE, segment)
+            if param:
+                if node.param is None:
+                    node.param = RouteNode()
+                    node.param_name = param.group(1)
+                node = node.param
+            else:
+                node = node.children.setdefault(segment, RouteNode())
+        for verb in route.methods or ():
+            node.routes.setdefault(verb, route)
+
+    def lookup(
+        self, path: str, method: Optional[str] = None
+    ) -> Tuple[Optional[RouteNode], Dict[str, str]]:
+        """Find the node for a path, static segments take precedence over params.
+        With `method`, only nodes with a route for that verb match."""
+        segments = split_path(path)
+        params: Dict[str, str] = {}
+
+        def walk(node: RouteNode, index: int) -> Optional[RouteNode]:
+            if index == len(segments):
+                if method is None:
+                    return node if node.routes else None
+                return node if method in node.routes else None
+            segment = segments[index]
+            child = node.children.get(segment)
+            if child is not None:
+                found = walk(child, index + 1)
+                if found is not None:
+                    return found
+            if node.param is not None and segment:
+                found = walk(node.param, index + 1)
+                if found is not None:
+                    params[node.param_name] = segment
+                    return found
+            return None
+
+        return walk(self.root, 0), params
+
+
+class ActionRouter(Router):
+    """Starlette router that dispatches HTTP requests via a route tree, misses
+    are answered from the tree too so they cost the same as hits. Routes the
+    tree doesn't hold, mounts and routes added to the app later, are matched
+    one by one after a miss."""
+
+    def __init__(self, routes: Sequence[BaseRoute] = None, **kwargs) -> None:
+        super().__init__(routes, **kwargs)
+        self.set_routes(self.routes)
+
+    def set_routes(self, routes: Sequence[BaseRoute]) -> None:
+        """Replace all routes, requests already dispatched keep their endpoints"""
+        tree_routes = [route for route in routes if isinstance(route, Route)]
+        tree = RouteTree(tree_routes)
+        self.routes = list(routes)
+        self.tree = tree
+        self.tree_ids: Set[int] = set(map(id, tree_routes))
+        self.fallback: List[BaseRoute] = []
+        self.fallback_count = len(tree_routes)
+
+    def get_fallback(self) -> List[BaseRoute]:
+        """Get routes outside the tree, updated when routes were added"""
+        if self.fallback_count != len(self.routes):
+            self.fallback = [
+                route for route in self.routes if id(route) not in self.tree_ids
+            ]
+            self.fallback_count = len(self.routes)
+        return self.fallback
+
+    async def handle_fallback(self, scope: Scope, receive: Receive, send: Send) -> bool:
+        """Match routes outside the tree like Starlette does, returns if one did"""
+        partial: Optional[Tuple[BaseRoute, Scope]] = None
+        for route in self.get_fallback():
+            matched, child_scope = route.matches(scope)
+            if matched == Match.FULL:
+                scope.update(child_scope)
+                await route.handle(scope, receive, send)
+                return True
+            if matched == Match.PARTIAL and partial is None:
+                partial = (route, child_scope)
+        if partial is None:
+            return False
+        scope.update(partial[1])
+        await partial[0].handle(scope, receive, send)
+        return True
+
+    def can_redirect(self, redirect_scope: Scope) -> bool:
+        """Check if any route matches the path with the trailing slash toggled"""
+        if self.tree.lookup(redirect_scope["path"])[0] is not None:
+            return True
+        return any(
+            route.matches(redirect_scope)[0] != Match.NONE
+            for route in self.get_fallback()
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            # lifespan and websockets
+            await super().__call__(scope, receive, send)
+            return
+        scope.setdefault("router", self)
+        path = scope["path"]
+        node, params = self.tree.lookup(path, scope["method"])
+        if node is None:
+            node, params = self.tree.lookup(path)
+        if node is not None:
+            # a verb missing from the node is left to the route to reject (405)
+            route = node.routes.get(scope["method"]) or next(iter(node.routes.values()))
+            scope.update({"endpoint": route.endpoint, "path_params": params})
+            await route.handle(scope, receive, send)
+            return
+        if await self.handle_fallback(scope, receive, send):
+            return
+        if self.redirect_slashes and path != "/":
+            redirect_scope = dict(scope)
+            redirect_scope["path"] = (
+                path.rstrip("/") if path.endswith("/") else path + "/"
+            )
+            if self.can_redirect(redirect_scope):
+                response = RedirectResponse(url=str(URL(scope=redirect_scope)))
+                await response(scope, receive, send)
+                return
+        await self.default(scope, receive, send)
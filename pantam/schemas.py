@@ -0,0 +1,393 @@
+"""
+Pantam schemas decode path params and request bodies into the types
+annotated on action methods, compiled once per method when routes are bound
+"""
+
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    TypedDict,
+    Union,
+    get_args,
+    get_origin,
+    get_type_hints,
+)
+from dataclasses import MISSING, fields, is_dataclass
+from inspect import Parameter, iscoroutinefunction, signature
+from re import findall
+from uuid import UUID
+from starlette.datastructures import UploadFile
+from starlette.requests import Request
+from starlette.responses import Response
+from .encoding import JSONResponse, loads
+from .executors import get_policy as get_executor_policy
+
+ARGUMENTS_KEY = "pantam.arguments"
+
+FORM_TYPES = ("application/x-www-form-urlencoded", "multipart/form-data")
+
+TRUE_VALUES = ("true", "1", "yes", "on")
+
+FALSE_VALUES = ("false", "0", "no", "off")
+
+# converts a value, `text` is True for form fields and path params,
+# which are always strings
+Converter = Callable[[Any, bool], Any]
+
+
+class FieldError(TypedDict):
+    loc: str
+    msg: str
+
+
+class DecodeError(ValueError):
+    """Input does not match the annotated types"""
+
+    def __init__(self, errors: List[FieldError]) -> None:
+        super().__init__(errors)
+        self.errors = errors
+
+
+def invalid(message: str) -> DecodeError:
+    return DecodeError([{"loc": "", "msg": message}])
+
+
+def prefix_errors(error: DecodeError, loc: str) -> List[FieldError]:
+    """Nest error locations under `loc`, e.g. "items.0.name" """
+    return [
+        {
+            "loc": "%s.%s" % (loc, item["loc"]) if item["loc"] else loc,
+            "msg": item["msg"],
+        }
+        for item in error.errors
+    ]
+
+
+def convert_each(
+    items: Iterable[Tuple[Any, Any]], converter: Converter, text: bool
+) -> List[Tuple[Any, Any]]:
+    """Convert the values of key, value pairs, reporting every invalid value"""
+    converted: List[Tuple[Any, Any]] = []
+    errors: List[FieldError] = []
+    for key, value in items:
+        try:
+            converted.append((key, converter(value, text)))
+        except DecodeError as error:
+            errors.extend(prefix_errors(error, str(key)))
+    if errors:
+        raise DecodeError(errors)
+    return converted
+
+
+def convert_any(value: Any, text: bool) -> Any:
+    return value
+
+
+def convert_str(value: Any, text: bool) -> str:
+    if isinstance(value, str):
+        return value
+    raise invalid("expected a string")
+
+
+def convert_int(value: Any, text: bool) -> int:
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if text and isinstance(value, str):
+        try:
+            return int(value)
+        except ValueError:
+            pass
+    raise invalid("expected an integer")
+
+
+def convert_float(value: Any, text: bool) -> float:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    if text and isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            pass
+    raise invalid("expected a number")
+
+
+def convert_bool(value: Any, text: bool) -> bool:
+    if isinstance(value, bool):
+        return value
+    if text and isinstance(value, str):
+        if value.lower() in TRUE_VALUES:
+            return True
+        if value.lower() in FALSE_VALUES:
+            return False
+    raise invalid("expected a boolean")
+
+
+def convert_uuid(value: Any, text: bool) -> UUID:
+    if isinstance(value, str):
+        try:
+            return UUID(value)
+        except ValueError:
+            pass
+    raise invalid("expected a UUID")
+
+
+def convert_upload(value: Any, text: bool) -> UploadFile:
+    if isinstance(value, UploadFile):
+        return value
+    raise invalid("expected a file")
+
+
+SCALARS: Dict[Any, Converter] = {
+    str: convert_str,
+    int: convert_int,
+    float: convert_float,
+    bool: convert_bool,
+    UUID: convert_uuid,
+    UploadFile: convert_upload,
+}
+
+
+def is_typeddict(annotation: Any) -> bool:
+    return (
+        isinstance(annotation, type)
+        and issubclass(annotation, dict)
+        and hasattr(annotation, "__total__")
+    )
+
+
+def compile_object(
+    specs: List[Tuple[str, Converter, bool]], build: Callable[[Dict[str, Any]], Any]
+) -> Converter:
+    """Create a converter for objects with named fields, reporting every
+    missing or invalid field"""
+
+    def convert_object(value: Any, text: bool) -> Any:
+        if not isinstance(value, dict):
+            raise invalid("expected an object")
+        values: Dict[str, Any] = {}
+        errors: List[FieldError] = []
+        for name, converter, required in specs:
+            if name not in value:
+                if required:
+                    errors.append({"loc": name, "msg": "field required"})
+                continue
+            try:
+                values[name] = converter(value[name], text)
+            except DecodeError as error:
+                errors.extend(prefix_errors(error, name))
+        if errors:
+            raise DecodeError(errors)
+        return build(values)
+
+    return convert_object
+
+
+def compile_dataclass(cls: Any) -> Converter:
+    hints = get_type_hints(cls)
+    specs = [
+        (
+            field.name,
+            compile_type(hints.get(field.name, Any)),
+            field.default is MISSING and field.default_factory is MISSING,  # type: ignore
+        )
+        for field in fields(cls)
+        if field.init
+    ]
+
+    def build(values: Dict[str, Any]) -> Any:
+        try:
+            return cls(**values)
+        except ValueError as error:
+            # raised by __post_init__ validation
+            raise invalid(str(error))
+
+    return compile_object(specs, build)
+
+
+def compile_typeddict(cls: Any) -> Converter:
+    hints = get_type_hints(cls)
+    required = getattr(cls, "__required_keys__", set(hints) if cls.__total__ else ())
+    specs = [
+        (name, compile_type(hint), name in required) for name, hint in hints.items()
+    ]
+    return compile_object(specs, dict)
+
+
+def compile_type(annotation: Any) -> Converter:
+    """Create a converter for an annotation, raises TypeError if unsupported"""
+    if annotation in (Any, Parameter.empty, object):
+        return convert_any
+    if annotation in SCALARS:
+        return SCALARS[annotation]
+    if is_dataclass(annotation) and isinstance(annotation, type):
+        return compile_dataclass(annotation)
+    if is_typeddict(annotation):
+        return compile_typeddict(annotation)
+    origin = get_origin(annotation)
+    args = get_args(annotation)
+
+    if origin is Union:
+        types = [arg for arg in args if arg is not type(None)]
+        if len(types) != 1:
+            raise TypeError("Unsupported annotation `%s`." % annotation)
+        convert_value = compile_type(types[0])
+
+        def convert_optional(value: Any, text: bool) -> Any:
+            return None if value is None else convert_value(value, text)
+
+        return convert_optional
+
+    if annotation is list or origin is list:
+        convert_item = compile_type(args[0] if args else Any)
+
+        def convert_list(value: Any, text: bool) -> List[Any]:
+            if text and not isinstance(value, list):
+                # a form field that was only sent once
+                value = [value]
+            if not isinstance(value, list):
+                raise invalid("expected a list")
+            items = convert_each(enumerate(value), convert_item, text)
+            return [item for _, item in items]
+
+        return convert_list
+
+    if annotation is dict or origin is dict:
+        convert_entry = compile_type(args[1] if args else Any)
+
+        def convert_dict(value: Any, text: bool) -> Dict[str, Any]:
+            if not isinstance(value, dict):
+                raise invalid("expected an object")
+            return dict(convert_each(value.items(), convert_entry, text))
+
+        return convert_dict
+
+    raise TypeError("Unsupported annotation `%s`." % annotation)
+
+
+async def read_body(request: Request) -> Tuple[Any, bool]:
+    """Parse a form or JSON body, returns the data and whether it's a form.
+    Repeated form fields become lists."""
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith(FORM_TYPES):
+        data: Dict[str, Any] = {}
+        for name, value in (await request.form()).multi_items():
+            if name not in data:
+                data[name] = value
+            elif isinstance(data[name], list):
+                data[name].append(value)
+            else:
+                data[name] = [data[name], value]
+        return data, True
+    try:
+        return loads(await request.body()), False
+    except ValueError:
+        raise invalid("invalid JSON")
+
+
+class MethodSchema:
+    def __init__(
+        self,
+        path_params: Dict[str, Converter],
+        body_name: Optional[str] = None,
+        body: Optional[Converter] = None,
+    ) -> None:
+        self.path_params = path_params
+        self.body_name = body_name
+        self.body = body
+
+    async def decode(self, request: Request) -> Dict[str, Any]:
+        """Decode the arguments of a method from a request"""
+        arguments: Dict[str, Any] = {}
+        errors: List[FieldError] = []
+        for name, converter in self.path_params.items():
+            try:
+                arguments[name] = converter(request.path_params[name], True)
+            except DecodeError as error:
+                errors.extend(prefix_errors(error, "path.%s" % name))
+        if self.body is not None:
+            try:
+                data, text = await read_body(request)
+                arguments[self.body_name] = self.body(data, text)  # type: ignore
+            except DecodeError as error:
+                errors.extend(prefix_errors(error, "body"))
+        if errors:
+            raise DecodeError(errors)
+        return arguments
+
+    def bind(self, handler: Callable) -> Callable:
+        """Pass decoded arguments to a method after the request"""
+        if iscoroutinefunction(handler):
+
+            async def bound_coroutine(request: Request) -> Any:
+                return await handler(request, **request.scope[ARGUMENTS_KEY])
+
+            return bound_coroutine
+
+        def bound_function(request: Request) -> Any:
+            return handler(request, **request.scope[ARGUMENTS_KEY])
+
+        return bound_function
+
+    def wrap(self, endpoint: Callable) -> Callable:
+        """Decode arguments before the endpoint runs, 422 on invalid input"""
+
+        async def decoding_endpoint(request: Request) -> Response:
+            try:
+                request.scope[ARGUMENTS_KEY] = await self.decode(request)
+            except DecodeError as error:
+                return JSONResponse({"errors": error.errors}, status_code=422)
+            return await endpoint(request)
+
+        return decoding_endpoint
+
+
+def compile_schema(action_obj: Any, method: str, url: str) -> Optional[MethodSchema]:
+    """Compile decoders for the annotated parameters after `request`, returns
+    None for methods without any. Parameters with defaults are left alone.
+    Raises TypeError naming the method for annotations that can't be decoded."""
+    handler = getattr(action_obj, method)
+    parameters = list(signature(handler).parameters.values())[1:]
+    if not parameters:
+        return None
+    hints = get_type_hints(handler)
+    path_names = findall(r"{(\w+)}", url)
+    path_params: Dict[str, Converter] = {}
+    body_name: Optional[str] = None
+    body: Optional[Converter] = None
+
+    def compile_parameter(name: str, annotation: Any) -> Converter:
+        try:
+            return compile_type(annotation)
+        except TypeError as error:
+            raise TypeError("Parameter `%s` of `%s`: %s" % (name, method, error))
+
+    for parameter in parameters:
+        if parameter.kind in (Parameter.VAR_POSITIONAL, Parameter.VAR_KEYWORD):
+            continue
+        annotation = hints.get(parameter.name, Parameter.empty)
+        if parameter.name in path_names:
+            path_params[parameter.name] = compile_parameter(parameter.name, annotation)
+        elif parameter.default is not Parameter.empty:
+            continue
+        elif annotation is Parameter.empty:
+            raise TypeError(
+                "Parameter `%s` of `%s` needs a type annotation."
+                % (parameter.name, method)
+            )
+        elif body is not None:
+            raise TypeError("`%s` has more than one body parameter." % method)
+        else:
+            body_name, body = (
+                parameter.name,
+                compile_parameter(parameter.name, annotation),
+            )
+    if not path_params and body is None:
+        return None
+    if get_executor_policy(action_obj, method)["kind"] == "process":
+        raise TypeError("`%s` can't decode arguments in a process pool." % method)
+    return MethodSchema(path_params, body_name, body)
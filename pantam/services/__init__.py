@@ -4,3 +4,4 @@ an abstraction layer over system or third-party APIs
 """
 
 from .logger import Logger
+from .database import SqlitePool
@@ -0,0 +1,185 @@
+from typing import (
+    Any,
+    Callable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    TypedDict,
+)
+from contextlib import contextmanager
+from contextvars import ContextVar
+from queue import Empty, LifoQueue
+from sqlite3 import Connection, connect
+from threading import Lock, get_ident
+from time import perf_counter
+from starlette.concurrency import run_in_threadpool
+
+
+class PoolStats(TypedDict):
+    size: int
+    connections: int
+    idle: int
+    checkouts: int
+    wait_time: float
+    max_wait_time: float
+
+
+class SqlitePool:
+    """Bounded pool of SQLite connections shared by action methods"""
+
+    def __init__(
+        self,
+        database: str,
+        size: int = 5,
+        timeout: float = 30.0,
+        row_factory: Optional[Callable] = None,
+        **connect_options
+    ) -> None:
+        self.database = database
+        self.size = size
+        self.timeout = timeout
+        self.row_factory = row_factory
+        self.connect_options = connect_options
+        self.idle: "LifoQueue[Connection]" = LifoQueue()
+        self.connections = 0
+        self.lock = Lock()
+        # connection held in the current context, with the thread using it
+        self.held: "ContextVar[Optional[Tuple[Connection, int]]]" = ContextVar(
+            "pantam_sqlite_held", default=None
+        )
+        self.closed = False
+        self.checkouts = 0
+        self.wait_time = 0.0
+        self.max_wait_time = 0.0
+
+    def connect(self) -> Connection:
+        """Open a new connection that may be used from any thread"""
+        connection = connect(
+            self.database, check_same_thread=False, **self.connect_options
+        )
+        if self.row_factory is not None:
+            connection.row_factory = self.row_factory
+        return connection
+
+    def open(self) -> None:
+        """Open the first connection so errors surface at startup"""
+        self.closed = False
+        if self.connections == 0:
+            self.release(self.acquire())
+
+    def close(self) -> None:
+        """Close idle connections, checked out ones close when released"""
+        self.closed = True
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except Empty:
+                break
+            with self.lock:
+                self.connections -= 1
+
+    def acquire(self) -> Connection:
+        """Check out a connection, waiting up to `timeout` if all are in use"""
+        start = perf_counter()
+        try:
+            connection = self.idle.get_nowait()
+        except Empty:
+            with self.lock:
+                can_connect = self.connections < self.size
+                if can_connect:
+                    self.connections += 1
+            if can_connect:
+                try:
+                    connection = self.connect()
+                except:
+                    with self.lock:
+                        self.connections -= 1
+                    raise
+            else:
+                try:
+                    connection = self.idle.get(timeout=self.timeout)
+                except Empty:
+                    raise TimeoutError(
+                        "Timed out waiting for a `%s` connection." % self.database
+                    )
+        wait_time = perf_counter() - start
+        with self.lock:
+            self.checkouts += 1
+            self.wait_time += wait_time
+            self.max_wait_time = max(self.max_wait_time, wait_time)
+        return connection
+
+    def release(self, connection: Connection) -> None:
+        """Return a connection to the pool"""
+        if connection.in_transaction:
+            connection.rollback()
+        if self.closed:
+            connection.close()
+            with self.lock:
+                self.connections -= 1
+            return
+        self.idle.put(connection)
+
+    @contextmanager
+    def connection(self) -> Iterator[Connection]:
+        """Use a pooled connection, nested uses in one context and thread share
+        it. Tasks and streams run in their own contexts, so they don't."""
+        held = self.held.get()
+        if held is not None and held[1] == get_ident():
+            yield held[0]
+            return
+        connection = self.acquire()
+        self.held.set((connection, get_ident()))
+        try:
+            yield connection
+        finally:
+            # set, not reset, as generators may be closed from another context
+            self.held.set(held)
+            self.release(connection)
+
+    def call(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run `func(connection, *args)` with a pooled connection"""
+        with self.connection() as connection:
+            return func(connection, *args)
+
+    async def run(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Run `func(connection, *args)` in a worker thread"""
+        return await run_in_threadpool(self.call, func, *args)
+
+    async def fetch_all(self, sql: str, parameters: Sequence = ()) -> List[Any]:
+        """Run a query off the event loop and fetch all rows"""
+        return await self.run(
+            lambda connection: connection.execute(sql, parameters).fetchall()
+        )
+
+    async def fetch_one(self, sql: str, parameters: Sequence = ()) -> Any:
+        """Run a query off the event loop and fetch the first row"""
+        return await self.run(
+            lambda connection: connection.execute(sql, parameters).fetchone()
+        )
+
+    async def execute(self, sql: str, parameters: Sequence = ()) -> int:
+        """Run a statement off the event loop and commit, returns affected rows"""
+
+        def execute_statement(connection: Connection) -> int:
+            with connection:
+                return connection.execute(sql, parameters).rowcount
+
+        return await self.run(execute_statement)
+
+    def check(self) -> None:
+        """Run a trivial query, used as a readiness check"""
+        self.call(lambda connection: connection.execute("SELECT 1").fetchone())
+
+    def stats(self) -> PoolStats:
+        """Get pool size and checkout wait times in seconds"""
+        return {
+            "size": self.size,
+            "connections": self.connections,
+            "idle": self.idle.qsize(),
+            "checkouts": self.checkouts,
+            "wait_time": self.wait_time,
+            "max_wait_time": self.max_wait_time,
+        }
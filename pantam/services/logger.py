@@ -1,31 +1,140 @@
+from typing import List, Literal, Optional, TextIO
+from atexit import register, unregister
 from logging import getLogger
+from queue import Empty, Full, Queue
 from sys import stdout
+from threading import Lock, Thread
+from time import time
 from colored import fg, attr
+from ..encoding import dumps
 
 PANTAM: str = fg("yellow") + attr("bold") + "PANTAM: " + attr("reset")
 BREAK: str = "\n"
 
+LOG_FORMAT = Literal["text", "json"]
+OVERFLOW = Literal["drop", "block"]
+
+BATCH_SIZE = 512
+
 
 def write(colour: str, msg: str) -> None:
     """Format and print message to stdout"""
     stdout.write(PANTAM + fg(colour) + attr("bold") + msg + attr("reset") + BREAK)
 
 
+class QueueWriter:
+    """Write lines to a stream in batches from a background thread"""
+
+    def __init__(self, stream: TextIO, max_size: int, overflow: OVERFLOW) -> None:
+        self.stream = stream
+        self.overflow = overflow
+        self.queue: "Queue[Optional[str]]" = Queue(max_size)
+        self.thread: Optional[Thread] = None
+        self.lock = Lock()
+        self.dropped = 0
+
+    def put(self, line: str) -> None:
+        """Queue a line, dropping or waiting when the queue is full"""
+        if self.thread is None:
+            self.start()
+        if self.overflow == "block":
+            self.queue.put(line)
+            return
+        try:
+            self.queue.put_nowait(line)
+        except Full:
+            self.dropped += 1
+
+    def start(self) -> None:
+        """Start the writer thread, unless another caller just did"""
+        with self.lock:
+            if self.thread is not None:
+                return
+            self.thread = Thread(target=self.run, name="pantam-logger", daemon=True)
+            self.thread.start()
+            register(self.close)
+
+    def run(self) -> None:
+        """Drain the queue, writing everything available at once"""
+        while True:
+            line = self.queue.get()
+            batch: List[str] = []
+            while line is not None:
+                batch.append(line)
+                if len(batch) >= BATCH_SIZE:
+                    break
+                try:
+                    line = self.queue.get_nowait()
+                except Empty:
+                    break
+            if batch:
+                self.stream.write("".join(batch))
+                self.stream.flush()
+            if line is None:
+                return
+
+    def close(self) -> None:
+        """Write queued lines and stop the writer thread, if it is running"""
+        with self.lock:
+            thread, self.thread = self.thread, None
+            if thread is None:
+                return
+            unregister(self.close)
+            self.queue.put(None)
+            thread.join()
+
+
 class Logger:
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        log_format: LOG_FORMAT = "text",
+        queue_size: int = 10000,
+        overflow: OVERFLOW = "drop",
+    ) -> None:
         self.logger = getLogger("pantam")
+        self.writer: Optional[QueueWriter] = (
+            QueueWriter(stdout, queue_size, overflow) if log_format == "json" else None
+        )
+
+    @property
+    def dropped(self) -> int:
+        """Number of records dropped because the log queue was full"""
+        return 0 if self.writer is None else self.writer.dropped
+
+    def log(self, level: str, colour: str, message: str) -> None:
+        """Queue JSON record in production mode, otherwise print and log it"""
+        if self.writer is not None:
+            self.writer.put(
+                dumps(
+                    {
+                        "time": time(),
+                        "level": level,
+                        "name": "pantam",
+                        "message": message,
+                    }
+                ).decode("utf-8")
+                + BREAK
+            )
+            return
+        if level == "error":
+            self.logger.error(message)
+        else:
+            self.logger.info(message)
+        write(colour, message)
 
     def info(self, message: str) -> None:
         """Print info message."""
-        self.logger.info(message)
-        write("blue", message)
+        self.log("info", "blue", message)
 
     def success(self, message: str) -> None:
         """Print success message"""
-        self.logger.info(message)
-        write("green", message)
+        self.log("success", "green", message)
 
     def error(self, message: str) -> None:
         """Print error message"""
-        self.logger.error(message)
-        write("red", message)
+        self.log("error", "red", message)
+
+    def close(self) -> None:
+        """Flush queued records"""
+        if self.writer is not None:
+            self.writer.close()
@@ -0,0 +1,215 @@
+"""
+Pantam streaming sends the items of generator action methods as they are
+produced, as newline delimited JSON or as a chunked JSON array
+"""
+
+from typing import Any, AsyncGenerator, Callable, Iterator, Optional, Tuple, TypedDict
+from asyncio import FIRST_COMPLETED, ensure_future, gather, get_event_loop, wait
+from contextvars import copy_context
+from inspect import isasyncgenfunction, isgeneratorfunction
+from starlette.background import BackgroundTask
+from starlette.requests import Request
+from starlette.responses import Response, StreamingResponse
+from starlette.types import Receive, Scope, Send
+from .encoding import dumps
+from .executors import ThreadLanes, get_policy as get_executor_policy
+
+POLICY_ATTRIBUTE = "stream_policy"
+
+# items encoded per trip to the worker thread when iterating sync generators
+BATCH_SIZE = 256
+
+# lanes used by responses created without any, e.g. outside of actions
+default_lanes = ThreadLanes(4, "pantam-stream")
+
+
+class StreamPolicy(TypedDict):
+    array: bool
+
+
+def stream(array: bool = False) -> Callable:
+    """Stream items of generators returned by an action class or method,
+    as newline delimited JSON or, with `array=True`, as a JSON array"""
+    policy: StreamPolicy = {"array": array}
+
+    def decorator(target: Any) -> Any:
+        setattr(target, POLICY_ATTRIBUTE, policy)
+        return target
+
+    return decorator
+
+
+def get_policy(action_obj: Any, method: str) -> Optional[StreamPolicy]:
+    """Read stream policy from an action method, falling back to its class"""
+    policy = getattr(getattr(action_obj, method), POLICY_ATTRIBUTE, None)
+    if policy is None:
+        policy = getattr(action_obj, POLICY_ATTRIBUTE, None)
+    return policy
+
+
+def encode_batch(iterator: Iterator, array: bool, first: bool) -> Tuple[bytes, bool]:
+    """Encode the next items of an iterator, returns the chunk and if it is done"""
+    items = []
+    done = True
+    for item in iterator:
+        items.append(dumps(item))
+        if len(items) == BATCH_SIZE:
+            done = False
+            break
+    if not array:
+        return b"".join(item + b"\n" for item in items), done
+    chunk = b",".join(items)
+    return chunk if first or not items else b"," + chunk, done
+
+
+class JSONStreamResponse(StreamingResponse):
+    """Stream items of a sync or async iterable. Sync iterables are pinned to
+    one of a bounded set of worker threads, in a context of their own as
+    streams share threads, or run on the event loop with `inline=True`."""
+
+    def __init__(
+        self,
+        content: Any,
+        status_code: int = 200,
+        headers: dict = None,
+        array: bool = False,
+        background: BackgroundTask = None,
+        lanes: Optional[ThreadLanes] = None,
+        inline: bool = False,
+    ) -> None:
+        self.array = array
+        self.lanes = default_lanes if lanes is None else lanes
+        self.inline = inline
+        super().__init__(
+            self.encode(content),
+            status_code,
+            headers,
+            "application/json" if array else "application/x-ndjson",
+            background,
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        # tasks are created here as Starlette 0.13 passes coroutines to
+        # `asyncio.wait`, which newer Python versions reject
+        tasks = [
+            ensure_future(self.stream_response(send)),
+            ensure_future(self.listen_for_disconnect(receive)),
+        ]
+        try:
+            done, _ = await wait(tasks, return_when=FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await gather(*tasks, return_exceptions=True)
+            await self.body_iterator.aclose()
+        for task in done:
+            task.result()
+        if self.background is not None:
+            await self.background()
+
+    async def encode(self, content: Any) -> AsyncGenerator[bytes, None]:
+        """Encode items as they are produced, waiting for each chunk to be sent"""
+        if self.array:
+            yield b"["
+        if hasattr(content, "__aiter__"):
+            chunks = self.encode_async(content)
+        elif self.inline:
+            chunks = self.encode_inline(content)
+        else:
+            chunks = self.encode_sync(content)
+        try:
+            async for chunk in chunks:
+                yield chunk
+        finally:
+            await chunks.aclose()
+        if self.array:
+            yield b"]"
+
+    async def encode_async(self, content: Any) -> AsyncGenerator[bytes, None]:
+        """Encode items of an async iterable one at a time"""
+        first = True
+        try:
+            async for item in content:
+                chunk = dumps(item)
+                if not self.array:
+                    yield chunk + b"\n"
+                else:
+                    yield chunk if first else b"," + chunk
+                first = False
+        finally:
+            if hasattr(content, "aclose"):
+                await content.aclose()
+
+    async def encode_inline(self, content: Any) -> AsyncGenerator[bytes, None]:
+        """Encode batches of a sync iterable on the event loop"""
+        try:
+            iterator = iter(content)
+            first = True
+            done = False
+            while not done:
+                chunk, done = encode_batch(iterator, self.array, first)
+                if chunk:
+                    first = False
+                    yield chunk
+        finally:
+            if hasattr(content, "close"):
+                content.close()
+
+    async def encode_sync(self, content: Any) -> AsyncGenerator[bytes, None]:
+        """Encode batches of a sync iterable in the worker thread of its lane"""
+        loop = get_event_loop()
+        worker = self.lanes.acquire()
+        # streams on a lane interleave, so each keeps its own context vars
+        context = copy_context()
+        try:
+            iterator = iter(content)
+            first = True
+            done = False
+            while not done:
+                chunk, done = await loop.run_in_executor(
+                    worker, context.run, encode_batch, iterator, self.array, first
+                )
+                if chunk:
+                    first = False
+                    yield chunk
+        finally:
+            if hasattr(content, "close"):
+                await loop.run_in_executor(worker, context.run, content.close)
+            self.lanes.release(worker)
+
+
+def wrap_stream(
+    endpoint: Callable,
+    action_obj: Any,
+    method: str,
+    transform: Optional[Callable[[Callable], Callable]] = None,
+    lanes: Optional[ThreadLanes] = None,
+) -> Callable:
+    """Stream generator methods and methods with a stream policy.
+    `transform` wraps async generator methods, which don't use `endpoint`.
+    Sync generators run on `lanes`, or inline with the `inline` executor."""
+    handler = getattr(action_obj, method)
+    policy = get_policy(action_obj, method)
+    array = policy is not None and policy["array"]
+    inline = get_executor_policy(action_obj, method)["kind"] == "inline"
+
+    if isasyncgenfunction(handler):
+        generate = handler if transform is None else transform(handler)
+
+        async def async_generator_endpoint(request: Request) -> Response:
+            return JSONStreamResponse(generate(request), array=array)
+
+        async_generator_endpoint.__name__ = method
+        return async_generator_endpoint
+
+    if not isgeneratorfunction(handler) and policy is None:
+        return endpoint
+
+    async def streaming_endpoint(request: Request) -> Response:
+        content = await endpoint(request)
+        if isinstance(content, Response):
+            return content
+        return JSONStreamResponse(content, array=array, lanes=lanes, inline=inline)
+
+    streaming_endpoint.__name__ = method
+    return streaming_endpoint
@@ -0,0 +1,81 @@
+"""
+Pantam sub-requests send requests through an ASGI application in-process,
+without a network round trip
+"""
+
+from typing import Dict, List, Optional, Tuple, TypedDict
+from asyncio import Event
+from starlette.types import ASGIApp, Message
+
+# marks sub-requests sent while handling another request
+SUBREQUEST_KEY = "pantam.subrequest"
+
+
+class SubResponse(TypedDict):
+    status: int
+    headers: List[Tuple[str, str]]
+    body: bytes
+
+
+async def subrequest(
+    app: ASGIApp,
+    method: str,
+    path: str,
+    body: bytes = b"",
+    headers: Optional[Dict[str, str]] = None,
+    nested: bool = False,
+) -> SubResponse:
+    """Send a request to an ASGI app and collect the response"""
+    path, _, query_string = path.partition("?")
+    raw_headers = [
+        (name.lower().encode("latin-1"), value.encode("latin-1"))
+        for name, value in (headers or {}).items()
+    ]
+    if body and "content-length" not in (headers or {}):
+        raw_headers.append((b"content-length", str(len(body)).encode("latin-1")))
+    scope = {
+        "type": "http",
+        "http_version": "1.1",
+        "method": method.upper(),
+        "path": path,
+        "raw_path": path.encode("utf-8"),
+        "root_path": "",
+        "scheme": "http",
+        "query_string": query_string.encode("latin-1"),
+        "headers": raw_headers,
+        "server": ("pantam", 80),
+        "client": None,
+    }
+    if nested:
+        scope[SUBREQUEST_KEY] = True
+    response: SubResponse = {"status": 500, "headers": [], "body": b""}
+    chunks: List[bytes] = []
+    request_sent = False
+    response_complete = Event()
+
+    async def receive() -> Message:
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await response_complete.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message: Message) -> None:
+        if message["type"] == "http.response.start":
+            response["status"] = message["status"]
+            response["headers"] = [
+                (name.decode("latin-1"), value.decode("latin-1"))
+                for name, value in message.get("headers", [])
+            ]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                response_complete.set()
+
+    try:
+        await app(scope, receive, send)
+    finally:
+        response_complete.set()
+    response["body"] = b"".join(chunks)
+    return response
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+
+from compileall import compile_dir
+from os import getcwd
+import sys
+from pantam import Pantam
+from pantam_cli.utils.filesystem import load_pantamrc_file
+from pantam_cli.utils.messages import (
+    info_msg,
+    error_msg,
+    success_msg,
+    write_error,
+    write_msg,
+    NewLine,
+)
+from pantam_cli.utils import clear
+
+DEFAULT_MANIFEST = ".pantam-manifest.json"
+
+
+def build() -> None:
+    """Write route manifest and compile action files to bytecode"""
+    clear()
+
+    options = load_pantamrc_file()
+    manifest = options.get("manifest", DEFAULT_MANIFEST)
+
+    if getcwd() not in sys.path:
+        sys.path.insert(0, getcwd())
+
+    write_msg(info_msg("Creating %s file..." % manifest))
+    pantam = Pantam(
+        actions_folder=options["actions_folder"],
+        actions_index=options.get("actions_index", "index"),
+        manifest=manifest,
+    )
+    pantam.build_manifest()
+    write_msg(
+        success_msg(" Done!"), NewLine.after,
+    )
+
+    # workers then skip compiling action files when they start
+    write_msg(info_msg("Compiling %s folder..." % options["actions_folder"]))
+    if not compile_dir(options["actions_folder"], quiet=1):
+        raise RuntimeError("Unable to compile action files.")
+    write_msg(
+        success_msg(" Done!"), NewLine.after,
+    )
+
+
+def run_build() -> None:
+    """CLI runner for build()"""
+    try:
+        build()
+        write_msg(success_msg("Your route manifest and compiled actions are ready!"))
+    except Exception as error:
+        write_error(error_msg(str(error)))
+
+
+if __name__ == "__main__":
+    run_build()
@@ -1,9 +1,10 @@
 #!/usr/bin/env python3
 
+from typing import Optional
 import typer
-from pantam_cli.action import run_action
-from pantam_cli.init import run_init
-from pantam_cli.serve import run_serve
+
+# commands import their dependencies when run, so e.g. `pantam serve`
+# never loads the prompts used by `pantam init`
 
 
 run = typer.Typer()
@@ -12,19 +13,53 @@ run = typer.Typer()
 @run.command()
 def init():
     """Configure a Pantam application"""
+    from pantam_cli.init import run_init
+
     run_init()
 
 
 @run.command()
 def action(file: str):
     """Create a new action route"""
+    from pantam_cli.action import run_action
+
     run_action(file)
 
 
 @run.command()
-def serve(dev: bool = False):
-    """Create a new action route"""
-    run_serve(dev)
+def build():
+    """Write the route manifest and compile actions used at boot"""
+    from pantam_cli.build import run_build
+
+    run_build()
+
+
+@run.command()
+def serve(
+    dev: bool = False,
+    workers: Optional[int] = None,
+    loop: Optional[str] = None,
+    http: Optional[str] = None,
+    backlog: Optional[int] = None,
+    keep_alive: Optional[int] = None,
+    limit_concurrency: Optional[int] = None,
+    reuse_port: Optional[bool] = None,
+    stop_timeout: Optional[float] = None,
+):
+    """Serve the Pantam application"""
+    from pantam_cli.serve import run_serve
+
+    run_serve(
+        dev,
+        workers=workers,
+        loop=loop,
+        http=http,
+        backlog=backlog,
+        timeout_keep_alive=keep_alive,
+        limit_concurrency=limit_concurrency,
+        reuse_port=reuse_port,
+        stop_timeout=stop_timeout,
+    )
 
 
 if __name__ == "__main__":
@@ -1,13 +1,48 @@
 #!/usr/bin/env python3
 
-from os import getenv
+from os import cpu_count, getenv
 import sys
-from uvicorn import run
-from pantam_cli.utils.filesystem import load_pantamrc_file
+from typing import Optional, TypedDict
+from uvicorn import Config, run
+from pantam_cli.server import DrainingServer
+from pantam_cli.utils.filesystem import CliOptions, load_pantamrc_file
 from pantam_cli.utils import clear
 
 
-def run_serve(dev_mode: bool) -> None:
+class ServeOptions(TypedDict):
+    workers: int
+    loop: str
+    http: str
+    backlog: int
+    timeout_keep_alive: int
+    limit_concurrency: Optional[int]
+    reuse_port: bool
+    stop_timeout: float
+
+
+def make_serve_options(options: CliOptions, overrides: dict) -> ServeOptions:
+    """Merge CLI flags over .pantamrc.json over defaults"""
+    defaults: ServeOptions = {
+        "workers": cpu_count() or 1,
+        "loop": "auto",
+        "http": "auto",
+        "backlog": 2048,
+        "timeout_keep_alive": 5,
+        "limit_concurrency": None,
+        "reuse_port": False,
+        "stop_timeout": 45.0,
+    }
+    serve_options: ServeOptions = defaults
+    for key in defaults:
+        value = overrides.get(key)
+        if value is None:
+            value = options.get(key)
+        if value is not None:
+            serve_options[key] = value  # type: ignore
+    return serve_options
+
+
+def run_serve(dev_mode: bool, **overrides) -> None:
     """Serve a Pantam application"""
     clear()
     options = load_pantamrc_file()
@@ -17,7 +52,31 @@ def run_serve(dev_mode: bool) -> None:
         if getenv("PANTAM_ENV", default="development") == "production"
         else options["dev_port"]
     )
-    run("%s:app" % entrypoint, port=listen_port, reload=dev_mode)
+    if dev_mode:
+        run("%s:app" % entrypoint, port=listen_port, reload=True)
+        return
+
+    serve_options = make_serve_options(options, overrides)
+    config = Config(
+        "%s:app" % entrypoint,
+        port=listen_port,
+        workers=serve_options["workers"],
+        loop=serve_options["loop"],
+        http=serve_options["http"],
+        backlog=serve_options["backlog"],
+        timeout_keep_alive=serve_options["timeout_keep_alive"],
+        limit_concurrency=serve_options["limit_concurrency"],
+    )
+    if config.workers > 1 or serve_options["reuse_port"]:
+        from pantam_cli.supervisor import Supervisor
+
+        Supervisor(
+            config,
+            reuse_port=serve_options["reuse_port"],
+            stop_timeout=serve_options["stop_timeout"],
+        ).run()
+    else:
+        DrainingServer(config=config).run()
 
 
 if __name__ == "__main__":
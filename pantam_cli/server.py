@@ -0,0 +1,27 @@
+from asyncio import Future, ensure_future
+from typing import Any, Optional
+from uvicorn import Config, Server
+from pantam.draining import drain_all
+
+
+class DrainingServer(Server):
+    """uvicorn server that drains Pantam apps before it stops listening"""
+
+    def __init__(self, config: Config) -> None:
+        super().__init__(config=config)
+        self.drain_task: Optional[Future] = None
+
+    def handle_exit(self, sig: int, frame: Any) -> None:
+        """Drain on the first signal, stop without waiting on the second"""
+        if self.drain_task is None:
+            self.drain_task = ensure_future(self.drain_and_exit(sig, frame))
+            return
+        self.drain_task.cancel()
+        super().handle_exit(sig, frame)
+
+    async def drain_and_exit(self, sig: int, frame: Any) -> None:
+        try:
+            await drain_all()
+        finally:
+            if not self.should_exit:
+                super().handle_exit(sig, frame)
@@ -0,0 +1,182 @@
+import os
+import signal
+import socket
+from functools import partial
+from multiprocessing.context import SpawnProcess
+from threading import Event, Thread
+from time import monotonic, sleep
+from typing import Any, List, Optional
+from uvicorn import Config
+from uvicorn.subprocess import get_subprocess
+from pantam_cli.server import DrainingServer
+from pantam_cli.utils.messages import error_msg, info_msg, write_error, write_msg
+
+HANDLED_SIGNALS = (signal.SIGINT, signal.SIGTERM)
+
+CHECK_INTERVAL = 0.5
+
+MIN_UPTIME = 1.0
+
+
+def bind_reuse_port_socket(config: Config) -> socket.socket:
+    """Bind a socket that shares its port with the other workers"""
+    family, kind, proto, _, address = socket.getaddrinfo(
+        config.host, config.port, type=socket.SOCK_STREAM, flags=socket.AI_PASSIVE
+    )[0]
+    sock = socket.socket(family, kind, proto)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind(address)
+    sock.set_inheritable(True)
+    return sock
+
+
+def watch_parent(parent: int) -> None:
+    """Drain and stop this worker once its supervisor is gone, e.g. killed"""
+    while os.getppid() == parent:
+        sleep(CHECK_INTERVAL)
+    os.kill(os.getpid(), signal.SIGTERM)
+
+
+def run_worker(
+    server: DrainingServer,
+    sockets: Optional[List[socket.socket]] = None,
+    parent: Optional[int] = None,
+) -> None:
+    """Run a worker in a process group of its own, so signals sent to the
+    terminal's process group, e.g. by Ctrl-C, only reach it via the supervisor.
+    The worker stops when the `parent` process exits."""
+    if hasattr(os, "setpgrp"):
+        os.setpgrp()
+    if parent is not None:
+        Thread(
+            target=watch_parent, args=(parent,), name="pantam-parent", daemon=True
+        ).start()
+    # a forwarded SIGHUP would kill a worker that's still booting, the app
+    # handles it once started
+    if hasattr(signal, "SIGHUP"):
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    server.run(sockets=sockets)
+
+
+class Supervisor:
+    """Run uvicorn workers in child processes and restart any that crash"""
+
+    def __init__(
+        self, config: Config, reuse_port: bool = False, stop_timeout: float = 45.0
+    ) -> None:
+        self.config = config
+        self.reuse_port = reuse_port
+        self.stop_timeout = stop_timeout
+        self.sockets: List[socket.socket] = []
+        self.processes: List[SpawnProcess] = []
+        self.started: List[float] = []
+        self.should_exit = Event()
+        self.stopping = False
+        self.exit_signal = signal.SIGINT
+
+    def signal_handler(self, sig: int, frame: Any) -> None:
+        """Stop supervising and pass the signal on to workers. Signals sent
+        while workers stop are passed on straight away, so they stop without
+        waiting for the drain to end."""
+        self.exit_signal = sig
+        self.should_exit.set()
+        if self.stopping:
+            self.forward(sig)
+
+    def reload_handler(self, sig: int, frame: Any) -> None:
+        """Pass SIGHUP on to workers so they reload changed actions"""
+        self.forward(sig)
+
+    def forward(self, sig: int) -> None:
+        """Send a signal to the workers that are running"""
+        for process in self.processes:
+            if process.is_alive() and process.pid is not None:
+                try:
+                    os.kill(process.pid, sig)
+                except OSError as error:
+                    write_error(
+                        error_msg(
+                            "Could not signal worker [%s]: %s" % (process.pid, error)
+                        )
+                    )
+
+    def spawn(self, index: int) -> SpawnProcess:
+        """Start a worker process"""
+        server = DrainingServer(config=self.config)
+        sockets = [self.sockets[index if self.reuse_port else 0]]
+        process = get_subprocess(
+            config=self.config,
+            target=partial(run_worker, server, parent=os.getpid()),
+            sockets=sockets,
+        )
+        process.start()
+        return process
+
+    def startup(self) -> None:
+        """Bind sockets and start workers"""
+        for sig in HANDLED_SIGNALS:
+            signal.signal(sig, self.signal_handler)
+        if hasattr(signal, "SIGHUP"):
+            signal.signal(signal.SIGHUP, self.reload_handler)
+
+        if self.reuse_port:
+            self.sockets = [
+                bind_reuse_port_socket(self.config) for _ in range(self.config.workers)
+            ]
+        else:
+            self.sockets = [self.config.bind_socket()]
+
+        write_msg(
+            info_msg(
+                "Starting %d workers on port %d [%d]\n"
+                % (self.config.workers, self.config.port, os.getpid())
+            )
+        )
+        self.processes = [self.spawn(index) for index in range(self.config.workers)]
+        self.started = [monotonic()] * self.config.workers
+
+    def restart_crashed(self) -> None:
+        """Replace workers that exited while the supervisor is running"""
+        for index, process in enumerate(self.processes):
+            if process.is_alive() or self.should_exit.is_set():
+                continue
+            if monotonic() - self.started[index] < MIN_UPTIME:
+                write_error(error_msg("Worker [%s] failed to start!" % process.pid))
+                self.should_exit.set()
+                return
+            write_error(
+                error_msg(
+                    "Worker [%s] exited with code %s, restarting..."
+                    % (process.pid, process.exitcode)
+                )
+            )
+            self.processes[index] = self.spawn(index)
+            self.started[index] = monotonic()
+
+    def shutdown(self) -> None:
+        """Stop workers, killing those still running after `stop_timeout`"""
+        self.stopping = True
+        self.forward(self.exit_signal)
+        deadline = monotonic() + self.stop_timeout
+        for process in self.processes:
+            process.join(max(deadline - monotonic(), 0.0))
+        for process in self.processes:
+            if process.is_alive():
+                write_error(
+                    error_msg(
+                        "Worker [%s] did not stop within %ss, killing it."
+                        % (process.pid, self.stop_timeout)
+                    )
+                )
+                process.kill()
+                process.join()
+        for sock in self.sockets:
+            sock.close()
+
+    def run(self) -> None:
+        """Supervise workers until interrupted"""
+        self.startup()
+        while not self.should_exit.wait(CHECK_INTERVAL):
+            self.restart_crashed()
+        self.shutdown()
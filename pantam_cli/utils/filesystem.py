@@ -23,13 +23,25 @@ def make_class_name(file_name: str) -> str:
     return file_name.replace(r".py", "").replace("_", " ").title().replace(" ", "")
 
 
-class CliOptions(TypedDict):
+class RequiredCliOptions(TypedDict):
     actions_folder: str
     entrypoint: str
     dev_port: int
     port: int
 
 
+class CliOptions(RequiredCliOptions, total=False):
+    actions_index: str
+    manifest: str
+    workers: int
+    loop: str
+    http: str
+    backlog: int
+    timeout_keep_alive: int
+    limit_concurrency: int
+    reuse_port: bool
+
+
 def create_pantamrc_file(options: CliOptions) -> None:
     """Create pantamrc.json file"""
     create_file("./.pantamrc.json", dumps(options))
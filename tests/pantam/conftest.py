@@ -0,0 +1,31 @@
+# pylint: disable=missing-function-docstring
+import pytest
+from starlette.requests import Request
+
+
+@pytest.fixture
+def make_request():
+    """Build requests for calling wrapped endpoints directly"""
+
+    def build(method="GET", path="/", path_params=None, query=b"", headers=None):
+        scope = {
+            "type": "http",
+            "method": method,
+            "path": path,
+            "path_params": path_params or {},
+            "query_string": query,
+            "headers": [
+                (name.lower().encode(), value.encode())
+                for name, value in (headers or {}).items()
+            ],
+            "server": ("testserver", 80),
+            "scheme": "http",
+            "root_path": "",
+        }
+
+        async def receive():
+            return {"type": "http.request", "body": b"", "more_body": False}
+
+        return Request(scope, receive)
+
+    return build
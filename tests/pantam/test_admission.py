@@ -0,0 +1,128 @@
+# pylint: disable=missing-function-docstring too-few-public-methods
+from asyncio import Event, ensure_future, gather, run, sleep
+from time import sleep as block
+from starlette.responses import PlainTextResponse
+from pantam import JSONStreamResponse, deadline
+from pantam.admission import Admission, Limiter
+from pantam.deadlines import Deadlines
+from pantam.executors import Executors
+from pantam.subrequest import subrequest
+
+
+class MockLimitedAction:
+    max_in_flight = 1
+
+
+class MockAction:
+    pass
+
+
+@deadline(0.05)
+class MockStuckAction:
+    max_in_flight = 1
+
+    def fetch_all(self, request):
+        block(0.2)
+        return PlainTextResponse("late")
+
+
+def test_limiter_queues_and_times_out():
+    async def scenario():
+        limiter = Limiter(1, 1)
+        assert await limiter.acquire(0.1)
+        queued = ensure_future(limiter.acquire(1.0))
+        await sleep(0)
+        rejected = await limiter.acquire(1.0)
+
+        async def release_soon():
+            await sleep(0.01)
+            limiter.release()
+
+        granted, _ = await gather(queued, release_soon())
+        timed_out = await limiter.acquire(0.01)
+        limiter.release()
+        return rejected, granted, timed_out, limiter.in_flight
+
+    assert run(scenario()) == (False, True, False, 0)
+
+
+def test_admission_rejects_with_retry_after(make_request):
+    release = Event()
+
+    async def endpoint(request):
+        await release.wait()
+        return PlainTextResponse("ok")
+
+    async def scenario():
+        admission = Admission(max_queue=1, max_queue_time=0.05, retry_after=3)
+        limited = admission.wrap(endpoint, MockLimitedAction(), "limited")
+        requests = [limited(make_request()) for _ in range(3)]
+
+        async def release_later():
+            await sleep(0.1)
+            release.set()
+
+        responses = await gather(*requests, release_later())
+        return admission, [response.status_code for response in responses[:3]], responses
+
+    admission, statuses, responses = run(scenario())
+    assert sorted(statuses) == [200, 503, 503]
+    rejected = [response for response in responses[:3] if response.status_code == 503]
+    assert rejected[0].headers["retry-after"] == "3"
+    assert admission.rejected == 2
+    assert admission.action_limiters["limited"].in_flight == 0
+
+
+def test_admission_skips_unlimited_actions():
+    admission = Admission()
+
+    async def endpoint(request):
+        return PlainTextResponse("ok")
+
+    assert admission.wrap(endpoint, MockAction(), "index") is endpoint
+
+
+def test_abandoned_sync_methods_keep_their_slot(make_request):
+    action = MockStuckAction()
+    admission = Admission(max_queue=0)
+    endpoint = Executors().wrap(action, "fetch_all")
+    endpoint = Deadlines().wrap(endpoint, action, "fetch_all")
+    endpoint = admission.wrap(endpoint, action, "stuck")
+    limiter = admission.action_limiters["stuck"]
+
+    async def scenario():
+        timed_out = await endpoint(make_request())
+        in_flight = limiter.in_flight
+        rejected = await endpoint(make_request())
+        await sleep(0.3)
+        return timed_out.status_code, in_flight, rejected.status_code
+
+    assert run(scenario()) == (504, 1, 503)
+    assert limiter.in_flight == 0
+
+
+def test_streams_hold_their_slot_until_sent(make_request):
+    admission = Admission(max_queue=0)
+
+    async def items():
+        for index in range(3):
+            await sleep(0)
+            yield index
+
+    async def endpoint(request):
+        return JSONStreamResponse(items())
+
+    limited = admission.wrap(endpoint, MockLimitedAction(), "limited")
+    limiter = admission.action_limiters["limited"]
+
+    async def scenario():
+        stream = await limited(make_request())
+        in_flight = limiter.in_flight
+        rejected = await limited(make_request())
+        sent = await subrequest(stream, "GET", "/")
+        unsent = await limited(make_request())
+        await unsent.body_iterator.aclose()
+        return in_flight, rejected.status_code, sent["body"]
+
+    assert run(scenario()) == (1, 503, b"0\n1\n2\n")
+    assert limiter.in_flight == 0
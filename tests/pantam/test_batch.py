@@ -0,0 +1,88 @@
+# pylint: disable=missing-function-docstring
+from asyncio import run, sleep
+from json import loads
+from pytest import raises
+from starlette.routing import Route, Router
+from pantam import JSONResponse, PlainTextResponse
+from pantam.batch import BatchError, encode_response, parse_batch, run_batch
+
+active = {"now": 0, "max": 0}
+
+
+async def fetch_single(request):
+    active["now"] += 1
+    active["max"] = max(active["max"], active["now"])
+    await sleep(0.01)
+    active["now"] -= 1
+    return JSONResponse(
+        {"id": request.path_params["id"], "user": request.headers.get("x-user")}
+    )
+
+
+async def create(request):
+    return PlainTextResponse((await request.body()).decode("utf-8"), status_code=201)
+
+
+app = Router(
+    [
+        Route("/items/{id}", fetch_single, methods=["GET"]),
+        Route("/items/", create, methods=["POST"]),
+    ]
+)
+
+
+def test_parse_batch_validates_requests():
+    with raises(BatchError):
+        parse_batch({"path": "/"}, {}, "/_batch", 10)
+    with raises(BatchError):
+        parse_batch([{"path": "/"}] * 11, {}, "/_batch", 10)
+    with raises(BatchError):
+        parse_batch([{"method": "PUT", "path": "/"}], {}, "/_batch", 10)
+    with raises(BatchError):
+        parse_batch([{"path": "/_batch/"}], {}, "/_batch", 10)
+
+    requests = parse_batch(
+        [{"path": "/items/1"}, {"method": "post", "path": "/items/", "body": {"a": 1}}],
+        {"x-user": "homer", "content-length": "99"},
+        "/_batch",
+        10,
+    )
+    assert requests[0] == {
+        "method": "GET",
+        "path": "/items/1",
+        "body": b"",
+        "headers": {"x-user": "homer"},
+    }
+    assert requests[1]["body"] == b'{"a":1}'
+    assert requests[1]["headers"]["content-type"] == "application/json"
+
+
+def test_run_batch_concurrently_in_order():
+    data = [{"path": "/items/%d" % index} for index in range(6)]
+    data.append({"method": "POST", "path": "/items/", "body": "created"})
+    data.append({"path": "/missing"})
+    requests = parse_batch(data, {"x-user": "homer"}, "/_batch", 10)
+
+    responses = loads(run(run_batch(app, requests, 3)))
+    assert [response["body"]["id"] for response in responses[:6]] == [
+        str(index) for index in range(6)
+    ]
+    assert responses[0]["body"]["user"] == "homer"
+    assert responses[6]["status"] == 201
+    assert responses[6]["body"] == "created"
+    assert responses[7]["status"] == 404
+    assert active["max"] == 3
+
+
+def test_encode_invalid_json_and_binary_bodies():
+    broken = encode_response(
+        {"status": 200, "headers": [("content-type", "application/json")], "body": b"{"}
+    )
+    binary = encode_response({"status": 200, "headers": [], "body": b"\xff\x00"})
+    assert loads(broken)["body"] == "{"
+    assert loads(binary) == {
+        "status": 200,
+        "headers": {},
+        "body": "/wA=",
+        "encoding": "base64",
+    }
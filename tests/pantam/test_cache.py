@@ -0,0 +1,91 @@
+# pylint: disable=missing-function-docstring too-few-public-methods
+from asyncio import run
+from starlette.responses import PlainTextResponse
+from pantam import cache
+from pantam.cache import ResponseCache
+
+
+class MockCachedAction:
+    def __init__(self):
+        self.calls = 0
+
+    @cache(ttl=60, query_params=["page"])
+    async def fetch_single(self, request):
+        self.calls += 1
+        return PlainTextResponse("item %s" % request.path_params["id"])
+
+    async def update(self, request):
+        return PlainTextResponse("updated")
+
+
+class MockUncachedAction:
+    async def update(self, request):
+        return PlainTextResponse("updated")
+
+
+def wrap(response_cache, action, method, verb):
+    return response_cache.wrap(
+        getattr(action, method), action, "index", method, verb
+    )
+
+
+def test_cache_hits_and_misses(make_request):
+    response_cache = ResponseCache(1024 * 1024)
+    action = MockCachedAction()
+    endpoint = wrap(response_cache, action, "fetch_single", "get")
+
+    async def scenario():
+        first = await endpoint(
+            make_request(query=b"page=1&sort=asc", path="/1", path_params={"id": "1"})
+        )
+        second = await endpoint(
+            make_request(query=b"page=1&sort=desc", path="/1", path_params={"id": "1"})
+        )
+        third = await endpoint(
+            make_request(query=b"page=2", path="/1", path_params={"id": "1"})
+        )
+        return first, second, third
+
+    first, second, third = run(scenario())
+    assert first.body == second.body == third.body == b"item 1"
+    assert second.headers["content-type"] == "text/plain; charset=utf-8"
+    assert action.calls == 2
+    stats = response_cache.stats()
+    assert (stats["hits"], stats["misses"], stats["entries"]) == (1, 2, 2)
+
+
+def test_cache_evicts_least_recently_used(make_request):
+    response_cache = ResponseCache(700)
+    action = MockCachedAction()
+    endpoint = wrap(response_cache, action, "fetch_single", "get")
+
+    async def scenario():
+        for uid in ("1", "2", "1", "3", "1"):
+            await endpoint(make_request(path="/" + uid, path_params={"id": uid}))
+
+    run(scenario())
+    assert action.calls == 3
+    assert response_cache.stats()["evictions"] == 1
+    assert response_cache.stats()["bytes"] <= 700
+
+
+def test_cache_invalidated_by_update(make_request):
+    response_cache = ResponseCache(1024 * 1024)
+    action = MockCachedAction()
+    fetch = wrap(response_cache, action, "fetch_single", "get")
+    update = wrap(response_cache, action, "update", "patch")
+
+    async def scenario():
+        await fetch(make_request(path="/1", path_params={"id": "1"}))
+        await update(make_request("PATCH", path="/1", path_params={"id": "1"}))
+        await fetch(make_request(path="/1", path_params={"id": "1"}))
+
+    run(scenario())
+    assert action.calls == 2
+    assert response_cache.stats()["invalidations"] == 1
+
+
+def test_uncached_actions_are_not_wrapped():
+    response_cache = ResponseCache(1024 * 1024)
+    action = MockUncachedAction()
+    assert wrap(response_cache, action, "update", "patch") == action.update
@@ -0,0 +1,63 @@
+# pylint: disable=missing-function-docstring too-few-public-methods
+from asyncio import gather, run, sleep
+from starlette.responses import PlainTextResponse
+from pantam import coalesce
+from pantam.coalesce import Coalescer
+
+
+class MockCoalescedAction:
+    def __init__(self):
+        self.calls = 0
+
+    @coalesce()
+    async def fetch_single(self, request):
+        self.calls += 1
+        await sleep(0.01)
+        if request.path_params["id"] == "error":
+            raise ValueError("Fake Error")
+        return PlainTextResponse("item %s" % request.path_params["id"])
+
+
+def wrap(coalescer, action):
+    return coalescer.wrap(action.fetch_single, action, "index", "fetch_single", "get")
+
+
+def test_coalesce_identical_requests(make_request):
+    coalescer = Coalescer()
+    action = MockCoalescedAction()
+    endpoint = wrap(coalescer, action)
+
+    async def scenario():
+        return await gather(
+            *[
+                endpoint(make_request(path="/1", path_params={"id": "1"}))
+                for _ in range(10)
+            ],
+            endpoint(make_request(path="/2", path_params={"id": "2"})),
+        )
+
+    responses = run(scenario())
+    assert action.calls == 2
+    assert coalescer.coalesced == 9
+    assert [response.body for response in responses[:10]] == [b"item 1"] * 10
+    assert responses[10].body == b"item 2"
+    assert coalescer.flights == {}
+
+
+def test_coalesce_shares_errors(make_request):
+    coalescer = Coalescer()
+    action = MockCoalescedAction()
+    endpoint = wrap(coalescer, action)
+
+    async def scenario():
+        return await gather(
+            *[
+                endpoint(make_request(path="/error", path_params={"id": "error"}))
+                for _ in range(3)
+            ],
+            return_exceptions=True,
+        )
+
+    results = run(scenario())
+    assert action.calls == 1
+    assert all(isinstance(result, ValueError) for result in results)
@@ -0,0 +1,59 @@
+# pylint: disable=missing-function-docstring
+from asyncio import run
+from gzip import decompress
+from starlette.responses import PlainTextResponse, Response
+from pantam import JSONStreamResponse
+from pantam.compression import CompressionMiddleware, negotiate
+from pantam.subrequest import subrequest
+
+BODY = "pantam " * 200
+
+
+def make_app(response):
+    async def app(scope, receive, send):
+        await response(scope, receive, send)
+
+    return CompressionMiddleware(app, minimum_size=500)
+
+
+def get(app, accept_encoding="gzip"):
+    return run(subrequest(app, "GET", "/", headers={"accept-encoding": accept_encoding}))
+
+
+def test_negotiate_encoding():
+    assert negotiate("gzip, deflate, br", ["zstd", "br", "gzip"]) == "br"
+    assert negotiate("gzip;q=1.0, br;q=0.5", ["zstd", "br", "gzip"]) == "gzip"
+    assert negotiate("br;q=0, identity", ["br", "gzip"]) is None
+    assert negotiate("*", ["br", "gzip"]) == "br"
+    assert negotiate("", ["gzip"]) is None
+
+
+def test_compress_large_bodies_and_cache_them():
+    app = make_app(PlainTextResponse(BODY))
+    response = get(app)
+    headers = dict(response["headers"])
+    assert headers["content-encoding"] == "gzip"
+    assert headers["vary"] == "Accept-Encoding"
+    assert int(headers["content-length"]) == len(response["body"])
+    assert decompress(response["body"]).decode("utf-8") == BODY
+
+    assert get(app)["body"] == response["body"]
+    assert app.cache.stats()["hits"] == 1
+
+    assert get(app, "identity")["body"] == BODY.encode("utf-8")
+
+
+def test_skip_small_and_compressed_bodies():
+    small = get(make_app(PlainTextResponse("small")))
+    assert "content-encoding" not in dict(small["headers"])
+    image = get(make_app(Response(b"\x89PNG" * 500, media_type="image/png")))
+    assert "content-encoding" not in dict(image["headers"])
+
+
+def test_compress_streams_with_gzip():
+    items = [{"id": index} for index in range(1000)]
+    response = get(make_app(JSONStreamResponse(iter(items))), "br, gzip")
+    headers = dict(response["headers"])
+    assert headers["content-encoding"] == "gzip"
+    assert "content-length" not in headers
+    assert len(decompress(response["body"]).splitlines()) == 1000
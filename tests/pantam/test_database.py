@@ -0,0 +1,74 @@
+# pylint: disable=missing-function-docstring
+from asyncio import gather, run, sleep as async_sleep
+from sqlite3 import Row
+from threading import Thread
+from time import sleep
+from pantam.services import SqlitePool
+
+
+def test_pool_reuses_connections(tmp_path):
+    pool = SqlitePool(str(tmp_path / "db"), size=2)
+    pool.open()
+    with pool.connection() as connection:
+        with pool.connection() as nested:
+            assert nested is connection
+    with pool.connection() as again:
+        assert again is connection
+    assert pool.stats()["connections"] == 1
+    pool.close()
+    assert pool.stats()["connections"] == 0
+
+
+def test_interleaved_holders_get_their_own_connection(tmp_path):
+    pool = SqlitePool(str(tmp_path / "db"), size=2)
+
+    async def hold():
+        with pool.connection() as connection:
+            await async_sleep(0.01)
+            with pool.connection() as nested:
+                assert nested is connection
+            return connection
+
+    async def scenario():
+        return await gather(hold(), hold())
+
+    first, second = run(scenario())
+    assert first is not second
+    assert pool.stats()["connections"] == 2
+    assert pool.stats()["idle"] == 2
+    pool.close()
+
+
+def test_pool_is_bounded(tmp_path):
+    pool = SqlitePool(str(tmp_path / "db"), size=1, timeout=5)
+
+    def hold():
+        with pool.connection():
+            sleep(0.05)
+
+    thread = Thread(target=hold)
+    thread.start()
+    sleep(0.01)
+    with pool.connection():
+        pass
+    thread.join()
+    stats = pool.stats()
+    assert stats["connections"] == 1
+    assert stats["checkouts"] == 2
+    assert stats["max_wait_time"] > 0.01
+
+
+def test_pool_async_queries(tmp_path):
+    pool = SqlitePool(str(tmp_path / "db"), row_factory=Row)
+
+    async def scenario():
+        await pool.execute("CREATE TABLE cart (product text, cost integer)")
+        await pool.execute("INSERT INTO cart VALUES (?, ?)", ("Ducati", 25000))
+        rows = await pool.fetch_all("SELECT * FROM cart")
+        total = await pool.fetch_one("SELECT SUM(cost) AS total FROM cart")
+        return rows, total
+
+    rows, total = run(scenario())
+    assert rows[0]["product"] == "Ducati"
+    assert total["total"] == 25000
+    pool.close()
@@ -0,0 +1,61 @@
+# pylint: disable=missing-function-docstring
+from asyncio import CancelledError, run, sleep
+from time import sleep as block
+from pantam import PlainTextResponse, deadline, time_remaining
+from pantam.deadlines import Deadlines
+from pantam.executors import Executors
+
+
+@deadline(0.05)
+class MockSlowAction:
+    def __init__(self):
+        self.cancelled = False
+        self.budget = None
+
+    async def fetch_all(self, request):
+        self.budget = time_remaining(request)
+        try:
+            await sleep(1)
+        except CancelledError:
+            self.cancelled = True
+            raise
+        return PlainTextResponse("late")
+
+    def fetch_single(self, request):
+        block(0.1)
+        return PlainTextResponse("late")
+
+    @deadline(1)
+    async def create(self, request):
+        await sleep(0.01)
+        return PlainTextResponse("Created!")
+
+
+def call(deadlines, action, method, request):
+    endpoint = deadlines.wrap(Executors().wrap(action, method), action, method)
+    return run(endpoint(request))
+
+
+def test_cancel_async_methods_at_deadline(make_request):
+    deadlines = Deadlines()
+    action = MockSlowAction()
+    response = call(deadlines, action, "fetch_all", make_request())
+    assert response.status_code == 504
+    assert action.cancelled
+    assert 0 < action.budget <= 0.05
+    assert (deadlines.exceeded, deadlines.abandoned) == (1, 0)
+
+
+def test_abandon_sync_methods_at_deadline(make_request):
+    deadlines = Deadlines()
+    response = call(deadlines, MockSlowAction(), "fetch_single", make_request())
+    assert response.status_code == 504
+    assert (deadlines.exceeded, deadlines.abandoned) == (1, 1)
+
+
+def test_method_deadline_overrides_class_and_app(make_request):
+    deadlines = Deadlines(default=0.001)
+    assert (
+        call(deadlines, MockSlowAction(), "create", make_request()).status_code == 200
+    )
+    assert deadlines.exceeded == 0
@@ -0,0 +1,85 @@
+# pylint: disable=missing-function-docstring
+from asyncio import Event, ensure_future, run, sleep
+from time import monotonic
+from unittest.mock import Mock
+from pantam import Pantam, PlainTextResponse
+from pantam.draining import drain_all, drain_callbacks
+from pantam.subrequest import subrequest
+
+calls = []
+
+
+class MockSlow:
+    released: Event
+
+    async def fetch_all(self, request):
+        await self.released.wait()
+        return PlainTextResponse("slow")
+
+    def get_quick(self, request):
+        return PlainTextResponse("quick")
+
+    async def on_shutdown(self):
+        calls.append("action")
+
+
+def make_pantam(**options):
+    pantam = Pantam(**options)
+    pantam.read_actions_folder = Mock(return_value=["index.py"])  # type: ignore
+    pantam.import_action_module = Mock(return_value=MockSlow)  # type: ignore
+    pantam.build()
+    return pantam
+
+
+def test_drain_waits_for_requests_in_flight():
+    pantam = make_pantam()
+
+    async def scenario():
+        MockSlow.released = Event()
+        await pantam.handle_startup()
+        assert drain_callbacks == [pantam.drain]
+        slow = ensure_future(subrequest(pantam.app, "GET", "/"))
+        await sleep(0.01)
+        draining = ensure_future(drain_all())
+        await sleep(0.01)
+        responses = [
+            await subrequest(pantam.app, "GET", path)
+            for path in ("/quick/", "/readyz", "/healthz")
+        ]
+        assert not draining.done()
+        MockSlow.released.set()
+        await draining
+        await pantam.handle_shutdown()
+        return await slow, responses
+
+    slow, (quick, ready, health) = run(scenario())
+    assert slow["body"] == b"slow"
+    assert quick["status"] == 503
+    assert ("retry-after", "1") in quick["headers"]
+    assert ready["status"] == 503
+    assert health["status"] == 200
+    assert pantam.get_counters()["drain_rejected_total"] == 1
+    assert drain_callbacks == []
+
+
+def test_drain_and_shutdown_hooks_have_deadlines():
+    async def stuck():
+        calls.append("app")
+        await sleep(60)
+
+    pantam = make_pantam(drain_timeout=0.05, shutdown_timeout=0.05, on_shutdown=stuck)
+
+    async def scenario():
+        MockSlow.released = Event()
+        await pantam.handle_startup()
+        slow = ensure_future(subrequest(pantam.app, "GET", "/"))
+        await sleep(0.01)
+        started = monotonic()
+        await pantam.handle_shutdown()
+        elapsed = monotonic() - started
+        slow.cancel()
+        return elapsed
+
+    calls.clear()
+    assert run(scenario()) < 1
+    assert sorted(calls) == ["action", "app"]
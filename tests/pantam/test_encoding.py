@@ -0,0 +1,63 @@
+# pylint: disable=missing-function-docstring
+from dataclasses import dataclass
+from datetime import date, datetime
+from decimal import Decimal
+from json import loads
+from sqlite3 import Row, connect
+from unittest.mock import patch
+from pantam import JSONResponse
+from pantam.encoding import dumps
+
+
+@dataclass
+class MockEvent:
+    name: str
+    day: date
+
+
+def fetch_rows():
+    connection = connect(":memory:")
+    connection.row_factory = Row
+    return connection.execute("SELECT 1 AS id, 'party' AS name").fetchall()
+
+
+def test_dumps_converts_rows_dataclasses_and_dates():
+    data = {
+        "rows": fetch_rows(),
+        "event": MockEvent("party", date(2021, 3, 30)),
+        "time": datetime(2021, 3, 30, 12, 30),
+        "price": Decimal("9.99"),
+        "ids": {3},
+        1: "non string key",
+    }
+    expected = {
+        "rows": [{"id": 1, "name": "party"}],
+        "event": {"name": "party", "day": "2021-03-30"},
+        "time": "2021-03-30T12:30:00",
+        "price": "9.99",
+        "ids": [3],
+        "1": "non string key",
+    }
+    assert loads(dumps(data)) == expected
+    with patch("pantam.encoding.orjson", None):
+        assert loads(dumps(data)) == expected
+
+
+def test_dumps_falls_back_for_big_integers():
+    assert dumps({"big": 2 ** 70}) == b'{"big":1180591620717411303424}'
+
+
+def test_dumps_writes_nan_as_null_with_either_backend():
+    data = {"nan": float("nan"), "values": (1.5, float("inf"))}
+    expected = b'{"nan":null,"values":[1.5,null]}'
+    assert dumps(data) == expected
+    with patch("pantam.encoding.orjson", None):
+        assert dumps(data) == expected
+        assert dumps(MockEvent("party", float("-inf"))) == b'{"name":"party","day":null}'
+
+
+def test_json_response_passes_bytes_through():
+    response = JSONResponse(b'{"cached":true}')
+    assert response.body == b'{"cached":true}'
+    assert response.headers["content-type"] == "application/json"
+    assert JSONResponse({"text": "héllo"}).body == '{"text":"héllo"}'.encode("utf-8")
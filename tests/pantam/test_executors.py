@@ -0,0 +1,85 @@
+# pylint: disable=missing-function-docstring too-few-public-methods
+from asyncio import run
+from threading import current_thread, main_thread
+import pytest
+from starlette.responses import PlainTextResponse
+from pantam import executor
+from pantam.executors import Executors, get_policy
+from pantam.services import SqlitePool
+
+
+@executor("thread", max_workers=2)
+class MockThreadAction:
+    def fetch_all(self, request):
+        return PlainTextResponse(current_thread().name)
+
+    @executor("inline")
+    def fetch_single(self, request):
+        return PlainTextResponse(current_thread().name)
+
+
+class MockProcessAction:
+    @staticmethod
+    @executor("process")
+    def get_sum(data):
+        return PlainTextResponse(str(int(data["path_params"]["id"]) + 1))
+
+
+def test_get_policy():
+    action = MockThreadAction()
+    assert get_policy(action, "fetch_all") == {"kind": "thread", "max_workers": 2}
+    assert get_policy(action, "fetch_single") == {"kind": "inline"}
+    assert get_policy(MockProcessAction(), "get_sum") == {"kind": "process"}
+
+
+def test_thread_and_inline_policies(make_request):
+    executors = Executors()
+    action = MockThreadAction()
+
+    async def call(method):
+        response = await executors.wrap(action, method)(make_request())
+        return response.body.decode()
+
+    assert run(call("fetch_all")).startswith("pantam-MockThreadAction")
+    assert run(call("fetch_single")) == main_thread().name
+    assert list(executors.thread_pools) == ["MockThreadAction"]
+    executors.shutdown()
+
+
+class MockServiceProcessAction:
+    def __init__(self):
+        self.pool = SqlitePool(":memory:")
+
+    @executor("process")
+    def get_sum(self, data):
+        return PlainTextResponse("unreachable")
+
+
+def test_process_policy_requires_static_methods():
+    with pytest.raises(TypeError) as error:
+        Executors().wrap(MockServiceProcessAction(), "get_sum")
+    assert "static method" in str(error.value)
+
+
+def test_process_policy(make_request):
+    executors = Executors(process_pool_size=1)
+    endpoint = executors.wrap(MockProcessAction(), "get_sum")
+    response = run(
+        endpoint(make_request(path="/7", path_params={"id": "7"}, query=b"q=1"))
+    )
+    assert response.body == b"8"
+    executors.shutdown()
+
+
+def test_shutdown_stops_default_pool():
+    executors = Executors(default_pool_size=2)
+
+    async def scenario():
+        executors.start()
+        pool = executors.default_pool
+        executors.shutdown()
+        return pool
+
+    pool = run(scenario())
+    assert pool is not None and pool._shutdown  # pylint: disable=protected-access
+    assert executors.default_pool is None
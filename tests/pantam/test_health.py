@@ -0,0 +1,61 @@
+# pylint: disable=missing-function-docstring
+from asyncio import gather, run, sleep
+from json import loads
+from starlette.responses import PlainTextResponse
+from pantam.health import HealthCheck, Readiness, collect_checks
+from pantam.services import SqlitePool
+from pantam.subrequest import subrequest
+
+calls = {"database": 0, "cache": 0}
+
+
+async def database():
+    calls["database"] += 1
+    await sleep(0.01)
+
+
+def cache():
+    calls["cache"] += 1
+    raise ConnectionError("refused")
+
+
+async def routed_app(scope, receive, send):
+    await PlainTextResponse("routed")(scope, receive, send)
+
+
+def test_health_check_skips_routing():
+    app = HealthCheck(routed_app, Readiness({}, lambda: True))
+    health = run(subrequest(app, "GET", "/healthz"))
+    assert health["status"] == 200
+    assert health["body"] == "👋".encode("utf-8")
+    assert run(subrequest(app, "GET", "/other"))["body"] == b"routed"
+
+
+def test_readiness_runs_checks_concurrently_and_caches():
+    readiness = Readiness({"database": database, "cache": cache}, lambda: True, 60)
+    app = HealthCheck(routed_app, readiness)
+
+    async def probe():
+        return await gather(*[subrequest(app, "GET", "/readyz") for _ in range(5)])
+
+    responses = run(probe())
+    run(subrequest(app, "GET", "/readyz"))
+    assert calls == {"database": 1, "cache": 1}
+    assert responses[0]["status"] == 503
+    assert loads(responses[0]["body"]) == {
+        "ready": False,
+        "checks": {"database": "ok", "cache": "ConnectionError: refused"},
+    }
+
+
+def test_readiness_fails_until_started():
+    readiness = Readiness({}, lambda: False)
+    response = run(subrequest(HealthCheck(routed_app, readiness), "GET", "/readyz"))
+    assert response["status"] == 503
+
+
+def test_collect_service_checks():
+    pool = SqlitePool(":memory:")
+    checks = collect_checks([database], {"db": pool, "other": object()})
+    assert list(checks) == ["database", "db"]
+    assert run(Readiness(checks, lambda: True).check())["ready"]
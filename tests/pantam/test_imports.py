@@ -0,0 +1,60 @@
+# pylint: disable=missing-function-docstring
+from subprocess import check_output
+from sys import executable
+from typing import Set
+
+# import time budgets in seconds, generous for slow CI hosts
+IMPORT_BUDGETS = {
+    "import pantam": 0.05,
+    "from pantam import Pantam": 0.5,
+    "from pantam import PlainTextResponse": 0.2,
+    "import pantam_cli.cli": 0.15,
+}
+
+TIMER = """
+from time import perf_counter
+start = perf_counter()
+%s
+print(perf_counter() - start)
+"""
+
+
+def loaded_modules(statement: str) -> Set[str]:
+    """Get the modules loaded by `statement` in a fresh interpreter"""
+    output = check_output(
+        [executable, "-c", "%s\nimport sys\nprint('\\n'.join(sys.modules))" % statement]
+    )
+    return set(output.decode("utf-8").split())
+
+
+def import_seconds(statement: str) -> float:
+    """Time `statement` in a fresh interpreter, the best of three runs"""
+    return min(
+        float(check_output([executable, "-c", TIMER % statement])) for _ in range(3)
+    )
+
+
+def test_pantam_imports_app_on_first_use():
+    modules = loaded_modules("import pantam")
+    assert "pantam.pantam" not in modules
+    assert "starlette.requests" not in modules
+    assert "starlette.responses" not in modules
+    responses = loaded_modules("from pantam import PlainTextResponse")
+    assert "pantam.pantam" not in responses
+    assert "starlette.applications" not in responses
+    assert "pantam.pantam" in loaded_modules("from pantam import Pantam")
+
+
+def test_profiling_imports_cprofile_on_first_use():
+    assert "cProfile" not in loaded_modules("from pantam import Pantam")
+
+
+def test_cli_imports_commands_on_first_use():
+    modules = loaded_modules("import pantam_cli.cli")
+    for module in ("pantam", "uvicorn", "prompt_toolkit", "pantam_cli.init"):
+        assert module not in modules
+
+
+def test_import_time_budgets():
+    for statement, budget in IMPORT_BUDGETS.items():
+        assert import_seconds(statement) < budget, statement
@@ -0,0 +1,71 @@
+# pylint: disable=missing-function-docstring
+from io import StringIO
+from json import loads
+from threading import Barrier, Thread
+from time import sleep
+from unittest.mock import patch
+from pantam.services.logger import Logger, QueueWriter
+
+
+def test_queue_writer_batches_lines():
+    stream = StringIO()
+    writer = QueueWriter(stream, 100, "drop")
+    for index in range(10):
+        writer.put("%d\n" % index)
+    writer.close()
+    assert stream.getvalue() == "".join("%d\n" % index for index in range(10))
+
+
+def test_queue_writer_drops_when_full():
+    stream = StringIO()
+    writer = QueueWriter(stream, 1, "drop")
+    writer.thread = object()  # type: ignore
+    writer.put("a\n")
+    writer.put("b\n")
+    assert writer.dropped == 1
+
+
+def test_queue_writer_starts_one_thread():
+    stream = StringIO()
+    writer = QueueWriter(stream, 100, "drop")
+    barrier = Barrier(8)
+    started = []
+
+    class SlowThread(Thread):
+        def __init__(self, *args, **kwargs):
+            started.append(self)
+            sleep(0.01)
+            super().__init__(*args, **kwargs)
+
+    def first_line(index):
+        barrier.wait()
+        writer.put("%d\n" % index)
+
+    with patch("pantam.services.logger.Thread", SlowThread):
+        threads = [Thread(target=first_line, args=(index,)) for index in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    closing = Thread(target=writer.close)
+    closing.start()
+    closing.join(5)
+    assert not closing.is_alive()
+    writer.close()
+    assert len(started) == 1
+    assert len(stream.getvalue().splitlines()) == 8
+
+
+@patch("pantam.services.logger.stdout", new_callable=StringIO)
+def test_json_logger(stdout_mock):
+    logger = Logger("json")
+    logger.info("hello")
+    logger.error("oops")
+    logger.close()
+    records = [loads(line) for line in stdout_mock.getvalue().splitlines()]
+    assert [(record["level"], record["message"]) for record in records] == [
+        ("info", "hello"),
+        ("error", "oops"),
+    ]
+    assert "\x1b" not in stdout_mock.getvalue()
+    assert logger.dropped == 0
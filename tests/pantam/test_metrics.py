@@ -0,0 +1,117 @@
+# pylint: disable=missing-function-docstring
+from asyncio import run
+from json import dumps
+from os import getpid, getppid
+from threading import current_thread, main_thread
+from unittest.mock import Mock
+from starlette.responses import PlainTextResponse
+from pantam import Pantam
+from pantam.metrics import Metrics
+from pantam.subrequest import subrequest
+
+
+async def ok_endpoint(request):
+    return PlainTextResponse("ok")
+
+
+async def error_endpoint(request):
+    raise ValueError("Fake Error")
+
+
+def test_metrics_record_routes():
+    metrics = Metrics()
+    fetch = metrics.wrap(ok_endpoint, "index", "fetch_all")
+    delete = metrics.wrap(error_endpoint, "index", "delete")
+
+    async def scenario():
+        await fetch(None)
+        await fetch(None)
+        try:
+            await delete(None)
+        except ValueError:
+            pass
+
+    run(scenario())
+    output = metrics.render()
+    assert (
+        'pantam_requests_total{action="index",method="fetch_all",status="200"} 2'
+        in output
+    )
+    assert 'pantam_requests_total{action="index",method="delete",status="500"} 1' in output
+    assert 'pantam_requests_in_flight{action="index",method="fetch_all"} 0' in output
+    assert (
+        'pantam_request_duration_seconds_bucket{action="index",method="fetch_all",le="+Inf"} 2'
+        in output
+    )
+    assert (
+        'pantam_request_duration_seconds_count{action="index",method="fetch_all"} 2'
+        in output
+    )
+
+
+def make_snapshot(pid, ppid):
+    return {
+        "pid": pid,
+        "ppid": ppid,
+        "routes": {
+            "index:fetch_all": {
+                "statuses": {"200": 5},
+                "in_flight": 3,
+                "buckets": [5] + [0] * 11,
+                "sum": 0.01,
+            }
+        },
+        "counters": {"cache_hits_total": 2},
+    }
+
+
+def test_metrics_aggregate_workers(tmp_path):
+    # the parent process stands in for a live sibling worker
+    sibling = make_snapshot(getppid(), getppid())
+    (tmp_path / ("%d.json" % getppid())).write_text(dumps(sibling))
+    metrics = Metrics(str(tmp_path), lambda: {"cache_hits_total": 1})
+    run(metrics.wrap(ok_endpoint, "index", "fetch_all")(None))
+    metrics.write_snapshot()
+    output = metrics.render()
+    assert (
+        'pantam_requests_total{action="index",method="fetch_all",status="200"} 6'
+        in output
+    )
+    assert 'pantam_requests_in_flight{action="index",method="fetch_all"} 3' in output
+    assert "pantam_cache_hits_total 3" in output
+    metrics.remove_snapshot()
+    assert not (tmp_path / ("%d.json" % getpid())).exists()
+
+
+def test_metrics_skip_exited_and_unrelated_workers(tmp_path):
+    exited = tmp_path / "999999999.json"
+    exited.write_text(dumps(make_snapshot(999999999, getppid())))
+    unrelated = tmp_path / ("%d.json" % getppid())
+    unrelated.write_text(dumps(make_snapshot(getppid(), 1)))
+    metrics = Metrics(str(tmp_path))
+    assert metrics.collect()["routes"] == {}
+    assert not exited.exists()
+    assert unrelated.exists()
+
+
+def test_metrics_endpoint_reads_snapshots_off_the_loop(tmp_path):
+    threads = []
+
+    class MockAction:
+        def fetch_all(self, request):
+            return PlainTextResponse("ok")
+
+    app = Pantam(metrics=True, metrics_dir=str(tmp_path))
+    app.read_actions_folder = Mock(return_value=["index.py"])  # type: ignore
+    app.import_action_module = Mock(return_value=MockAction)  # type: ignore
+    app.build()
+    collect = app.metrics.collect
+
+    def collect_in_thread(own=None):
+        threads.append(current_thread())
+        return collect(own)
+
+    app.metrics.collect = collect_in_thread  # type: ignore
+    response = run(subrequest(app.app, "GET", "/metrics"))
+    assert response["status"] == 200
+    assert threads and threads[0] is not main_thread()
@@ -1,7 +1,13 @@
 # pylint: disable=missing-function-docstring too-few-public-methods
+import os
+from asyncio import run
+from threading import current_thread
 from unittest.mock import Mock, patch
-from typing import Any
-from pantam import Pantam, introspect_methods
+from typing import Any, List
+from pantam import Pantam, PlainTextResponse, introspect_methods
+from pantam import manifest as manifest_module
+from pantam.manifest import dump_manifest, load_manifest
+from pantam.pantam import scan_methods
 
 
 def test_get_default_options():
@@ -14,6 +20,45 @@ def test_get_default_options():
         "dev_port": 5000,
         "port": 5000,
         "reload": None,
+        "manifest": None,
+        "lazy": False,
+        "warm_actions": [],
+        "thread_pool_size": 4,
+        "process_pool_size": None,
+        "default_pool_size": None,
+        "stream_pool_size": None,
+        "cache_max_bytes": 33554432,
+        "services": {},
+        "on_startup": None,
+        "warmup": [],
+        "log_format": "text",
+        "log_queue_size": 10000,
+        "log_overflow": "drop",
+        "metrics": False,
+        "metrics_dir": None,
+        "profile_token": None,
+        "profile_rate": 0.0,
+        "profile_dir": None,
+        "profile_limit": 50,
+        "batch": False,
+        "batch_concurrency": 10,
+        "batch_max_requests": 50,
+        "compression": False,
+        "compression_min_size": 500,
+        "compression_cache_bytes": 8388608,
+        "middleware": [],
+        "max_in_flight": None,
+        "max_queue": 100,
+        "max_queue_time": 1.0,
+        "retry_after": 1,
+        "deadline": None,
+        "ready_checks": [],
+        "ready_interval": 1.0,
+        "ready_timeout": 2.0,
+        "reload_interval": 1.0,
+        "import_workers": 4,
+        "drain_timeout": 30.0,
+        "shutdown_timeout": 10.0,
     }
     assert app.get_config() == default_config
 
@@ -28,6 +73,45 @@ def test_override_some_options():
         "dev_port": 5000,
         "port": 5000,
         "reload": None,
+        "manifest": None,
+        "lazy": False,
+        "warm_actions": [],
+        "thread_pool_size": 4,
+        "process_pool_size": None,
+        "default_pool_size": None,
+        "stream_pool_size": None,
+        "cache_max_bytes": 33554432,
+        "services": {},
+        "on_startup": None,
+        "warmup": [],
+        "log_format": "text",
+        "log_queue_size": 10000,
+        "log_overflow": "drop",
+        "metrics": False,
+        "metrics_dir": None,
+        "profile_token": None,
+        "profile_rate": 0.0,
+        "profile_dir": None,
+        "profile_limit": 50,
+        "batch": False,
+        "batch_concurrency": 10,
+        "batch_max_requests": 50,
+        "compression": False,
+        "compression_min_size": 500,
+        "compression_cache_bytes": 8388608,
+        "middleware": [],
+        "max_in_flight": None,
+        "max_queue": 100,
+        "max_queue_time": 1.0,
+        "retry_after": 1,
+        "deadline": None,
+        "ready_checks": [],
+        "ready_interval": 1.0,
+        "ready_timeout": 2.0,
+        "reload_interval": 1.0,
+        "import_workers": 4,
+        "drain_timeout": 30.0,
+        "shutdown_timeout": 10.0,
     }
     assert app.get_config() == config
 
@@ -51,6 +135,45 @@ def test_override_all_options():
         "dev_port": 5001,
         "port": 80,
         "reload": False,
+        "manifest": None,
+        "lazy": False,
+        "warm_actions": [],
+        "thread_pool_size": 4,
+        "process_pool_size": None,
+        "default_pool_size": None,
+        "stream_pool_size": None,
+        "cache_max_bytes": 33554432,
+        "services": {},
+        "on_startup": None,
+        "warmup": [],
+        "log_format": "text",
+        "log_queue_size": 10000,
+        "log_overflow": "drop",
+        "metrics": False,
+        "metrics_dir": None,
+        "profile_token": None,
+        "profile_rate": 0.0,
+        "profile_dir": None,
+        "profile_limit": 50,
+        "batch": False,
+        "batch_concurrency": 10,
+        "batch_max_requests": 50,
+        "compression": False,
+        "compression_min_size": 500,
+        "compression_cache_bytes": 8388608,
+        "middleware": [],
+        "max_in_flight": None,
+        "max_queue": 100,
+        "max_queue_time": 1.0,
+        "retry_after": 1,
+        "deadline": None,
+        "ready_checks": [],
+        "ready_interval": 1.0,
+        "ready_timeout": 2.0,
+        "reload_interval": 1.0,
+        "import_workers": 4,
+        "drain_timeout": 30.0,
+        "shutdown_timeout": 10.0,
     }
     assert app.get_config() == config
 
@@ -68,7 +191,7 @@ def test_read_actions_folder(mock):
     mock.return_value = ["foo.py", "bar.py", "rubbish.txt", "__init__.py"]
     app = Pantam()
     files = app.read_actions_folder()
-    assert files == ["foo.py", "bar.py"]
+    assert files == ["bar.py", "foo.py"]
 
 
 @patch("pantam.pantam.listdir")
@@ -151,7 +274,8 @@ def test_log_routes(logger_mock):
 
 GET    -> /    -> index.py -> fetchAll
 GET    -> /:id -> index.py -> fetchSingle
-GET    -> /healthz [health check endpoint]"""
+GET    -> /healthz [health check endpoint]
+GET    -> /readyz [readiness endpoint]"""
     )
 
 
@@ -205,6 +329,19 @@ def test_load_actions():
     assert actions[0]["routes"] == []
 
 
+class MockServiceAction:
+    def __init__(self, database):
+        self.database = database
+
+
+def test_instantiate_action_with_services():
+    database = object()
+    app = Pantam(services={"database": database, "other": object()})
+    action_obj = app.instantiate_action(MockServiceAction)
+    assert action_obj.database is database
+    assert isinstance(app.instantiate_action(MockAction), MockAction)
+
+
 def test_introspect_methods():
     methods = introspect_methods(MockAction)
     assert methods == {
@@ -215,6 +352,52 @@ def test_introspect_methods():
     }
 
 
+def test_scan_methods(tmp_path):
+    action_file = tmp_path / "index.py"
+    action_file.write_text(
+        """
+class Other:
+    def fetch_all(self, request):
+        pass
+
+class Index:
+    def __init__(self):
+        pass
+
+    def fetch_single(self, request):
+        pass
+
+    async def create(self, request):
+        pass
+
+    def get_custom(self, request):
+        pass
+"""
+    )
+    methods = scan_methods(str(action_file), "Index")
+    assert methods == {
+        "get": ["fetch_single", "get_custom"],
+        "post": ["create"],
+        "patch": [],
+        "delete": [],
+    }
+
+
+def test_load_lazy_actions():
+    app = Pantam(lazy=True, warm_actions=["warm"])
+    app.read_actions_folder = Mock(return_value=["index.py", "warm.py"])  # type: ignore
+    app.import_action_module = Mock(return_value=MockAction)  # type: ignore
+    app.discover_actions()
+    app.load_actions()
+    index, warm = app.get_actions()
+    assert "action_obj" not in index
+    assert isinstance(warm["action_obj"], MockAction)
+    assert app.import_action_module.call_count == 1
+    assert isinstance(index["lazy_action"].resolve(), MockAction)
+    assert index["lazy_action"].resolve() is index["action_obj"]
+    assert app.import_action_module.call_count == 2
+
+
 def test_make_default_urls():
     app = Pantam()
     assert app.make_url("index", "fetch_all") == "/"
@@ -298,10 +481,9 @@ def test_bind_routes():
         ]
     )
     app.bind_routes()
-    assert len(app.routes) == 3
+    assert len(app.routes) == 2
     assert app.routes[0].path == "/"
     assert app.routes[1].path == "/{id}"
-    assert app.routes[2].path == "/healthz"
 
 
 @patch("pantam.pantam.Logger.error")
@@ -321,3 +503,157 @@ def test_prepare_error(logger_mock, app_mock):
     app = Pantam()
     app.build()
     logger_mock.assert_called_with("Unable to build Pantam application!")
+
+
+def test_write_and_apply_manifest(tmp_path):
+    (tmp_path / "index.py").write_text("class Index: pass")
+    manifest = str(tmp_path / "manifest.json")
+    app = Pantam(actions_folder=str(tmp_path), manifest=manifest)
+    app.read_actions_folder = Mock(return_value=["index.py"])  # type: ignore
+    app.import_action_module = Mock(return_value=MockSmallAction)  # type: ignore
+    app.build_manifest()
+
+    fresh_app = Pantam(actions_folder=str(tmp_path), manifest=manifest)
+    fresh_app.read_actions_folder = Mock(return_value=["index.py"])  # type: ignore
+    fresh_app.discover_actions()
+    assert fresh_app.apply_manifest() is True
+    assert fresh_app.actions[0]["routes"] == [
+        {"method": "fetch_all", "verb": "get", "url": "/"},
+        {"method": "fetch_single", "verb": "get", "url": "/{id}"},
+    ]
+
+
+def test_manifest_is_replaced_at_once(tmp_path, monkeypatch):
+    manifest_file = tmp_path / "manifest.json"
+    manifest_file.write_text("stale")
+    manifest = {
+        "version": 1,
+        "actions_folder": "actions",
+        "actions_index": "index",
+        "actions": [],
+    }
+    seen = []
+
+    def replace(source, target):
+        seen.append(manifest_file.read_text())
+        os.replace(source, target)
+
+    monkeypatch.setattr(manifest_module, "replace", replace)
+    dump_manifest(str(manifest_file), manifest)  # type: ignore
+    assert seen == ["stale"]
+    assert load_manifest(str(manifest_file)) == manifest
+    assert [path.name for path in tmp_path.iterdir()] == ["manifest.json"]
+
+
+def test_apply_stale_manifest(tmp_path):
+    action_file = tmp_path / "index.py"
+    action_file.write_text("class Index: pass")
+    manifest = str(tmp_path / "manifest.json")
+    app = Pantam(actions_folder=str(tmp_path), manifest=manifest)
+    app.read_actions_folder = Mock(return_value=["index.py"])  # type: ignore
+    app.import_action_module = Mock(return_value=MockSmallAction)  # type: ignore
+    app.build_manifest()
+
+    action_file.write_text("class Index:\n    pass\n")
+    app.discover_actions()
+    assert app.apply_manifest() is False
+    assert app.actions[0]["routes"] == []
+
+
+NESTED_ACTION = """
+class %s:
+    def fetch_all(self, request):
+        pass
+"""
+
+
+def test_nested_action_packages(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.chdir(tmp_path)
+    shop = tmp_path / "nested_actions" / "shop"
+    shop.mkdir(parents=True)
+    (tmp_path / "nested_actions" / "data").mkdir()
+    for package in (tmp_path / "nested_actions", shop):
+        (package / "__init__.py").write_text("")
+    (tmp_path / "nested_actions" / "index.py").write_text(NESTED_ACTION % "Index")
+    (shop / "index.py").write_text(NESTED_ACTION % "Index")
+    (shop / "order_items.py").write_text(NESTED_ACTION % "OrderItems")
+    app = Pantam(actions_folder="nested_actions")
+    app.build()
+    assert app.read_actions_folder() == [
+        "index.py",
+        "shop/index.py",
+        "shop/order_items.py",
+    ]
+    assert [route.path for route in app.get_routes()] == [
+        "/",
+        "/shop/",
+        "/shop/order-items/",
+    ]
+    assert all(action["import_time"] >= 0 for action in app.actions)
+
+
+def test_actions_are_constructed_on_the_main_thread():
+    threads: List[str] = []
+
+    class MockThreadAction:
+        def __init__(self) -> None:
+            threads.append("init %s" % current_thread().name)
+
+        def fetch_all(self, request) -> PlainTextResponse:
+            return PlainTextResponse("")
+
+    def import_action_module(*args: Any) -> Any:
+        threads.append("import %s" % current_thread().name)
+        return MockThreadAction
+
+    app = Pantam(import_workers=2)
+    app.read_actions_folder = Mock(  # type: ignore
+        return_value=["index.py", "users.py", "posts.py"]
+    )
+    app.import_action_module = import_action_module  # type: ignore
+    app.build()
+    imports = [name for name in threads if name.startswith("import")]
+    assert len(imports) == 3
+    assert all(name.startswith("import pantam-import") for name in imports)
+    assert threads[3:] == ["init MainThread"] * 3
+
+
+class MockHookAction:
+    events: List[str] = []
+
+    async def on_startup(self) -> None:
+        self.events.append("action startup")
+
+    def on_shutdown(self) -> None:
+        self.events.append("action shutdown")
+
+    def fetch_all(self, request) -> PlainTextResponse:
+        self.events.append("fetch_all")
+        return PlainTextResponse("ok")
+
+
+def test_startup_and_shutdown_hooks():
+    events = MockHookAction.events
+
+    async def on_startup():
+        events.append("app startup")
+
+    app = Pantam(
+        on_startup=on_startup,
+        on_shutdown=lambda: events.append("app shutdown"),
+        warmup=["GET /"],
+    )
+    app.read_actions_folder = Mock(return_value=["index.py"])  # type: ignore
+    app.import_action_module = Mock(return_value=MockHookAction)  # type: ignore
+    app.build()
+    assert app.ready is False
+
+    run(app.handle_startup())
+    assert app.ready is True
+    assert sorted(events) == ["action startup", "app startup", "fetch_all"]
+    assert events[-1] == "fetch_all"
+
+    run(app.handle_shutdown())
+    assert app.ready is False
+    assert sorted(events[3:]) == ["action shutdown", "app shutdown"]
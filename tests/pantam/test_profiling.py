@@ -0,0 +1,66 @@
+# pylint: disable=missing-function-docstring too-few-public-methods
+from asyncio import run
+from starlette.responses import PlainTextResponse
+from pantam.executors import Executors
+from pantam.profiling import PROFILE_ID_HEADER, Profiler
+
+
+class MockProfiledAction:
+    def fetch_all(self, request):
+        return PlainTextResponse(str(sum(range(1000))))
+
+    async def fetch_single(self, request):
+        return PlainTextResponse("async")
+
+
+def make_endpoint(profiler, method):
+    executors = Executors()
+    endpoint = executors.wrap(MockProfiledAction(), method, profiler.wrap_handler)
+    return profiler.wrap(endpoint, "index", method)
+
+
+def test_profile_triggered_by_header(tmp_path, make_request):
+    profiler = Profiler(token="secret", profile_dir=str(tmp_path))
+    fetch_all = make_endpoint(profiler, "fetch_all")
+    fetch_single = make_endpoint(profiler, "fetch_single")
+
+    untriggered = run(fetch_all(make_request()))
+    assert PROFILE_ID_HEADER not in untriggered.headers
+    assert profiler.list_profiles() == []
+
+    wrong_token = run(fetch_all(make_request(headers={"X-Pantam-Profile": "guess"})))
+    assert PROFILE_ID_HEADER not in wrong_token.headers
+
+    response = run(fetch_all(make_request(headers={"X-Pantam-Profile": "secret"})))
+    name = response.headers[PROFILE_ID_HEADER]
+    assert name.startswith("index.fetch_all.")
+    run(fetch_single(make_request(headers={"X-Pantam-Profile": "secret"})))
+
+    profiles = profiler.list_profiles()
+    assert [profile["method"] for profile in profiles] == ["fetch_single", "fetch_all"]
+    assert "fetch_all" in profiler.read_text(name)
+
+
+def test_profile_sampling_and_limit(tmp_path, make_request):
+    profiler = Profiler(rate=1.0, profile_dir=str(tmp_path), limit=2)
+    fetch_all = make_endpoint(profiler, "fetch_all")
+    for _ in range(4):
+        run(fetch_all(make_request()))
+    assert len(profiler.list_profiles()) == 2
+
+
+def test_profiles_endpoint_requires_token(tmp_path, make_request):
+    profiler = Profiler(token="secret", profile_dir=str(tmp_path))
+    fetch_all = make_endpoint(profiler, "fetch_all")
+    run(fetch_all(make_request(headers={"X-Pantam-Profile": "secret"})))
+
+    forbidden = run(profiler.handle_list(make_request(path="/_profiles/")))
+    assert forbidden.status_code == 403
+
+    allowed = run(
+        profiler.handle_list(
+            make_request(path="/_profiles/", headers={"X-Pantam-Profile": "secret"})
+        )
+    )
+    assert allowed.status_code == 200
+    assert b"fetch_all" in allowed.body
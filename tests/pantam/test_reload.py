@@ -0,0 +1,113 @@
+# pylint: disable=missing-function-docstring
+from asyncio import run
+from os import utime
+import signal
+from pantam import Pantam
+from pantam.reload import add_reload_signal, diff_stats, remove_reload_signal
+from pantam.subrequest import subrequest
+
+VERSION_ONE = """
+from pantam import PlainTextResponse
+
+NAME = "one"
+
+class Index:
+    def fetch_all(self, request):
+        return PlainTextResponse(NAME)
+"""
+
+VERSION_TWO = """
+from pantam import PlainTextResponse
+
+NAME = "two"
+
+class Index:
+    def fetch_all(self, request):
+        return PlainTextResponse(NAME)
+
+    def get_extra(self, request):
+        return PlainTextResponse("extra")
+"""
+
+OTHER = """
+from pantam import PlainTextResponse
+
+class Other:
+    def fetch_all(self, request):
+        return PlainTextResponse("other")
+"""
+
+
+def test_diff_stats():
+    old = {"a.py": (1, 1), "b.py": (1, 1), "c.py": (1, 1)}
+    new = {"a.py": (1, 1), "b.py": (2, 1), "d.py": (1, 1)}
+    assert diff_stats(old, new) == (["b.py", "d.py"], ["c.py"])
+
+
+def test_reload_changed_actions(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.chdir(tmp_path)
+    actions = tmp_path / "reload_actions"
+    actions.mkdir()
+    (actions / "__init__.py").write_text("")
+    index = actions / "index.py"
+    index.write_text(VERSION_ONE)
+    pantam = Pantam(actions_folder="reload_actions")
+    app = pantam.build()
+
+    async def scenario():
+        first = await subrequest(app, "GET", "/")
+        old_action = pantam.actions[0]["action_obj"]
+        assert pantam.check_actions_folder() is False
+        index.write_text(VERSION_TWO)
+        utime(index, ns=(0, 1))
+        (actions / "other.py").write_text(OTHER)
+        assert pantam.check_actions_folder() is True
+        reloaded = await pantam.reload_actions()
+        responses = [
+            await subrequest(app, "GET", path) for path in ("/", "/extra/", "/other/")
+        ]
+        assert await pantam.reload_actions() == []
+        # requests in flight on the old action keep the old module globals
+        assert old_action.fetch_all(None).body == b"one"
+        return first, reloaded, responses
+
+    first, reloaded, responses = run(scenario())
+    assert first["body"] == b"one"
+    assert reloaded == ["index", "other"]
+    assert [response["body"] for response in responses] == [b"two", b"extra", b"other"]
+
+
+def test_reload_keeps_actions_that_fail_to_import(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.chdir(tmp_path)
+    actions = tmp_path / "broken_actions"
+    actions.mkdir()
+    (actions / "__init__.py").write_text("")
+    index = actions / "index.py"
+    index.write_text(VERSION_ONE)
+    pantam = Pantam(actions_folder="broken_actions")
+    app = pantam.build()
+
+    async def scenario():
+        index.write_text("class Index(:")
+        utime(index, ns=(0, 1))
+        reloaded = await pantam.reload_actions()
+        return reloaded, await subrequest(app, "GET", "/")
+
+    reloaded, response = run(scenario())
+    assert reloaded == []
+    assert response["body"] == b"one"
+
+
+def test_reload_signal_restores_previous_handling():
+    async def scenario():
+        add_reload_signal(lambda: None)
+        remove_reload_signal()
+
+    previous = signal.signal(signal.SIGHUP, signal.SIG_IGN)
+    try:
+        run(scenario())
+        assert signal.getsignal(signal.SIGHUP) == signal.SIG_IGN
+    finally:
+        signal.signal(signal.SIGHUP, previous)
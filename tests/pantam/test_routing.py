@@ -0,0 +1,152 @@
+# pylint: disable=missing-function-docstring
+from asyncio import run
+from unittest.mock import Mock
+from starlette.applications import Starlette
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+from pantam import Pantam
+from pantam.routing import ActionRouter, RouteTree
+
+
+def endpoint(request):
+    return PlainTextResponse(request.url.path)
+
+
+def make_routes():
+    return [
+        Route("/", endpoint, methods=["GET"]),
+        Route("/{id}", endpoint, methods=["GET"]),
+        Route("/custom/", endpoint, methods=["GET"]),
+        Route("/{id}", endpoint, methods=["PATCH"]),
+        Route("/other/", endpoint, methods=["POST"]),
+        Route("/other/custom/{id}", endpoint, methods=["POST"]),
+    ]
+
+
+def test_lookup_static_routes():
+    routes = make_routes()
+    tree = RouteTree(routes)
+    node, params = tree.lookup("/")
+    assert node.routes["GET"] is routes[0]
+    assert node.routes["HEAD"] is routes[0]
+    assert params == {}
+    node, _ = tree.lookup("/custom/")
+    assert node.routes["GET"] is routes[2]
+
+
+def test_lookup_param_routes():
+    routes = make_routes()
+    tree = RouteTree(routes)
+    node, params = tree.lookup("/42")
+    assert node.routes["GET"] is routes[1]
+    assert node.routes["PATCH"] is routes[3]
+    assert params == {"id": "42"}
+    node, params = tree.lookup("/other/custom/7")
+    assert node.routes["POST"] is routes[5]
+    assert params == {"id": "7"}
+
+
+def test_lookup_falls_back_to_param():
+    tree = RouteTree(make_routes())
+    node, params = tree.lookup("/custom")
+    assert "GET" in node.routes
+    assert params == {"id": "custom"}
+
+
+def test_lookup_falls_back_to_param_for_verb():
+    routes = [
+        Route("/custom", endpoint, methods=["POST"]),
+        Route("/{id}", endpoint, methods=["GET"]),
+    ]
+    tree = RouteTree(routes)
+    node, params = tree.lookup("/custom", "GET")
+    assert node.routes["GET"] is routes[1]
+    assert params == {"id": "custom"}
+    node, params = tree.lookup("/custom", "POST")
+    assert node.routes["POST"] is routes[0]
+    assert params == {}
+
+
+def test_lookup_miss():
+    tree = RouteTree(make_routes())
+    assert tree.lookup("/other/custom/")[0] is None
+    assert tree.lookup("/a/b/c")[0] is None
+
+
+def call(app, method, path):
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": path,
+        "root_path": "",
+        "scheme": "http",
+        "query_string": b"",
+        "headers": [],
+        "server": ("testserver", 80),
+    }
+    run(app(scope, receive, send))
+    return messages[0]["status"], messages[1]["body"]
+
+
+def test_router_dispatch():
+    router = ActionRouter(make_routes())
+    assert call(router, "GET", "/12") == (200, b"/12")
+    assert call(router, "PATCH", "/12") == (200, b"/12")
+    assert call(router, "DELETE", "/12") == (405, b"Method Not Allowed")
+    assert call(router, "GET", "/a/b/c") == (404, b"Not Found")
+
+
+def test_router_redirect_slashes():
+    router = ActionRouter(make_routes())
+    status, _ = call(router, "POST", "/other/custom/7/")
+    assert status == 307
+
+
+def test_router_misses_skip_linear_scan(monkeypatch):
+    def matches(self, scope):
+        raise AssertionError("linear scan")
+
+    router = ActionRouter(make_routes())
+    monkeypatch.setattr(Route, "matches", matches)
+    assert call(router, "GET", "/a/b/c") == (404, b"Not Found")
+    assert call(router, "GET", "/other/custom/") == (404, b"Not Found")
+    assert call(router, "DELETE", "/12") == (405, b"Method Not Allowed")
+    assert call(router, "GET", "/custom")[0] == 200
+    assert call(router, "POST", "/other/custom/7/")[0] == 307
+
+
+class MockIndex:
+    def fetch_all(self, request):
+        return PlainTextResponse("index")
+
+
+def make_app():
+    pantam = Pantam()
+    pantam.read_actions_folder = Mock(return_value=["index.py"])  # type: ignore
+    pantam.import_action_module = Mock(return_value=MockIndex)  # type: ignore
+    return pantam.build()
+
+
+def test_routes_added_to_the_app_are_served():
+    app = make_app()
+    app.add_route("/a/b/c", endpoint, methods=["GET"])
+    assert call(app, "GET", "/a/b/c") == (200, b"/a/b/c")
+    assert call(app, "POST", "/a/b/c") == (405, b"Method Not Allowed")
+    assert call(app, "GET", "/a/b/c/")[0] == 307
+    assert call(app, "GET", "/") == (200, b"index")
+
+
+def test_mounted_apps_are_served():
+    app = make_app()
+    sub_app = Starlette(routes=[Route("/items", endpoint, methods=["GET"])])
+    app.mount("/sub", sub_app)
+    assert call(app, "GET", "/sub/items") == (200, b"/sub/items")
+    assert call(app, "GET", "/sub/missing") == (404, b"Not Found")
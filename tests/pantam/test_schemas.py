@@ -0,0 +1,218 @@
+# pylint: disable=missing-function-docstring
+from asyncio import run
+from dataclasses import dataclass, field
+from json import dumps, loads
+from typing import List, Optional, TypedDict
+from unittest.mock import Mock
+import pytest
+from starlette.datastructures import UploadFile
+from pantam import Pantam, PlainTextResponse
+from pantam.schemas import DecodeError, compile_schema, compile_type
+from pantam.subrequest import subrequest
+
+
+@dataclass
+class Line:
+    sku: str
+    quantity: int = 1
+
+
+@dataclass
+class NewOrder:
+    email: str
+    lines: List[Line]
+    note: Optional[str] = None
+    tags: List[str] = field(default_factory=list)
+
+
+class OrderPatch(TypedDict, total=False):
+    note: str
+    paid: bool
+
+
+class Attachment(TypedDict):
+    tags: List[str]
+    file: UploadFile
+
+
+MULTIPART_BODY = (
+    b"--x\r\n"
+    b'Content-Disposition: form-data; name="tags"\r\n\r\na\r\n'
+    b"--x\r\n"
+    b'Content-Disposition: form-data; name="tags"\r\n\r\nb\r\n'
+    b"--x\r\n"
+    b'Content-Disposition: form-data; name="file"; filename="a.txt"\r\n'
+    b"Content-Type: text/plain\r\n\r\nhello\r\n"
+    b"--x--\r\n"
+)
+
+
+class MockOrders:
+    def fetch_all(self, request):
+        return PlainTextResponse("all")
+
+    def fetch_single(self, request, id: int):  # pylint: disable=redefined-builtin
+        return PlainTextResponse("%s:%d" % (type(id).__name__, id))
+
+    async def create(self, request, order: NewOrder):
+        return PlainTextResponse("%s x%d" % (order.email, order.lines[0].quantity))
+
+    def update(self, request, id: int, patch: OrderPatch):  # pylint: disable=redefined-builtin
+        return PlainTextResponse(dumps(dict(patch, id=id)))
+
+    async def set_attachment(self, request, attachment: Attachment):
+        content = await attachment["file"].read()
+        return PlainTextResponse("%s %s" % (",".join(attachment["tags"]), content.decode()))
+
+
+def make_app():
+    app = Pantam()
+    app.read_actions_folder = Mock(return_value=["index.py"])  # type: ignore
+    app.import_action_module = Mock(return_value=MockOrders)  # type: ignore
+    return app.build()
+
+
+def test_methods_without_annotations_are_not_wrapped():
+    assert compile_schema(MockOrders(), "fetch_all", "/") is None
+    assert compile_schema(MockOrders(), "fetch_single", "/{id}") is not None
+
+
+def test_unsupported_annotations_fail_at_bind_time():
+    class MockBadAction:
+        def create(self, request, data: set):
+            pass
+
+    with pytest.raises(TypeError):
+        compile_schema(MockBadAction(), "create", "/")
+
+
+class MockBadOrders:
+    def create(self, request, tags: set):
+        return PlainTextResponse("unreachable")
+
+
+BAD_ACTION = """
+from pantam import PlainTextResponse
+
+class Index:
+    def create(self, request, tags: set):
+        return PlainTextResponse("unreachable")
+"""
+
+
+def test_unsupported_annotations_fail_build():
+    app = Pantam()
+    app.read_actions_folder = Mock(return_value=["index.py"])  # type: ignore
+    app.import_action_module = Mock(return_value=MockBadOrders)  # type: ignore
+    with pytest.raises(TypeError) as error:
+        app.build()
+    assert "`index` action" in str(error.value)
+    assert "`tags` of `create`" in str(error.value)
+    assert "<class 'set'>" in str(error.value)
+
+
+def test_unsupported_annotations_of_lazy_actions_are_logged(tmp_path, monkeypatch):
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.chdir(tmp_path)
+    actions = tmp_path / "lazy_bad_actions"
+    actions.mkdir()
+    (actions / "__init__.py").write_text("")
+    (actions / "index.py").write_text(BAD_ACTION)
+    app = Pantam(actions_folder="lazy_bad_actions", lazy=True)
+    app.logger.error = Mock()  # type: ignore
+    app.build()
+    # the server error middleware answers with a 500 and re-raises
+    with pytest.raises(TypeError):
+        run(subrequest(app.app, "POST", "/", b"{}"))
+    assert "`tags` of `create`" in app.logger.error.call_args[0][0]
+
+
+def test_decode_reports_every_invalid_field():
+    convert = compile_type(NewOrder)
+    order = convert({"email": "a@b.c", "lines": [{"sku": "x"}]}, False)
+    assert order == NewOrder("a@b.c", [Line("x", 1)])
+    with pytest.raises(DecodeError) as error:
+        convert({"lines": [{"sku": 1, "quantity": "2"}], "tags": "x"}, False)
+    assert error.value.errors == [
+        {"loc": "email", "msg": "field required"},
+        {"loc": "lines.0.sku", "msg": "expected a string"},
+        {"loc": "lines.0.quantity", "msg": "expected an integer"},
+        {"loc": "tags", "msg": "expected a list"},
+    ]
+
+
+def test_decoded_arguments_are_passed_to_methods():
+    app = make_app()
+
+    async def scenario():
+        return [
+            await subrequest(app, "GET", "/7"),
+            await subrequest(
+                app,
+                "POST",
+                "/",
+                dumps({"email": "a@b.c", "lines": [{"sku": "x", "quantity": 3}]}).encode(),
+                {"content-type": "application/json"},
+            ),
+            await subrequest(
+                app,
+                "PATCH",
+                "/2",
+                b"note=hi&paid=yes",
+                {"content-type": "application/x-www-form-urlencoded"},
+            ),
+        ]
+
+    single, created, updated = run(scenario())
+    assert single["body"] == b"int:7"
+    assert created["body"] == b"a@b.c x3"
+    assert loads(updated["body"]) == {"note": "hi", "paid": True, "id": 2}
+
+
+def test_invalid_input_is_rejected_before_methods_run():
+    app = make_app()
+
+    async def scenario():
+        return [
+            await subrequest(app, "GET", "/seven"),
+            await subrequest(app, "POST", "/", b"{", {"content-type": "application/json"}),
+            await subrequest(app, "PATCH", "/seven", b"[]"),
+        ]
+
+    responses = run(scenario())
+    assert [response["status"] for response in responses] == [422, 422, 422]
+    assert loads(responses[0]["body"]) == {
+        "errors": [{"loc": "path.id", "msg": "expected an integer"}]
+    }
+    assert loads(responses[1]["body"]) == {
+        "errors": [{"loc": "body", "msg": "invalid JSON"}]
+    }
+    assert len(loads(responses[2]["body"])["errors"]) == 2
+
+
+def test_repeated_form_fields_and_files():
+    app = make_app()
+
+    async def scenario():
+        return [
+            await subrequest(
+                app,
+                "POST",
+                "/attachment/",
+                MULTIPART_BODY,
+                {"content-type": "multipart/form-data; boundary=x"},
+            ),
+            await subrequest(
+                app,
+                "POST",
+                "/attachment/",
+                b"tags=a&file=b",
+                {"content-type": "application/x-www-form-urlencoded"},
+            ),
+        ]
+
+    uploaded, not_a_file = run(scenario())
+    assert uploaded["body"] == b"a,b hello"
+    assert loads(not_a_file["body"]) == {
+        "errors": [{"loc": "body.file", "msg": "expected a file"}]
+    }
@@ -0,0 +1,119 @@
+# pylint: disable=missing-function-docstring
+from asyncio import gather, run
+from threading import get_ident
+from pantam import JSONStreamResponse, PlainTextResponse, stream
+from pantam.executors import Executors, ThreadLanes, executor
+from pantam.services import SqlitePool
+from pantam.streaming import wrap_stream
+from pantam.subrequest import subrequest
+
+
+class MockStreamAction:
+    def __init__(self):
+        self.threads = set()
+        self.closed = False
+
+    def fetch_all(self, request):
+        try:
+            for index in range(600):
+                self.threads.add(get_ident())
+                yield {"id": index}
+        finally:
+            self.closed = True
+
+    async def fetch_single(self, request):
+        for index in range(3):
+            yield [index]
+
+    @stream(array=True)
+    def get_rows(self, request):
+        return iter([(1, "a"), (2, "b")])
+
+    @executor("inline")
+    def get_inline(self, request):
+        self.threads.add(get_ident())
+        yield 1
+
+    @stream(array=True)
+    def get_missing(self, request):
+        return PlainTextResponse("Not Found", status_code=404)
+
+
+async def call(action, method, request, lanes=None):
+    endpoint = wrap_stream(Executors().wrap(action, method), action, method, None, lanes)
+    response = await endpoint(request)
+    return await subrequest(response, "GET", "/")
+
+
+def test_stream_sync_generator_as_ndjson(make_request):
+    action = MockStreamAction()
+    response = run(call(action, "fetch_all", make_request()))
+    lines = response["body"].decode("utf-8").splitlines()
+    assert ("content-type", "application/x-ndjson") in response["headers"]
+    assert len(lines) == 600
+    assert lines[0] == '{"id":0}'
+    assert len(action.threads) == 1
+    assert action.closed
+
+
+def test_stream_async_generator_and_arrays(make_request):
+    action = MockStreamAction()
+    assert (
+        run(call(action, "fetch_single", make_request()))["body"] == b"[0]\n[1]\n[2]\n"
+    )
+    assert run(call(action, "get_rows", make_request()))["body"] == b'[[1,"a"],[2,"b"]]'
+    missing = run(call(action, "get_missing", make_request()))
+    assert missing["status"] == 404
+
+
+def test_stream_empty_array():
+    response = run(subrequest(JSONStreamResponse(iter([]), array=True), "GET", "/"))
+    assert response["body"] == b"[]"
+
+
+def test_streams_share_a_bounded_set_of_threads(make_request):
+    lanes = ThreadLanes(2)
+    actions = [MockStreamAction() for _ in range(6)]
+
+    async def scenario():
+        return await gather(
+            *[call(action, "fetch_all", make_request(), lanes) for action in actions]
+        )
+
+    responses = run(scenario())
+    assert all(len(response["body"].splitlines()) == 600 for response in responses)
+    assert all(len(action.threads) == 1 for action in actions)
+    assert len(set.union(*[action.threads for action in actions])) <= 2
+    assert len(lanes.lanes) == 2
+    assert all(users == 0 for users in lanes.users.values())
+
+
+def test_streams_sharing_a_thread_hold_their_own_connections(tmp_path):
+    pool = SqlitePool(str(tmp_path / "db"), size=2)
+    connections = []
+
+    def rows():
+        with pool.connection() as connection:
+            connections.append(connection)
+            for index in range(1000):
+                yield index
+
+    async def scenario():
+        lanes = ThreadLanes(1)
+        responses = [JSONStreamResponse(rows(), lanes=lanes) for _ in range(2)]
+        return await gather(
+            *[subrequest(response, "GET", "/") for response in responses]
+        )
+
+    responses = run(scenario())
+    assert all(len(response["body"].splitlines()) == 1000 for response in responses)
+    assert connections[0] is not connections[1]
+    assert pool.stats()["connections"] == 2
+    assert pool.stats()["idle"] == 2
+    pool.close()
+
+
+def test_stream_inline_generator_runs_on_event_loop(make_request):
+    action = MockStreamAction()
+    assert run(call(action, "get_inline", make_request()))["body"] == b"1\n"
+    assert action.threads == {get_ident()}
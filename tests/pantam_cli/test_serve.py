@@ -0,0 +1,22 @@
+# pylint: disable=missing-function-docstring
+from pantam_cli.serve import make_serve_options
+
+
+def test_serve_options_defaults():
+    options = make_serve_options({"entrypoint": "app.py"}, {})  # type: ignore
+    assert options["workers"] >= 1
+    assert options["backlog"] == 2048
+    assert options["timeout_keep_alive"] == 5
+    assert options["limit_concurrency"] is None
+    assert options["reuse_port"] is False
+    assert options["stop_timeout"] == 45.0
+
+
+def test_serve_options_flags_override_pantamrc():
+    pantamrc = {"entrypoint": "app.py", "workers": 2, "loop": "uvloop", "backlog": 64}
+    overrides = {"workers": 8, "loop": None, "reuse_port": True}
+    options = make_serve_options(pantamrc, overrides)  # type: ignore
+    assert options["workers"] == 8
+    assert options["loop"] == "uvloop"
+    assert options["backlog"] == 64
+    assert options["reuse_port"] is True
@@ -0,0 +1,127 @@
+# pylint: disable=missing-function-docstring
+import signal
+from unittest.mock import Mock
+from uvicorn import Config
+from pantam_cli import supervisor
+from pantam_cli.supervisor import MIN_UPTIME, Supervisor, run_worker
+
+
+class MockProcess:
+    def __init__(self, pid):
+        self.pid = pid
+        self.alive = True
+        self.exitcode = None
+        self.joined = False
+        self.killed = False
+        self.stops_on_join = True
+
+    def is_alive(self):
+        return self.alive
+
+    def join(self, timeout=None):
+        self.joined = True
+        self.alive = self.alive and not self.stops_on_join
+
+    def kill(self):
+        self.killed = True
+        self.alive = False
+
+
+def make_supervisor(monkeypatch, workers=2):
+    pids = iter(range(100, 200))
+    clock = {"now": 0.0}
+    monkeypatch.setattr(supervisor, "monotonic", lambda: clock["now"])
+    monkeypatch.setattr(supervisor, "write_error", Mock())
+    monkeypatch.setattr(Supervisor, "spawn", lambda self, index: MockProcess(next(pids)))
+    instance = Supervisor(Config("app:app", workers=workers))
+    instance.processes = [instance.spawn(index) for index in range(workers)]
+    instance.started = [0.0] * workers
+    return instance, clock
+
+
+def test_restart_crashed_worker(monkeypatch):
+    instance, clock = make_supervisor(monkeypatch)
+    crashed = instance.processes[1]
+    crashed.alive = False
+    crashed.exitcode = 1
+    clock["now"] = MIN_UPTIME + 5
+    instance.restart_crashed()
+    assert [process.pid for process in instance.processes] == [100, 102]
+    assert instance.started[1] == MIN_UPTIME + 5
+    assert not instance.should_exit.is_set()
+
+
+def test_fail_fast_when_worker_dies_on_boot(monkeypatch):
+    instance, clock = make_supervisor(monkeypatch)
+    instance.processes[0].alive = False
+    clock["now"] = MIN_UPTIME / 2
+    instance.restart_crashed()
+    assert instance.should_exit.is_set()
+    assert [process.pid for process in instance.processes] == [100, 101]
+
+
+def test_signals_are_forwarded_to_workers(monkeypatch):
+    instance, _ = make_supervisor(monkeypatch)
+    instance.processes[1].alive = False
+    kill = Mock()
+    monkeypatch.setattr(supervisor.os, "kill", kill)
+    instance.reload_handler(signal.SIGHUP, None)
+    assert kill.call_args_list == [((100, signal.SIGHUP),)]
+    kill.reset_mock()
+    instance.signal_handler(signal.SIGTERM, None)
+    assert instance.should_exit.is_set()
+    instance.shutdown()
+    assert kill.call_args_list == [((100, signal.SIGTERM),)]
+    assert all(process.joined for process in instance.processes)
+    assert not any(process.killed for process in instance.processes)
+
+
+def test_repeated_signals_reach_workers_and_stuck_ones_are_killed(monkeypatch):
+    instance, _ = make_supervisor(monkeypatch)
+    kill = Mock()
+    monkeypatch.setattr(supervisor.os, "kill", kill)
+    first, stuck = instance.processes
+    first.stops_on_join = False
+    stuck.stops_on_join = False
+    signals = [signal.SIGINT]
+
+    def join(timeout=None):
+        # a second Ctrl-C arrives while the supervisor waits for the worker
+        if signals:
+            instance.signal_handler(signals.pop(), None)
+
+    first.join = join  # type: ignore
+    instance.signal_handler(signal.SIGINT, None)
+    assert kill.call_args_list == []
+    instance.shutdown()
+    forwarded = [((100, signal.SIGINT),), ((101, signal.SIGINT),)]
+    assert kill.call_args_list == forwarded * 2
+    assert first.killed and stuck.killed
+
+
+def test_workers_run_in_their_own_process_group(monkeypatch):
+    setpgrp = Mock()
+    handle_signal = Mock()
+    monkeypatch.setattr(supervisor.os, "setpgrp", setpgrp, raising=False)
+    monkeypatch.setattr(supervisor.signal, "signal", handle_signal)
+    thread = Mock()
+    monkeypatch.setattr(supervisor, "Thread", thread)
+    server = Mock()
+    run_worker(server, sockets=["socket"], parent=42)
+    setpgrp.assert_called_once_with()
+    handle_signal.assert_called_once_with(signal.SIGHUP, signal.SIG_IGN)
+    assert thread.call_args[1]["args"] == (42,)
+    thread.return_value.start.assert_called_once_with()
+    server.run.assert_called_once_with(sockets=["socket"])
+
+
+def test_workers_stop_when_the_supervisor_is_gone(monkeypatch):
+    parents = iter([42, 42, 1])
+    kill = Mock()
+    sleep = Mock()
+    monkeypatch.setattr(supervisor.os, "getppid", lambda: next(parents))
+    monkeypatch.setattr(supervisor.os, "kill", kill)
+    monkeypatch.setattr(supervisor, "sleep", sleep)
+    supervisor.watch_parent(42)
+    assert sleep.call_count == 2
+    kill.assert_called_once_with(supervisor.os.getpid(), signal.SIGTERM)